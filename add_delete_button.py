@@ -1,7 +1,4 @@
-import re
-
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from codemod_engine import Rule
 
 # Find and add delete button
 delete_button = """
@@ -16,12 +13,11 @@ delete_button = """
                                                 </button>"""
 
 # Insert after Trust button
-pattern = r"(\{user\.isTrusted \? 'Remove Trusted Status' : 'Mark as Trusted User'\}\s*</button>)"
-if re.search(pattern, content):
-    content = re.sub(pattern, r'\1' + delete_button, content)
-    print('Delete button added!')
-else:
-    print('Pattern not found')
+RULES = [
+    Rule(r"(\{user\.isTrusted \? 'Remove Trusted Status' : 'Mark as Trusted User'\}\s*</button>)",
+         r'\1' + delete_button, name='delete button'),
+]
 
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('add_delete_button')
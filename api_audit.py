@@ -0,0 +1,617 @@
+"""Find the API handlers that fetch more than they use or wait more than they need.
+
+    python api_audit.py                      # every handler in api/, worst first
+    python api_audit.py api/resources.ts     # one handler
+    python api_audit.py --kind serial        # only one kind of finding
+
+Each api/*.ts is tokenized with tsx_index and every Supabase query in it
+(.from('table') and the calls chained after it, also when the query is
+kept in a variable and awaited later) is checked for three things:
+
+- n+1: a query inside a for/while loop or a .map/.forEach/... callback,
+  so a request pays one round-trip per item.  Listed first, as its cost
+  grows with the data.
+- serial: reads awaited one after another in the same block where the
+  later one uses nothing the earlier one produced, directly or through
+  the statements in between.  Such reads can start together with
+  Promise.all; the finding says how many round-trips that saves (the
+  reads minus the longest chain of reads that do depend on each other).
+  Any other await or a write between two reads ends the search, since
+  the order may matter there.
+- select*: select('*') (or select() after insert/update) whose result is
+  only read field by field, following it through aliases (user = u),
+  `x || []`, for...of and the callbacks of map, forEach, filter, find and
+  the like.  The finding lists the fields read and the select() that would
+  do.  Rows that are returned, spread or passed on whole can need every
+  column and are only counted.
+"""
+import argparse
+import glob
+import os
+import sys
+from collections import namedtuple
+
+import tsx_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCES = ('api/*.ts',)
+KINDS = ('n+1', 'serial', 'select*')
+
+# An awaited (or looped) query.  line is that of .from(); root and end
+# are the token indexes of the start of the call chain and just after it;
+# wait is the index of its await, or None.  columns is the select()
+# argument ('*' for a bare select()), head True for select(.., {head: true}).
+Query = namedtuple('Query', 'table line action root end wait single columns head')
+
+# path:line, one of KINDS, the tables involved, the fields read of a
+# select('*') result, what was found, and the round-trips per request it
+# saves (None when it grows with the data).
+Finding = namedtuple('Finding', 'path line kind tables fields detail saved')
+
+_ACTIONS = frozenset(('select', 'update', 'delete', 'upsert', 'insert'))
+# Array methods whose callback gets the rows, with the position of the row parameter.
+_CALLBACKS = {'map': 0, 'forEach': 0, 'filter': 0, 'find': 0, 'findIndex': 0, 'some': 0, 'every': 0,
+              'flatMap': 0, 'sort': 0, 'reduce': 1}
+# Of those, the ones returning rows of the same array.
+_SAME_ROWS = frozenset(('filter', 'sort'))
+_ITERATORS = frozenset(_CALLBACKS) | frozenset(('reduceRight',))
+_LOOPS = frozenset(('for', 'while'))
+_MUTATORS = frozenset(('push', 'unshift', 'splice', 'set', 'add', 'delete'))
+_ASSIGN = frozenset(('=', '+=', '-=', '*=', '/=', '||=', '??=', '&&='))
+_TRUTHY = frozenset(('&&', '?', '===', '!==', '==', '!='))
+_DECLARE = frozenset(('const', 'let', 'var'))
+_CONTINUES = frozenset(('else', 'catch', 'finally'))
+_ENDS = frozenset(('name', 'string', 'number', 'template', 'regex', 'jsx', 'close'))
+# Names after which a statement goes on on the next line.
+_OPERATORS = frozenset(('return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                        'case', 'do', 'else', 'yield', 'await', 'extends', 'default', 'export'))
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _close(tokens, j):
+    """Index of the bracket closing the one at tokens[j]."""
+    depth = tokens[j].depth
+    k = j + 1
+    while k < len(tokens) and tokens[k].depth > depth:
+        k += 1
+    return k
+
+
+def _open(tokens, j):
+    """Index of the bracket opened by the one closing at tokens[j]."""
+    depth = tokens[j].depth
+    k = j - 1
+    while k > 0 and tokens[k].depth > depth:
+        k -= 1
+    return k
+
+
+def _block_end(tokens, k):
+    """Index of the } closing the block that tokens[k] sits in (len(tokens) at the top level)."""
+    depth = tokens[k].depth
+    while k < len(tokens) and tokens[k].depth >= depth:
+        k += 1
+    return k
+
+
+class _Source:
+    """Tokens of one handler with the lookups the checks share."""
+
+    def __init__(self, text, path):
+        self.text = text
+        self.path = path
+        self.tokens = tsx_index.scan(text)
+        self.values = [_value(text, t) for t in self.tokens]
+
+    def line(self, k):
+        return tsx_index.position(self.text, self.tokens[min(k, len(self.tokens) - 1)].start)[0]
+
+    def at(self, k):
+        return self.values[k] if 0 <= k < len(self.values) else None
+
+    def member(self, k):
+        """Whether the name at k is a property (x.name) or an object key ({name: ...})."""
+        if self.at(k - 1) in ('.', '?.'):
+            return True
+        if self.at(k + 1) != ':' or self.at(k - 1) not in ('{', ','):
+            return False
+        close = _block_end(self.tokens, k)
+        return close < len(self.tokens) and self.at(close) == '}'
+
+    def fresh_line(self, k):
+        """Whether tokens[k] starts a line."""
+        start = self.tokens[k].start
+        return not self.text[self.text.rfind('\n', 0, start) + 1:start].strip()
+
+
+def _chain(src, j, query):
+    """Read the calls chained from tokens[j] (a '.') into query; returns (query, index after the chain)."""
+    tokens = src.tokens
+    while (src.at(j) in ('.', '?.') and j + 2 < len(tokens) and tokens[j + 1].kind == 'name'
+           and src.at(j + 2) == '('):
+        method = src.at(j + 1)
+        end = _close(tokens, j + 2)
+        args = range(j + 3, end)
+        if method in _ACTIONS and query.action in (None, 'select'):
+            query = query._replace(action=method if query.action is None or method != 'select' else query.action)
+        if method == 'select':
+            first = tokens[j + 3] if args else None
+            if first is None or first.kind == 'close':
+                columns = '*'
+            elif first.kind in ('string', 'template'):
+                columns = src.at(j + 3)[1:-1]
+            else:
+                columns = None
+            head = any(src.at(k) == 'head' and src.at(k + 2) == 'true' for k in args)
+            query = query._replace(columns=columns, head=head)
+        elif method in ('single', 'maybeSingle'):
+            query = query._replace(single=True)
+        j = end + 1
+    return query, j
+
+
+def queries(src):
+    """The Queries of a handler, one per await (or per call chain when not awaited)."""
+    tokens = src.tokens
+    found = []
+    variables = {}          # name -> Query kept in it
+    i = 0
+    while i < len(tokens):
+        if (src.at(i) == 'from' and src.at(i - 1) == '.' and src.at(i + 1) == '('
+                and i + 3 < len(tokens) and tokens[i + 2].kind == 'string' and src.at(i + 3) == ')'):
+            root = i - 2
+            query = Query(src.at(i + 2)[1:-1], src.line(i), None, root, None, None, False, None, False)
+            query, end = _chain(src, i + 4, query)
+            query = query._replace(action=query.action or 'select', end=end)
+            if src.at(root - 1) == '=' and tokens[root - 2].kind == 'name' and src.at(root - 3) != '.':
+                # let query = supabase.from(...): awaited later.
+                variables[src.at(root - 2)] = query
+            else:
+                found.append(query._replace(wait=root - 1 if src.at(root - 1) == 'await' else None))
+            i = end
+            continue
+        name = src.at(i) if tokens[i].kind == 'name' else None
+        if name in variables and not src.member(i):
+            query = variables[name]
+            if src.at(i + 1) in ('.', '?.'):
+                query, end = _chain(src, i + 1, query)
+            else:
+                end = i + 1
+            if src.at(i - 1) == 'await':
+                found.append(query._replace(root=i, end=end, wait=i - 1))
+            elif src.at(i - 1) == '=' and src.at(i - 2) == name:
+                variables[name] = query         # query = query.eq(...)
+            i = max(end, i + 1)
+            continue
+        i += 1
+    return found
+
+
+# -- select('*') ---------------------------------------------------------
+
+def _binding(src, wait):
+    """Name the data of the awaited query is bound to: { data: user } = await ..."""
+    if src.at(wait - 1) != '=' or src.at(wait - 2) != '}':
+        return None
+    opening = _open(src.tokens, wait - 2)
+    depth = src.tokens[opening].depth + 1
+    for k in range(opening + 1, wait - 2):
+        if src.tokens[k].depth == depth and src.at(k) == 'data' and src.at(k - 1) in ('{', ','):
+            if src.at(k + 1) == ':' and src.tokens[k + 2].kind == 'name':
+                return k + 2
+            if src.at(k + 1) in (',', '}'):
+                return k
+    return None
+
+
+def _declaration(src, name, before):
+    """Index of the let/const/var declaring name nearest before the token index, or None."""
+    for k in range(before - 1, 0, -1):
+        if src.at(k) != name or src.at(k - 1) in ('.', '?.'):
+            continue
+        if src.at(k - 1) in _DECLARE:
+            return k - 1
+        if src.at(k - 1) in ('{', ',', ':'):
+            # let { data: user } = ...
+            close = _block_end(src.tokens, k)
+            if close < len(src.tokens) and src.at(close) == '}':
+                opening = _open(src.tokens, close)
+                if src.at(opening - 1) in _DECLARE and src.at(close + 1) == '=':
+                    return opening - 1
+    return None
+
+
+class _Reads:
+    """Fields read off a query result, or where it is used whole."""
+
+    def __init__(self):
+        self.fields = set()
+        self.whole = None       # line it escapes at
+        self.seen = set()       # (name, start) already followed
+
+    def escape(self, src, k):
+        if self.whole is None:
+            self.whole = src.line(k)
+
+
+def _callback(src, opening, method, reads):
+    """Follow the row parameter of the callback passed at tokens[opening] (a '(')."""
+    tokens = src.tokens
+    end = _close(tokens, opening)
+    k = opening + 1
+    if src.at(k) == 'async':
+        k += 1
+    if tokens[k].kind == 'name' and src.at(k) != 'function' and src.at(k + 1) == '=>':
+        params = [k]
+        body = k + 2
+    else:
+        if src.at(k) == 'function':
+            k += 1 + (tokens[k + 1].kind == 'name')
+        if src.at(k) != '(':
+            reads.escape(src, k)    # a named function: it can read anything
+            return
+        params = []
+        close = _close(tokens, k)
+        depth = tokens[k].depth + 1
+        for p in range(k + 1, close):
+            if tokens[p].depth == depth and (p == k + 1 or src.at(p - 1) == ','):
+                params.append(p)
+        body = close + 1
+    position = _CALLBACKS.get(method, 0)
+    if position >= len(params):
+        return
+    p = params[position]
+    if src.at(p) == '{':
+        # ({ title, uploaderId }) => ...
+        depth = tokens[p].depth + 1
+        for q in range(p + 1, _close(tokens, p)):
+            if tokens[q].depth != depth:
+                continue
+            if src.at(q) == '...':
+                reads.escape(src, q)
+            elif tokens[q].kind == 'name' and src.at(q - 1) in ('{', ','):
+                reads.fields.add(src.at(q))
+        return
+    if tokens[p].kind == 'name':
+        _follow(src, src.at(p), body, end, True, reads)
+
+
+def _rows_method(src, dot, reads):
+    """Follow rows through .map(...)/.filter(...).find(...)/...; dot is the '.' after the rows."""
+    while src.at(dot) in ('.', '?.') and src.tokens[dot + 1].kind == 'name':
+        method = src.at(dot + 1)
+        if method == 'length':
+            return
+        if method not in _CALLBACKS or src.at(dot + 2) != '(':
+            reads.escape(src, dot)
+            return
+        _callback(src, dot + 2, method, reads)
+        after = _close(src.tokens, dot + 2) + 1
+        if method == 'find' and src.at(after) in ('.', '?.') and src.tokens[after + 1].kind == 'name':
+            reads.fields.add(src.at(after + 1))
+            return
+        if method not in _SAME_ROWS:
+            return
+        dot = after
+
+
+def _follow(src, name, start, end, single, reads):
+    """Collect into reads how name (a row if single, else rows) is used in tokens[start:end]."""
+    if (name, start) in reads.seen:
+        return
+    reads.seen.add((name, start))
+    tokens = src.tokens
+    for k in range(start, min(end, len(tokens))):
+        if tokens[k].kind != 'name' or src.at(k) != name or src.member(k):
+            continue
+        before, after = src.at(k - 1), src.at(k + 1)
+        if before in _DECLARE:
+            return              # shadowed from here on
+        if after in _ASSIGN and after is not None:
+            continue            # reassigned, not read
+        if before == '...':
+            reads.escape(src, k)
+        elif after in ('.', '?.') and tokens[k + 2].kind == 'name':
+            if single:
+                if src.at(k + 3) not in _ASSIGN:
+                    reads.fields.add(src.at(k + 2))
+            else:
+                _rows_method(src, k + 1, reads)
+        elif after == '[':
+            close = _close(tokens, k + 1)
+            if single or src.at(close + 1) not in ('.', '?.'):
+                reads.escape(src, k)
+            else:
+                reads.fields.add(src.at(close + 2))
+        elif before == '(' and after in ('||', '??') and src.at(k + 2) == '[' and src.at(k + 3) == ']' \
+                and src.at(k + 4) == ')' and not single:
+            _rows_method(src, k + 5, reads)                     # (rows || []).map(...)
+        elif before == 'of' and src.at(k - 3) in _DECLARE and src.at(k + 1) == ')':
+            close = k + 1                                       # for (const row of rows)
+            body_end = _close(tokens, close + 1) if src.at(close + 1) == '{' else _block_end(tokens, close)
+            _follow(src, src.at(k - 2), close + 1, body_end, True, reads)
+        elif before == '=' and tokens[k - 2].kind == 'name' and src.at(k - 3) not in ('.', '?.') and (
+                after == ';' or src.fresh_line(k + 1) or
+                (after in ('||', '??') and src.at(k + 2) in ('[', '{', 'null'))):
+            # user = u; / const rows = data || [];
+            alias = src.at(k - 2)
+            declared = k - 3 if src.at(k - 3) in _DECLARE else _declaration(src, alias, k)
+            alias_end = _block_end(tokens, declared) if declared is not None else len(tokens)
+            _follow(src, alias, k + 1, alias_end, single, reads)
+        elif src.at(k - 1) == '!' or after in _TRUTHY or after == ')' and before == '(' and \
+                src.at(k - 2) in ('if', 'while'):
+            continue                                            # if (!user) / user && ...
+        else:
+            reads.escape(src, k)
+
+
+def select_findings(src, found):
+    findings = []
+    whole = []
+    for query in found:
+        columns = query.columns
+        if query.wait is None or columns is None or query.head:
+            continue
+        parts = [c.strip() for c in columns.split(',')]
+        if '*' not in parts:
+            continue
+        binding = _binding(src, query.wait)
+        if binding is None:
+            whole.append((query, query.line))
+            continue
+        reads = _Reads()
+        end = _block_end(src.tokens, query.wait)
+        _follow(src, src.at(binding), query.end, end, query.single, reads)
+        if reads.whole is not None:
+            whole.append((query, reads.whole))
+            continue
+        # Embedded resources (alias:table(...)) come with their own columns.
+        embedded = [c for c in parts if c != '*']
+        aliases = {c.split(':')[0].split('(')[0].strip() for c in embedded}
+        fields = sorted(reads.fields - aliases)
+        select = ', '.join(fields + embedded) or '_id'
+        read = 'reads %s' % ', '.join(fields) if fields else \
+            'only checks that a row exists' if query.single else 'only counts the rows'
+        findings.append(Finding(src.path, query.line, 'select*', (query.table,), tuple(fields),
+                                '%s: %s  ->  .select(\'%s\')' % (query.table, read, select), 0))
+    return findings, whole
+
+
+# -- queries in loops ----------------------------------------------------
+
+def _loops(src):
+    """[(start, end, what, line)] token ranges run once per item."""
+    tokens = src.tokens
+    ranges = []
+    for k, value in enumerate(src.values):
+        if value in _LOOPS and src.at(k + 1) == '(' and not src.member(k):
+            header = _close(tokens, k + 1)
+            body_end = _close(tokens, header + 1) if src.at(header + 1) == '{' else _block_end(tokens, header)
+            what = src.text[tokens[k + 2].start:tokens[header - 1].end]
+            ranges.append((header + 1, body_end, '%s (%s)' % (value, what), src.line(k)))
+        elif value == 'do' and src.at(k + 1) == '{':
+            ranges.append((k + 1, _close(tokens, k + 1), 'do ... while', src.line(k)))
+        elif value in _ITERATORS and src.at(k - 1) in ('.', '?.') and src.at(k + 1) == '(':
+            end = _close(tokens, k + 1)
+            if not any(src.at(j) in ('=>', 'function') for j in range(k + 2, end)):
+                continue
+            receiver = k - 2
+            if src.at(receiver) == ')':
+                receiver = _open(tokens, receiver)
+            while src.at(receiver - 1) in ('.', '?.'):
+                receiver -= 2
+            items = src.text[tokens[receiver].start:tokens[k - 2].end]
+            outer = receiver - 2
+            together = src.at(outer + 1) == '(' and src.at(outer) == 'all' and src.at(outer - 2) == 'Promise'
+            ranges.append((k + 1, end, '%s of %s%s' % (value, items, ', all at once' if together else ''),
+                           src.line(k)))
+    return ranges
+
+
+def loop_findings(src, found):
+    findings = []
+    ranges = _loops(src)
+    for query in found:
+        inside = [r for r in ranges if r[0] < query.root < r[1]]
+        if not inside:
+            continue
+        start, end, what, line = max(inside)
+        action = query.action if query.action != 'select' else 'read'
+        findings.append(Finding(src.path, query.line, 'n+1', (query.table,), (),
+                                'one %s of %s per item: %s at line %d' % (action, query.table, what, line), None))
+    return findings
+
+
+# -- serial reads --------------------------------------------------------
+
+def _blocks(src):
+    """Indexes of the { opening statement blocks."""
+    openers = (')', '=>', 'else', 'try', 'finally', 'do', ';', '{', '}')
+    return [k for k, t in enumerate(src.tokens)
+            if t.kind == 'open' and src.at(k) == '{' and (k == 0 or src.at(k - 1) in openers)]
+
+
+def _statements(src, opening):
+    """[(first, last)] token indexes of the statements of the block at tokens[opening]."""
+    tokens = src.tokens
+    close = _close(tokens, opening)
+    depth = tokens[opening].depth + 1
+    top = [k for k in range(opening + 1, close) if tokens[k].depth == depth]
+    statements = []
+    first = None
+    for n, k in enumerate(top):
+        if first is None:
+            first = k
+        nxt = top[n + 1] if n + 1 < len(top) else None
+        ends = nxt is None or src.at(k) == ';'
+        if not ends and src.fresh_line(nxt) and tokens[k].kind in _ENDS and src.at(nxt) not in _CONTINUES \
+                and tokens[nxt].kind not in ('punct', 'close') and src.at(k) not in _OPERATORS:
+            # if (x)\n    statement: the statement belongs to the if.
+            ends = not (src.at(k) == ')' and src.at(_open(tokens, k) - 1) in ('if', 'for', 'while'))
+        if ends:
+            last = _close(tokens, k) if tokens[k].kind == 'open' else k
+            statements.append((first, last))
+            first = None
+    return statements
+
+
+def _names(src, first, last):
+    """(names read, names bound) by the statement tokens[first..last]."""
+    read = set()
+    bound = set()
+    skip = None
+    declared_at = src.tokens[first].depth
+    for k in range(first, last + 1):
+        if skip is not None:
+            if k < skip:
+                continue
+            skip = None
+        value = src.at(k)
+        token = src.tokens[k]
+        if value in _DECLARE:
+            # The pattern up to =: its names are bound here only for the statement's own declaration.
+            j = k + 1
+            while j <= last and src.tokens[j].depth >= token.depth and not (
+                    src.at(j) in ('=', 'of', 'in', ';') and src.tokens[j].depth == token.depth):
+                if src.tokens[j].kind == 'name' and src.at(j + 1) != ':' and token.depth == declared_at:
+                    bound.add(src.at(j))
+                j += 1
+            skip = j
+            continue
+        if token.kind != 'name' or src.member(k):
+            continue
+        read.add(value)
+        if src.at(k + 1) in _ASSIGN:
+            bound.add(value)
+        elif src.at(k + 1) in ('.', '?.') and (src.at(k + 3) in _ASSIGN or src.at(k + 2) in _MUTATORS):
+            bound.add(value)
+    return read, bound
+
+
+def _returns(src, first, last):
+    return any(src.at(k) in ('return', 'throw') for k in range(first, last + 1))
+
+
+def serial_findings(src, found):
+    reads = {q.wait: q for q in found if q.wait is not None and q.action == 'select'}
+    findings = []
+    for opening in _blocks(src):
+        group = []              # [(query list, names it taints, indexes of the entries it waits for)]
+
+        def flush():
+            if len(group) < 2:
+                return
+            longest = []
+            for n, (_, _, after) in enumerate(group):
+                longest.append(1 + max((longest[a] for a in after), default=0))
+            saved = len(group) - max(longest)
+            if saved <= 0:
+                return
+            parts = []
+            for entry, _, after in group:
+                label = ' -> '.join('%s:%d' % (q.table, q.line) for q in entry)
+                if after:
+                    label += ' (uses %s)' % ', '.join(str(group[a][0][0].line) for a in sorted(after))
+                parts.append(label)
+            tables = tuple(q.table for entry, _, _ in group for q in entry)
+            findings.append(Finding(src.path, group[0][0][0].line, 'serial', tables, (),
+                                    '%s, then %s; Promise.all saves %d round-trip%s' % (
+                                        parts[0], ', then '.join(parts[1:]), saved, '' if saved == 1 else 's'),
+                                    saved))
+
+        for first, last in _statements(src, opening):
+            waits = [k for k in range(first, last + 1) if src.at(k) == 'await']
+            if any(k not in reads for k in waits):
+                flush()
+                group = []
+                continue
+            names_read, bound = _names(src, first, last)
+            if waits:
+                after = {n for n, (_, taint, _) in enumerate(group) if names_read & taint}
+                group.append(([reads[k] for k in waits], set(bound), after))
+                if _returns(src, first, last):
+                    flush()
+                    group = []
+                continue
+            for _, taint, _ in group:
+                if names_read & taint:
+                    taint.update(bound)
+        flush()
+    return findings
+
+
+def audit(text, path):
+    """(Findings, [(Query, line)] of the select('*') results used whole and where) of one handler."""
+    src = _Source(text, path)
+    found = queries(src)
+    selects, whole = select_findings(src, found)
+    return loop_findings(src, found) + serial_findings(src, found) + selects, whole
+
+
+def rank(findings):
+    """Worst first: queries per item, then round-trips saved, then the fewest fields read."""
+    def key(finding):
+        if finding.kind == 'n+1':
+            return (0, 0, finding.path, finding.line)
+        if finding.kind == 'serial':
+            return (1, -finding.saved, finding.path, finding.line)
+        return (2, len(finding.fields), finding.path, finding.line)
+    return sorted(findings, key=key)
+
+
+def _relative(root, path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report over-fetching, serial awaits and queries in loops '
+                                                 'in the API handlers.')
+    parser.add_argument('paths', nargs='*', help='handlers to check (default: api/*.ts)')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('--kind', action='append', choices=KINDS, help='only this kind of finding (repeatable)')
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    paths = args.paths or [p for pattern in SOURCES for p in sorted(glob.glob(os.path.join(root, pattern)))]
+    findings = []
+    whole = []
+    failed = 0
+    for path in paths:
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            found, used_whole = audit(text, _relative(root, path))
+        except (OSError, UnicodeDecodeError, tsx_index.TsxSyntaxError) as exc:
+            print('%-9s  %s  (%s)' % ('failed', _relative(root, path), exc), file=sys.stderr)
+            failed += 1
+            continue
+        findings += found
+        whole += [(_relative(root, path), query, line) for query, line in used_whole]
+    if args.kind:
+        findings = [f for f in findings if f.kind in args.kind]
+
+    for finding in rank(findings):
+        print('%-8s %-26s %s' % (finding.kind, '%s:%d' % (finding.path, finding.line), finding.detail))
+    counts = {}
+    for finding in findings:
+        counts.setdefault(finding.path, {}).setdefault(finding.kind, 0)
+        counts[finding.path][finding.kind] += 1
+    if counts:
+        print('\nby handler:')
+        for path, kinds in sorted(counts.items(), key=lambda item: -sum(item[1].values())):
+            print('  %-26s %s' % (path, ', '.join('%d %s' % (kinds[k], k) for k in KINDS if k in kinds)))
+    if whole and (not args.kind or 'select*' in args.kind):
+        print('\nselect(\'*\') rows returned or passed on whole, so all columns may be needed:')
+        for path, query, line in whole:
+            print('  %-26s %s%s' % ('%s:%d' % (path, query.line), query.table,
+                                   ', used whole at line %d' % line if line != query.line else ''))
+    print('%d findings in %d of %d handlers%s' % (len(findings), len(counts), len(paths),
+                                                  ', %d failed' % failed if failed else ''), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,586 @@
+"""Benchmark the codemods on synthetic TSX of growing size.
+
+    python bench_codemods.py                                    # every codemod, 1k to 100k lines
+    python bench_codemods.py make_compact finish_buttons --sizes 1k,10k,100k,1m
+    python bench_codemods.py fix_tabs,fix_tab_badge --save      # record the baseline
+    python bench_codemods.py --corpus 10k > Synthetic.tsx       # just write a corpus
+
+generate() builds a component file shaped like AdminPanel.tsx before the
+scripts ran: nested motion.div wrappers, long Tailwind className strings,
+UsersView/TabButton blocks carrying the markup the scripts rewrite and one
+card-grid PendingView for refactor_pending, so every rule finds work and
+every lazy pattern has room to backtrack.  The corpus is seeded and the
+same for every codemod.  Every timed run gets its own copy of the text, so
+nothing cached for the previous run's string is reused.
+
+Each codemod runs over each size through codemod_runner.process_file (in
+memory, no write or validation) in a fresh process, so the peak RSS
+reported is that run's own.  The report gives the best of --repeat runs in
+lines/s, the peak RSS, and the rules whose time grows fastest with the
+input: the growth exponent between the two largest sizes is about 1 for a
+linear rule and 2 for one that went quadratic.  A size that runs past
+--timeout is reported and the larger sizes skipped.
+
+A rule table is also timed the way the scripts ran before the engine, one
+re.sub per rule in table order (see resub_chain); the "vs re.sub" column is
+the engine's time over that.
+
+Results are compared with the baseline (.codemod_cache/bench.json unless
+--baseline says otherwise) and --save records them.  Throughput more than
+--tolerance below the baseline, a timeout that was not there before, a
+rule that became superlinear or a rule table more than --tolerance slower
+than its re.sub chain is a regression and exits with status 1.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import sys
+import time
+
+import codemod_cache
+import codemod_runner
+
+BASELINE = os.path.join(codemod_cache.CACHE_DIR, 'bench.json')
+SIZES = '1k,10k,100k'
+TOLERANCE = 0.25
+# Growth exponent above which a rule or codemod counts as superlinear.
+SUPERLINEAR = 1.5
+# Rules faster than this at the largest size are noise, not hot spots.
+MIN_SECONDS = 0.001
+# Hot spot name for the time a run spends outside the individually timed rules.
+REST = '(rest of the run)'
+# Runs shorter than this vary too much between runs to flag a regression.
+MIN_RUN = 0.01
+
+_SUFFIXES = {'k': 1000, 'm': 1000000}
+_SCRIPT_MAIN = re.compile(r"^\s+script_main\('", re.M)
+
+_HEADER = '''import React, { useState, useEffect } from 'react'
+import { motion, AnimatePresence } from 'framer-motion'
+import { Check, ChevronRight, Ban, AlertCircle, Shield, Trash2, Loader2, Users, Clock } from 'lucide-react'
+
+interface User {
+    _id: string
+    name: string
+    email: string
+    role: string
+    isBanned: boolean
+    isRestricted: boolean
+    isTrusted: boolean
+    canUpload: boolean
+}
+'''
+
+_TAB_BUTTON = '''
+function %(name)s({ active, onClick, icon, label, count }: any) {
+    return (
+        <button onClick={onClick} className={`flex items-center gap-2 px-4 py-2 rounded-lg text-sm font-medium transition-all ${active ? 'bg-white dark:bg-gray-800 text-gray-900 dark:text-white shadow-sm' : 'text-gray-600 dark:text-gray-400 hover:bg-gray-200/50 dark:hover:bg-white/5'}`}>
+            {icon}
+            {label}
+            {count > 0 && <span className="bg-red-500 text-white text-[10px] px-1.5 py-0.5 rounded-full">{count}</span>}
+        </button>
+    )
+}
+'''
+
+_PENDING_VIEW = '''
+function PendingView({ resources, processingId, onAction }: any) {
+    if (resources.length === 0) {
+        return (
+            <div className="flex flex-col items-center justify-center h-64 text-gray-400 bg-white dark:bg-gray-900 rounded-xl border border-gray-200 dark:border-gray-800">
+                <Check size={48} className="mb-4 opacity-20" />
+                <p>No pending approvals</p>
+            </div>
+        )
+    }
+
+    return (
+        <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
+            {resources.map((resource: any) => (
+                <motion.div key={resource._id} initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} className="bg-white dark:bg-gray-900 rounded-xl border border-gray-200 dark:border-gray-800 p-5 space-y-4">
+                    <div className="flex items-start justify-between gap-4">
+                        <div className="min-w-0">
+                            <h3 className="font-semibold text-gray-900 dark:text-white truncate">{resource.title}</h3>
+                            <p className="text-sm text-gray-500 dark:text-gray-400">{resource.uploaderName}</p>
+                        </div>
+                        <span className="px-2 py-1 rounded-md text-xs font-medium bg-yellow-50 text-yellow-700">Pending</span>
+                    </div>
+                    <div className="grid grid-cols-2 gap-2">
+                        <button onClick={() => onAction(resource._id, 'approve')} disabled={processingId === resource._id} className="px-4 py-2 rounded-lg text-sm font-medium bg-green-50 text-green-700 hover:bg-green-100">
+                            <Check size={16} />
+                            Approve
+                        </button>
+                        <button onClick={() => onAction(resource._id, 'reject')} disabled={processingId === resource._id} className="px-4 py-2 rounded-lg text-sm font-medium bg-red-50 text-red-700 hover:bg-red-100">
+                            <Ban size={16} />
+                            Reject
+                        </button>
+                    </div>
+                </motion.div>
+            ))}
+        </div>
+    )
+}
+'''
+
+_TABS = '''%(indent)s<div className="flex gap-1 p-1 bg-gray-200/50 dark:bg-white/5 rounded-xl w-max sm:w-auto">
+%(indent)s    <TabButton active={activeTab === 'pending'} onClick={() => setActiveTab('pending')} icon={<Clock size={16} />} label="Pending" count={%(n)d}>
+%(indent)s    </TabButton>
+%(indent)s    <TabButton active={activeTab === 'users'} onClick={() => setActiveTab('users')} icon={<Users size={16} />} label="Users" count={0}>
+%(indent)s    </TabButton>
+%(indent)s</div>
+'''
+
+_USER_CARD = '''%(indent)s<motion.div key={user._id} className="%(classes)s">
+%(indent)s    <button onClick={() => setExpandedUserId(isExpanded ? null : user._id)} className="w-full px-5 py-4 flex items-center gap-4 hover:bg-gray-50 dark:hover:bg-gray-800/50 transition-colors text-left">
+%(indent)s        <div className="h-12 w-12 rounded-xl overflow-hidden flex-shrink-0 bg-gray-100 dark:bg-gray-800">
+%(indent)s            <img src={user.avatar} alt={user.name} className="h-full w-full object-cover" />
+%(indent)s        </div>
+%(indent)s        <div className="flex-1 min-w-0">
+%(indent)s            <div className="font-semibold text-gray-900 dark:text-white truncate">{user.name}</div>
+%(indent)s            <div className="text-sm text-gray-500 dark:text-gray-400 truncate">{user.email}</div>
+%(indent)s        </div>
+%(indent)s        <ChevronRight className="text-gray-400" size={20} />
+%(indent)s    </button>
+%(indent)s    <div className="px-5 pb-5 pt-2 border-t border-gray-100 dark:border-gray-800 space-y-4">
+%(indent)s        <div className="text-xs font-bold text-gray-500 dark:text-gray-400 uppercase tracking-wider mb-2">Status</div>
+%(indent)s        <div className="flex flex-wrap gap-2">
+%(indent)s            {user.isBanned && <span className="px-3 py-1 rounded-lg text-xs font-bold border bg-red-50 text-red-700 border-red-200">Banned</span>}
+%(indent)s        </div>
+%(indent)s        <div className="flex items-center gap-2">
+%(indent)s            <select value={selectedRole} onChange={(e) => setSelectedRole(e.target.value)} className="flex-1 text-sm bg-gray-50 dark:bg-gray-800 border border-gray-200 dark:border-gray-700 rounded-lg px-3 py-2">
+%(indent)s                <option value="user">User</option>
+%(indent)s                <option value="admin">Admin</option>
+%(indent)s            </select>
+%(indent)s            <button
+%(indent)s                onClick={() => onAction(user._id, 'role', selectedRole)}
+%(indent)s                disabled={isProcessing}
+%(indent)s                className="px-4 py-2 bg-blue-600 text-white rounded-lg text-sm font-medium hover:bg-blue-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors flex items-center gap-2"
+%(indent)s            >
+%(indent)s                <Check size={16} />
+%(indent)s                Apply
+%(indent)s            </button>
+%(indent)s        </div>
+%(indent)s        <div className="grid grid-cols-1 sm:grid-cols-2 gap-2">
+%(indent)s            <button
+%(indent)s                onClick={() => onAction(user._id, user.isBanned ? 'unban' : 'ban')}
+%(indent)s                disabled={isProcessing}
+%(indent)s                className={`px-4 py-2.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 ${user.isBanned ? 'bg-green-50 text-green-700' : 'bg-red-50 text-red-700'}`}
+%(indent)s            >
+%(indent)s                <Ban size={16} />
+%(indent)s                {user.isBanned ? 'Unban User' : 'Ban User'}
+%(indent)s            </button>
+%(indent)s            <button
+%(indent)s                onClick={() => onAction(user._id, user.isTrusted ? 'untrust' : 'trust')}
+%(indent)s                disabled={isProcessing}
+%(indent)s                className={`px-4 py-2.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 sm:col-span-2 ${user.isTrusted ? 'bg-gray-50 text-gray-700' : 'bg-blue-50 text-blue-700'}`}
+%(indent)s            >
+%(indent)s                <Shield size={16} />
+%(indent)s                {user.isTrusted ? 'Remove Trusted Status' : 'Mark as Trusted User'}
+%(indent)s            </button>
+%(indent)s        </div>
+%(indent)s        {isProcessing && (
+%(indent)s            <div className="flex items-center justify-center gap-2 text-sm text-blue-600 dark:text-blue-400 py-2">
+%(indent)s                <Loader2 size={16} className="animate-spin" />
+%(indent)s                Processing...
+%(indent)s            </div>
+%(indent)s        )}
+%(indent)s    </div>
+%(indent)s</motion.div>
+'''
+
+_CLASSES = (
+    'flex', 'grid', 'items-center', 'justify-between', 'gap-2', 'gap-4', 'px-3', 'px-4', 'py-2', 'py-2.5',
+    'rounded-lg', 'rounded-xl', 'border', 'border-gray-200', 'dark:border-gray-800', 'bg-white',
+    'dark:bg-gray-900', 'text-sm', 'text-xs', 'font-medium', 'font-semibold', 'text-gray-900',
+    'dark:text-white', 'text-gray-500', 'dark:text-gray-400', 'shadow-sm', 'hover:bg-gray-50',
+    'dark:hover:bg-gray-800/50', 'transition-colors', 'overflow-hidden', 'truncate', 'min-w-0',
+    'sm:px-6', 'md:grid-cols-2', 'lg:grid-cols-3', 'space-y-3', 'w-full', 'h-full', 'relative',
+)
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500."""
+    text = text.strip().lower()
+    scale = _SUFFIXES.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def format_size(lines):
+    for suffix, scale in (('m', 1000000), ('k', 1000)):
+        if lines >= scale and lines % scale == 0:
+            return '%d%s' % (lines // scale, suffix)
+    return str(lines)
+
+
+def generate(lines, seed=0, depth=3, classes=24):
+    """A synthetic AdminPanel-like component file of about lines lines.
+
+    Every block is a UsersView wrapped in depth nested motion.divs, with
+    TabButton usages and its own TabButton definition (the first one is the
+    TabButton the scripts look for); the first block also defines the
+    PendingView refactor_pending replaces.  className strings are classes
+    random Tailwind classes long.
+    """
+    rng = random.Random(seed)
+    parts = [_HEADER]
+    total = _HEADER.count('\n')
+    n = 0
+    while total < lines:
+        block = [_TAB_BUTTON % {'name': 'TabButton' if n == 0 else 'TabButton%d' % n}]
+        if n == 0:
+            block.append(_PENDING_VIEW)
+        block.append('\nfunction UsersView%d({ users, processingId, onAction }: any) {\n' % n)
+        block.append('    const [expandedUserId, setExpandedUserId] = useState<string | null>(null)\n')
+        block.append("    const [activeTab, setActiveTab] = useState('users')\n")
+        block.append('    return (\n')
+        indent = ' ' * 8
+        for _ in range(depth):
+            block.append('%s<motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }} className="%s">\n'
+                         % (indent, ' '.join(rng.sample(_CLASSES, min(classes, len(_CLASSES))))))
+            indent += '    '
+        block.append(_TABS % {'indent': indent, 'n': n})
+        block.append('%s{users.map((user: User) => {\n' % indent)
+        block.append('%s    const isExpanded = expandedUserId === user._id\n' % indent)
+        block.append('%s    const isProcessing = processingId === user._id\n' % indent)
+        block.append('%s    return (\n' % indent)
+        block.append(_USER_CARD % {'indent': indent + ' ' * 8,
+                                   'classes': ' '.join(rng.sample(_CLASSES, min(classes, len(_CLASSES))))})
+        block.append('%s    )\n' % indent)
+        block.append('%s})}\n' % indent)
+        for _ in range(depth):
+            indent = indent[:-4]
+            block.append('%s</motion.div>\n' % indent)
+        block.append('    )\n}\n')
+        text = ''.join(block)
+        parts.append(text)
+        total += text.count('\n')
+        n += 1
+    return ''.join(parts)
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return _peak_working_set()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _peak_working_set():
+    if sys.platform != 'win32':
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (name, ctypes.c_size_t) for name in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')]
+
+    counters = Counters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.PeakWorkingSetSize
+
+
+def resub_chain(table, text):
+    """Apply a RuleSet's rules as one re.sub each, in table order.
+
+    Only for timing: each rule sees the previous rule's output, as the
+    scripts did before codemod_engine, so the result can differ from
+    table.apply(text).
+    """
+    for rule in table.rules:
+        template = rule.replacement
+
+        def sub(segment, rule=rule, template=template):
+            return re.sub(rule.pattern, template, segment, count=rule.count, flags=rule.flags)
+
+        if rule.scope is None:
+            text = sub(text)
+        elif callable(rule.scope):
+            out = []
+            last = 0
+            for start, end in sorted(rule.scope(text)):
+                if start < last:
+                    continue
+                out += [text[last:start], sub(text[start:end])]
+                last = end
+            text = ''.join(out) + text[last:]
+        else:
+            text = re.sub(rule.scope, lambda m: sub(m.group()), text)
+    return text
+
+
+def _fresh(text):
+    """An equal but distinct str, so no run sees what the last one cached for its text."""
+    return (text + ' ')[:-1]
+
+
+def _best(function, text, repeat):
+    best = None
+    for _ in range(repeat):
+        copy = _fresh(text)
+        start = time.perf_counter()
+        function(copy)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def measure(codemod, lines, seed=0, repeat=3):
+    """Run codemod over a generated corpus; returns a dict of measurements."""
+    text = generate(lines, seed)
+    path = 'Synthetic%s.tsx' % format_size(lines)
+    process = codemod_runner.process_file
+    best = None
+    for _ in range(repeat):
+        copy = _fresh(text)
+        start = time.perf_counter()
+        result = process(codemod, path, copy, keep_output=False, write=False, validate=False)
+        seconds = time.perf_counter() - start
+        if result.status == codemod_runner.FAILED:
+            raise RuntimeError(result.detail)
+        best = seconds if best is None else min(best, seconds)
+    rules = {}
+    for _ in range(repeat):
+        seen = {}
+        for t in process(codemod, path, _fresh(text), write=False, validate=False, profile=True).timings or ():
+            seen[t.name] = seen.get(t.name, 0.0) + t.seconds
+        rules = {name: min(seconds, rules.get(name, seconds)) for name, seconds in seen.items()}
+    # Rules are timed one by one; what the real run spends beyond them is the
+    # combined scan, the splicing and any transform() code around the rules.
+    rules[REST] = max(0.0, best - sum(rules.values()))
+    run = {'lines': text.count('\n'), 'chars': len(text), 'seconds': best,
+           'changed': result.status == codemod_runner.CHANGED, 'rules': rules, 'rss': peak_rss()}
+    table = codemod_runner.rule_table(codemod)
+    if table is not None:
+        run['engine'] = _best(table.apply, text, repeat)
+        run['resub'] = _best(lambda copy: resub_chain(table, copy), text, repeat)
+    return run
+
+
+def _child(conn, codemod, lines, seed, repeat):
+    try:
+        conn.send(measure(codemod, lines, seed, repeat))
+    except Exception as e:
+        conn.send({'error': '%s: %s' % (type(e).__name__, e)})
+    conn.close()
+
+
+def measure_isolated(codemod, lines, seed=0, repeat=3, timeout=None):
+    """measure() in a fresh process; {'timeout': seconds} if it runs too long."""
+    import multiprocessing
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(sender, codemod, lines, seed, repeat), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return {'timeout': timeout}
+        return receiver.recv()
+    except EOFError:
+        return {'error': 'worker exited with status %s' % process.exitcode}
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+
+def growth(small, large):
+    """Growth exponent of a time between two (lines, seconds) points."""
+    (n1, t1), (n2, t2) = small, large
+    if t1 <= 0 or t2 <= 0 or n2 <= n1:
+        return None
+    return math.log(t2 / t1) / math.log(n2 / n1)
+
+
+def codemods():
+    """Every script in the root that runs through codemod_runner.script_main."""
+    names = []
+    for entry in sorted(os.listdir(codemod_runner.ROOT)):
+        if entry.endswith('.py'):
+            with open(os.path.join(codemod_runner.ROOT, entry), encoding='utf-8') as f:
+                if _SCRIPT_MAIN.search(f.read()):
+                    names.append(entry[:-3])
+    return names
+
+
+def hot_spots(runs, limit=3):
+    """The slowest rules of one codemod's runs (dicts from measure()).
+
+    Returns (rule, seconds, ns per char, growth) at the largest size,
+    slowest first; growth is None with a single size.
+    """
+    runs = [r for r in runs if 'rules' in r]
+    if not runs:
+        return []
+    largest = runs[-1]
+    previous = runs[-2] if len(runs) > 1 else None
+    spots = []
+    for name, seconds in largest['rules'].items():
+        if seconds < MIN_SECONDS:
+            continue
+        exponent = None
+        if previous is not None and name in previous['rules']:
+            exponent = growth((previous['lines'], previous['rules'][name]), (largest['lines'], seconds))
+        spots.append((name, seconds, seconds * 1e9 / largest['chars'], exponent))
+    spots.sort(key=lambda s: -s[1])
+    return spots[:limit]
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = load_baseline(path) or {}
+    data['python'] = platform.python_version()
+    data['machine'] = platform.machine()
+    codemods = data.setdefault('codemods', {})
+    for codemod, runs in results.items():
+        entry = codemods.setdefault(codemod, {})
+        for size, run in runs:
+            entry[str(size)] = _summary(run)
+        entry['hot'] = [[name, exponent] for name, _, _, exponent in hot_spots([r for _, r in runs])]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def _summary(run):
+    if 'timeout' in run:
+        return {'timeout': run['timeout']}
+    if 'error' in run:
+        return {'error': run['error']}
+    return {'lines_per_s': run['lines'] / run['seconds'] if run['seconds'] else None, 'rss': run['rss']}
+
+
+def regressions(codemod, runs, baseline, tolerance=TOLERANCE):
+    """Messages for runs that are worse than the baseline entry or than their re.sub chain."""
+    problems = []
+    for size, run in runs:
+        if run.get('resub', 0) >= MIN_RUN and run['engine'] > run['resub'] * (1 + tolerance):
+            problems.append('%s at %s lines: rule engine %.1f ms, one re.sub per rule %.1f ms' % (
+                codemod, format_size(size), run['engine'] * 1e3, run['resub'] * 1e3))
+    if not baseline:
+        return problems
+    for size, run in runs:
+        before = baseline.get(str(size))
+        if not before or 'lines_per_s' not in before:
+            continue
+        if 'timeout' in run:
+            problems.append('%s at %s lines: timed out, was %.0f lines/s'
+                            % (codemod, format_size(size), before['lines_per_s']))
+        elif 'seconds' in run and run['seconds'] >= MIN_RUN and before['lines_per_s']:
+            rate = run['lines'] / run['seconds']
+            if rate < before['lines_per_s'] * (1 - tolerance):
+                problems.append('%s at %s lines: %.0f lines/s, baseline %.0f (%+.0f%%)' % (
+                    codemod, format_size(size), rate, before['lines_per_s'],
+                    (rate / before['lines_per_s'] - 1) * 100))
+    was = {name: exponent for name, exponent in baseline.get('hot', ())}
+    for name, _, _, exponent in hot_spots([r for _, r in runs]):
+        if exponent is not None and exponent > SUPERLINEAR and (was.get(name) or 0) <= SUPERLINEAR:
+            problems.append('%s: %s now grows as n^%.2f' % (codemod, name, exponent))
+    return problems
+
+
+def _rate(lines_per_second):
+    for suffix, scale in (('M', 1e6), ('k', 1e3)):
+        if lines_per_second >= scale:
+            return '%.1f%s' % (lines_per_second / scale, suffix)
+    return '%.0f' % lines_per_second
+
+
+def report_run(codemod, size, run, baseline, out=sys.stdout):
+    prefix = '%-34s %7s' % (codemod, format_size(size))
+    if 'timeout' in run:
+        print('%s  timed out after %ss' % (prefix, run['timeout']), file=out, flush=True)
+        return
+    if 'error' in run:
+        print('%s  failed: %s' % (prefix, run['error']), file=out, flush=True)
+        return
+    rate = run['lines'] / run['seconds'] if run['seconds'] else float('inf')
+    rss = '%8.1f' % (run['rss'] / 2 ** 20) if run['rss'] else '%8s' % '-'
+    versus = '%8.2fx' % (run['engine'] / run['resub']) if run.get('resub') else '%9s' % '-'
+    line = '%s %10.2f %9s/s %s %8s %s' % (prefix, run['seconds'] * 1e3, _rate(rate), rss,
+                                           'yes' if run['changed'] else 'no', versus)
+    before = (baseline or {}).get(str(size))
+    if before and before.get('lines_per_s'):
+        line += ' %+8.0f%%' % ((rate / before['lines_per_s'] - 1) * 100)
+    print(line, file=out, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the codemods on synthetic TSX.')
+    parser.add_argument('codemods', nargs='*',
+                        help='codemod names or comma chains (default: every codemod script)')
+    parser.add_argument('--sizes', default=SIZES, help='corpus sizes in lines (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size, best counts (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='corpus seed (default: 0)')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='seconds before a size is abandoned (default: 120)')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='record the results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='throughput drop that counts as a regression (default: 0.25)')
+    parser.add_argument('--corpus', metavar='SIZE', help='print a corpus of SIZE lines and exit')
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        sys.stdout.write(generate(parse_size(args.corpus), args.seed))
+        return 0
+    sizes = sorted(parse_size(s) for s in args.sizes.split(','))
+    baseline = (load_baseline(args.baseline) or {}).get('codemods', {})
+    print('%-34s %7s %10s %11s %8s %8s %9s %9s' % ('codemod', 'lines', 'ms', 'throughput', 'peak MB', 'changed',
+                                                  'vs re.sub', 'baseline'))
+    results = {}
+    problems = []
+    for codemod in args.codemods or codemods():
+        runs = []
+        for size in sizes:
+            run = measure_isolated(codemod, size, args.seed, args.repeat, args.timeout)
+            report_run(codemod, size, run, baseline.get(codemod))
+            runs.append((size, run))
+            if 'timeout' in run or 'error' in run:
+                break
+        results[codemod] = runs
+        problems += regressions(codemod, runs, baseline.get(codemod), args.tolerance)
+
+    print('\nhot spots (growth: 1 is linear, 2 quadratic)')
+    for codemod, runs in results.items():
+        for name, seconds, per_char, exponent in hot_spots([r for _, r in runs]):
+            line = '  %-60s %9.2f ms %7.1f ns/char' % ('%s: %s' % (codemod, name), seconds * 1e3, per_char)
+            if exponent is not None:
+                line += '  growth %.2f' % exponent
+                if exponent > SUPERLINEAR:
+                    line += '  SUPERLINEAR'
+            print(line)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print('\nbaseline saved to %s' % args.baseline)
+    if problems:
+        print('\nregressions:')
+        for problem in problems:
+            print('  ' + problem)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Persistent cache of codemod results.
+
+Entries are keyed by (hash of the file content, hash of the codemod) and hold
+either "unchanged" or the transformed content, so re-running a codemod over
+files it has already seen skips the regex work entirely.  The cache lives in
+one SQLite file and is trimmed to the most recently used entries on close.
+"""
+import hashlib
+import os
+import sqlite3
+import zlib
+
+import codemod_engine
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.codemod_cache')
+DEFAULT_PATH = os.path.join(CACHE_DIR, 'results.sqlite')
+DEFAULT_SIZE = 4096
+
+# Marker stored for "the codemod leaves this content unchanged".
+UNCHANGED = b''
+
+
+def content_hash(data):
+    """Hash of file content; accepts bytes or str."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def codemod_hash(*paths):
+    """Hash of a codemod: the sources of its module files plus the engine that runs it."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted({os.path.abspath(p) for p in paths + (codemod_engine.__file__,)}):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class Cache:
+    """(content hash, codemod hash) -> result, with LRU eviction."""
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=DEFAULT_SIZE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(path)
+        self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                         'key TEXT PRIMARY KEY, output BLOB NOT NULL, used INTEGER NOT NULL)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_used ON results (used)')
+        row = self._db.execute('SELECT MAX(used) FROM results').fetchone()
+        self._clock = row[0] or 0
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def get(self, content_key, codemod_key):
+        """Return None on a miss, UNCHANGED, or the transformed content."""
+        key = content_key + codemod_key
+        row = self._db.execute('SELECT output FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute('UPDATE results SET used = ? WHERE key = ?', (self._tick(), key))
+        if row[0] == UNCHANGED:
+            return UNCHANGED
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, content_key, codemod_key, output=None):
+        """Record a result (str or UTF-8 bytes); None means the codemod changed nothing."""
+        if isinstance(output, str):
+            output = output.encode('utf-8')
+        stored = UNCHANGED if output is None else zlib.compress(output)
+        self._db.execute('INSERT OR REPLACE INTO results (key, output, used) VALUES (?, ?, ?)',
+                         (content_key + codemod_key, stored, self._tick()))
+
+    def close(self):
+        """Evict least recently used entries beyond max_entries and save."""
+        self._db.execute('DELETE FROM results WHERE key NOT IN '
+                         '(SELECT key FROM results ORDER BY used DESC LIMIT ?)', (self.max_entries,))
+        self._db.commit()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,262 @@
+"""Single-pass rule engine for the codemod scripts.
+
+A codemod is a table of rules.  Each rule is a regex, a replacement and an
+optional scope.  Every rule searches the source for its next match and the
+matches are merged by position, so the source is walked once, left to right,
+and the output is built in a single buffer instead of one full copy of the
+file per re.sub call.  A rule is only searched again once an edit has passed
+its pending match.
+
+Rules see the original text, not each other's output: at any position the
+first rule in table order that matches wins, and scanning resumes after the
+match.  Tables that relied on chaining one re.sub into the next must be
+written so their patterns match the original source.
+"""
+import bisect
+import copy
+import heapq
+import re
+import time
+from collections import namedtuple
+
+# pattern      regex source
+# replacement  re.sub-style template, or a callable taking the match
+# scope        None (whole file), a regex whose matches are the regions the
+#              rule may touch, or a callable text -> [(start, end), ...]
+# flags        re flags for this rule only (I, M, S, X, A)
+# count        maximum number of replacements, 0 for unlimited
+# name         label used in reports, defaults to the rule's position
+Rule = namedtuple('Rule', 'pattern replacement scope flags count name', defaults=(None, 0, 0, None))
+
+# One rule's cost on one text, as measured by RuleSet.profile(): start is a
+# time.perf_counter() timestamp, scanned the number of characters searched.
+RuleTiming = namedtuple('RuleTiming', 'name start seconds matches scanned')
+
+# Escapes in a replacement template: group 1 is a \g<...> reference, group 2
+# an octal escape and group 3 a numbered reference (\1 to \99).
+_TEMPLATE_ESCAPE = re.compile(r'\\(?:g<([^>]*)>|([1-7][0-7]{2})|([1-9][0-9]?)|.)', re.S)
+_NO_GROUPS = re.match('', '')
+
+
+def literal(old, new, **kwargs):
+    """Rule for a plain str.replace()."""
+    return Rule(re.escape(old), new.replace('\\', '\\\\'), **kwargs)
+
+
+def _expander(template, regex, encoding=None):
+    """Match -> replacement for an re.sub-style template, parsed once.
+
+    Match.expand parses its template again on every call, which is most of
+    the cost of a rule that makes many edits.
+    """
+    literals = []
+    groups = []
+    last = 0
+    for m in _TEMPLATE_ESCAPE.finditer(template):
+        reference = m.group(1) if m.group(3) is None else m.group(3)
+        if reference is None:
+            continue
+        key = int(reference) if reference.isdigit() else reference
+        if key not in regex.groupindex and not (isinstance(key, int) and key <= regex.groups):
+            raise re.error('invalid group reference %s' % m.group())
+        literals.append(template[last:m.start()])
+        groups.append(key)
+        last = m.end()
+    literals.append(template[last:])
+    # What is left are plain text and escapes such as \n and \\.
+    literals = [_NO_GROUPS.expand(literal) for literal in literals]
+    if encoding:
+        literals = [literal.encode(encoding) for literal in literals]
+    head = literals[0]
+    tail = list(zip(groups, literals[1:]))
+    empty = head[:0]
+
+    def expand(match):
+        group = match.group
+        out = [head]
+        for key, literal in tail:
+            out.append(group(key) or empty)
+            out.append(literal)
+        return empty.join(out)
+
+    return expand
+
+
+def _merge(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RuleSet:
+    """A compiled rule table."""
+
+    def __init__(self, rules):
+        self.rules = [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+        self.names = []
+        self._regexes = []
+        self._templates = []
+        for i, rule in enumerate(self.rules):
+            name = rule.name or 'rule %d' % (i + 1)
+            try:
+                regex = re.compile(rule.pattern, rule.flags)
+            except re.error as e:
+                raise ValueError('%s: bad pattern: %s' % (name, e)) from None
+            try:
+                template = self._template(rule.replacement, regex)
+            except re.error as e:
+                raise ValueError('%s: bad replacement: %s' % (name, e)) from None
+            self.names.append(name)
+            self._regexes.append(regex)
+            self._templates.append(template)
+        self._replacements = [rule.replacement for rule in self.rules]
+        self._bytes = False
+
+    @staticmethod
+    def _template(replacement, regex, encoding=None):
+        # Templates without escapes are copied verbatim; the others (\1,
+        # \g<name> and friends) become a function of the match.
+        if callable(replacement):
+            return replacement
+        if '\\' not in replacement:
+            return None
+        return _expander(replacement, regex, encoding)
+
+    def _regions(self, text):
+        regions = {}
+        for rule in self.rules:
+            scope = rule.scope
+            if scope is None or scope in regions:
+                continue
+            if callable(scope):
+                spans = scope(text)
+            else:
+                source = scope.encode('ascii') if self._bytes else scope
+                spans = [m.span() for m in re.finditer(source, text)]
+            spans = _merge(spans)
+            regions[scope] = ([s for s, _ in spans], spans)
+        return regions
+
+    def scan(self, text, spans=None):
+        """Yield (start, end, replacement, rule_index) for every edit, in order.
+
+        spans, a list of (start, end), limits the scan to those regions of
+        text: a match has to lie inside one of them, as if each region were
+        the whole text.  Scopes and counts still apply.
+        """
+        rules = self.rules
+        regexes = self._regexes
+        templates = self._templates
+        replacements = self._replacements
+        regions = self._regions(text)
+        hits = [0] * len(rules)
+
+        def in_scope(i, start, end):
+            scope = rules[i].scope
+            if scope is None:
+                return True
+            starts, bounds = regions[scope]
+            k = bisect.bisect_right(starts, start) - 1
+            return k >= 0 and end <= bounds[k][1]
+
+        for pos, length in [(0, len(text))] if spans is None else _merge(spans):
+            # Every rule's next match at or after pos, as (start, rule, match):
+            # the smallest is the leftmost match, ties going to the earlier rule.
+            heap = []
+            for i, rule in enumerate(rules):
+                if not rule.count or hits[i] < rule.count:
+                    m = regexes[i].search(text, pos, length)
+                    if m is not None:
+                        heap.append((m.start(), i, m))
+            heapq.heapify(heap)
+            while heap and pos <= length:
+                start, i, match = heap[0]
+                if start < pos or not in_scope(i, start, match.end()):
+                    # Overtaken by an earlier edit, or out of scope here: look
+                    # for the rule's next match.  Past the end there is none:
+                    # search() would find the same empty match at the end again.
+                    retry = start + 1 if start >= pos else pos
+                    match = regexes[i].search(text, retry, length) if retry <= length else None
+                    if match is None:
+                        heapq.heappop(heap)
+                    else:
+                        heapq.heapreplace(heap, (match.start(), i, match))
+                    continue
+                template = templates[i]
+                replacement = replacements[i] if template is None else template(match)
+                end = match.end()
+                hits[i] += 1
+                yield start, end, replacement, i
+                if rules[i].count and hits[i] >= rules[i].count:
+                    heapq.heappop(heap)
+                pos = end if end > start else end + 1
+
+    def profile(self, text, clock=time.perf_counter):
+        """Time every rule on its own over text; returns a list of RuleTiming.
+
+        Each rule's regex is run by itself over its scope, so a pattern that
+        backtracks badly shows up under its own name instead of hiding in
+        the merged scan.  Matches count every non-overlapping match
+        in scope, ignoring count limits and the other rules.
+        """
+        timings = []
+        start = clock()
+        regions = self._regions(text)
+        if regions:
+            timings.append(RuleTiming('(scopes)', start, clock() - start, 0, len(text) * len(regions)))
+        whole = [(0, len(text))]
+        for i, rule in enumerate(self.rules):
+            spans = whole if rule.scope is None else regions[rule.scope][1]
+            finditer = self._regexes[i].finditer
+            matches = scanned = 0
+            start = clock()
+            for a, b in spans:
+                for _ in finditer(text, a, b):
+                    matches += 1
+                scanned += b - a
+            timings.append(RuleTiming(self.names[i], start, clock() - start, matches, scanned))
+        return timings
+
+    def apply(self, text):
+        """Return text with every rule applied in one pass."""
+        out = []
+        last = 0
+        for start, end, replacement, _ in self.scan(text):
+            out.append(text[last:start])
+            out.append(replacement)
+            last = end
+        if not out:
+            return text
+        out.append(text[last:])
+        return text[:0].join(out)
+
+    def encoded(self):
+        """This table for UTF-8 bytes, such as an mmap of the file.
+
+        Returns None unless every pattern and scope is ASCII and every
+        replacement a string.  The result only agrees with the str table on
+        ASCII input: on bytes, . and negated classes match single bytes of a
+        multi-byte character, and \\s, \\w, \\d, \\b and case folding keep
+        their ASCII meaning.
+        """
+        if any(callable(r.replacement) or callable(r.scope) for r in self.rules):
+            return None
+        sources = [r.pattern for r in self.rules] + [r.scope for r in self.rules if r.scope is not None]
+        if not all(source.isascii() for source in sources):
+            return None
+        table = copy.copy(self)
+        table._bytes = True
+        table._regexes = [re.compile(r.pattern.encode('ascii'), r.flags) for r in self.rules]
+        table._templates = [t if t is None else self._template(r.replacement, regex, 'utf-8')
+                            for t, r, regex in zip(self._templates, self.rules, table._regexes)]
+        table._replacements = [r.encode('utf-8') for r in self._replacements]
+        return table
+
+
+def compile_rules(rules):
+    return RuleSet(rules)
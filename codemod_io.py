@@ -0,0 +1,115 @@
+"""File I/O for the codemods: mapped reads and atomic writes.
+
+    with codemod_io.source(path) as data:    # mmap of the file (bytes-like)
+        edits = list(ruleset.encoded().scan(data))
+    codemod_io.write_atomic(path, new_data)
+
+Reads map the file instead of copying it into a str, so a rule table can
+scan it with bytes regexes straight from the page cache.  Writes go to a
+temp file in the same directory that then replaces the original with
+os.replace, so a crash or a failed worker leaves either the old or the new
+file, never a truncated one.  write_all does the same for a set of files:
+every new file is written out first, and only then are the originals
+replaced.  write_if_changed skips the write (and the
+mtime bump that wakes up Vite) when the content is already identical.
+"""
+import contextlib
+import mmap
+import os
+import re
+import shutil
+import tempfile
+
+_NON_ASCII = re.compile(rb'[\x80-\xff]')
+
+
+@contextlib.contextmanager
+def source(path):
+    """Map path read-only; yields a bytes-like buffer, valid inside the block."""
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            yield b''
+            return
+        with data:
+            yield data
+
+
+def read_text(path):
+    """Return the content of path as str, newlines untouched."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def is_ascii(data):
+    return _NON_ASCII.search(data) is None
+
+
+def _stage(path, data):
+    """Write data to a temp file next to path; returns the temp file's path."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(prefix='.%s.' % name, suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            shutil.copymode(path, temp)
+        except OSError:
+            pass
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp)
+        raise
+    return temp
+
+
+def write_atomic(path, data):
+    """Replace the content of path with data (str or bytes) atomically."""
+    temp = _stage(path, data)
+    try:
+        os.replace(temp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp)
+        raise
+
+
+def write_all(files):
+    """Replace several files, given as (path, data) pairs, all or none.
+
+    Nothing is replaced unless every new file could be written in full;
+    the renames that follow are the only step that can leave a mix.
+    """
+    staged = []
+    try:
+        for path, data in files:
+            staged.append((_stage(path, data), path))
+        while staged:
+            temp, path = staged[0]
+            os.replace(temp, path)
+            staged.pop(0)
+    finally:
+        for temp, _ in staged:
+            with contextlib.suppress(OSError):
+                os.remove(temp)
+
+
+def write_if_changed(path, data):
+    """write_atomic unless path already holds exactly data; returns True if written."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data):
+            with source(path) as current:
+                if current[:] == data:
+                    return False
+    except OSError:
+        pass
+    write_atomic(path, data)
+    return True
@@ -0,0 +1,95 @@
+"""Per-rule timing for codemods.
+
+    python codemod_runner.py finish_buttons 'src/**/*.tsx' --dry-run --profile
+    python codemod_runner.py make_compact src/components/AdminPanel.tsx --trace trace.json
+
+Rule tables are timed rule by rule (RuleSet.profile), so an expensive
+pattern shows up under its own name with its wall time, match count and the
+characters it was searched over.  Codemods that only define transform()
+are timed as a whole, plus their RULES if they have any.
+
+The report is sorted by total time and flags rules whose worst file took
+longer than the slow threshold.  The trace is Chrome trace-event JSON: open
+it in chrome://tracing or https://ui.perfetto.dev to see every rule on every
+file laid out per worker process.
+"""
+import os
+import sys
+import time
+
+from codemod_engine import RuleSet, RuleTiming, compile_rules
+
+SLOW = 0.05  # seconds for one rule on one file
+
+
+def profile_text(module, scanner, text, clock=time.perf_counter):
+    """Return a list of RuleTiming for one codemod on one text."""
+    if isinstance(scanner, RuleSet):
+        return scanner.profile(text, clock)
+    timings = []
+    if scanner is not None:
+        start = clock()
+        edits = sum(1 for _ in scanner.scan(text))
+        timings.append(RuleTiming('(%s)' % type(scanner).__name__, start, clock() - start, edits, len(text)))
+        return timings
+    start = clock()
+    changed = module.transform(text) != text
+    timings.append(RuleTiming('transform()', start, clock() - start, int(changed), len(text)))
+    if hasattr(module, 'RULES'):
+        timings.extend(compile_rules(module.RULES).profile(text, clock))
+    return timings
+
+
+class Profile:
+    """Timings collected over a run, per rule and per file."""
+
+    def __init__(self):
+        self.order = []
+        self.totals = {}
+        self.events = []
+
+    def add(self, path, timings, pid=None):
+        pid = os.getpid() if pid is None else pid
+        for t in timings:
+            total = self.totals.get(t.name)
+            if total is None:
+                self.order.append(t.name)
+                total = self.totals[t.name] = [0.0, 0, 0, 0.0, None]
+            total[0] += t.seconds
+            total[1] += t.matches
+            total[2] += t.scanned
+            if t.seconds > total[3]:
+                total[3] = t.seconds
+                total[4] = path
+            self.events.append((pid, path, t))
+
+    def report(self, out=sys.stdout, slow=SLOW):
+        """Print rules sorted by total time, slowest first."""
+        if not self.totals:
+            return
+        rows = sorted(self.order, key=lambda name: -self.totals[name][0])
+        width = max(len(name) for name in rows + ['rule'])
+        print('%-*s  %10s  %8s  %10s  %8s  %s' % (width, 'rule', 'total ms', 'matches', 'chars', 'ns/char',
+                                                   'slowest file'), file=out)
+        for name in rows:
+            seconds, matches, scanned, worst, path = self.totals[name]
+            line = '%-*s  %10.2f  %8d  %10d  %8.1f  %s (%.2f ms)' % (
+                width, name, seconds * 1e3, matches, scanned, seconds * 1e9 / scanned if scanned else 0,
+                path, worst * 1e3)
+            if worst > slow:
+                line += '  SLOW'
+            print(line, file=out)
+
+    def trace(self, path):
+        """Write the timings as Chrome trace-event JSON."""
+        import json
+        origin = min((t.start for _, _, t in self.events), default=0)
+        events = []
+        for pid, file, t in self.events:
+            events.append({
+                'name': t.name, 'cat': 'rule', 'ph': 'X', 'pid': pid, 'tid': 0,
+                'ts': round((t.start - origin) * 1e6, 3), 'dur': round(t.seconds * 1e6, 3),
+                'args': {'file': file, 'matches': t.matches, 'scanned': t.scanned},
+            })
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
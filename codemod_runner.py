@@ -0,0 +1,525 @@
+"""Run a codemod over many files in parallel.
+
+    python codemod_runner.py make_compact 'src/**/*.tsx' 'src/pages/*.tsx'
+    python codemod_runner.py fix_tabs src/components/AdminPanel.tsx -j 1
+    python codemod_runner.py densify 'src/**/*.tsx' --dry-run --stats > densify.diff
+    python codemod_runner.py fix_tabs,fix_tab_badge,add_animations src/components/AdminPanel.tsx
+
+A codemod is any importable module that defines transform(content) -> new
+content or, failing that, RULES (a rule table for codemod_engine, or a list
+of tw_classes.ClassRule plus optional PROPS).  Files are fanned out over a
+process pool and each result is printed as soon as its file is done,
+followed by a changed/unchanged/failed summary.  Results are cached by
+content (see codemod_cache), so re-runs only touch files that changed.
+
+Several codemods separated by commas run as a chain: each file is read
+once, every codemod in turn applies its edits to an in-memory piece table
+(see edit_buffer) and the result is written once.  A codemod that rewrites
+text an earlier one inserted fails the file instead of silently clobbering
+it, unless --allow-overlap is given.
+
+--dry-run writes nothing and streams a unified diff per changed file to
+stdout (statuses go to stderr).  --stats adds per-rule hit counts and bytes
+removed/added.  Both are built from the edit spans the rules report, so
+RULES codemods never diff whole files; transform() codemods only return
+text and are diffed around the changed lines (see span_diff).
+
+--profile times every rule on every file and prints the rules sorted by
+cost; --trace writes the same timings as a Chrome trace (see codemod_profile).
+
+Before a .ts/.tsx file is written its new content is tokenized (see
+tsx_validate); output that no longer parses is reported as failed and not
+written, unless the file did not parse before either.  --atomic makes the
+whole run all or nothing: it stops at the first failure and only writes
+once every file has succeeded.
+"""
+import argparse
+import glob
+import importlib
+import importlib.util
+import os
+import sys
+from collections import Counter, namedtuple
+
+import codemod_cache
+import codemod_engine
+import codemod_io
+import codemod_profile
+import edit_buffer
+import span_diff
+import tsx_validate
+
+# concurrent.futures is imported where it is needed: a one-file run from an
+# editor hook never starts a pool, and startup is most of its latency.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ADMIN_PANEL = os.path.join('src', 'components', 'AdminPanel.tsx')
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+# output  new content (only with keep_output), diff  unified diff (dry runs),
+# hits    Counter of rule name -> edits, removed/added  bytes (with stats)
+# timings list of codemod_engine.RuleTiming and pid of the worker (with profile)
+Result = namedtuple('Result', 'path status detail output diff hits removed added timings pid',
+                    defaults=(None, None, None, 0, 0, None, None))
+
+# A loaded codemod.  deps are the local source files it runs (see
+# _import), scanner is None for transform() codemods,
+# encoded is the bytes version of a rule table (see RuleSet.encoded) or None.
+Codemod = namedtuple('Codemod', 'path deps module transform scanner encoded')
+
+# Codemods already loaded (and compiled) by this process: name -> Codemod.
+_loaded = {}
+
+
+def _find(name):
+    """Path of the module that defines codemod name (a module name or .py path)."""
+    if name.endswith('.py'):
+        return os.path.abspath(name)
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        raise ImportError('no codemod named %r' % name)
+    return spec.origin
+
+
+def _local_modules(module, directory):
+    """Modules next to directory that module refers to at top level (import x, from x import y)."""
+    found = []
+    for value in list(vars(module).values()):
+        source = value if isinstance(value, type(sys)) else sys.modules.get(getattr(value, '__module__', None))
+        dep = getattr(source, '__file__', None)
+        if dep and os.path.dirname(os.path.abspath(dep)) == directory:
+            found.append(source)
+    return found
+
+
+def _import(path):
+    """Import the module at path; return it and the local sources it uses.
+
+    The sources are the module itself, the engine, and every module next to
+    it that it refers to at top level, and theirs in turn.  Only that module
+    is imported, so running one codemod never compiles the others.
+    """
+    directory, filename = os.path.split(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    module = importlib.import_module(filename[:-3])
+    deps = {path, os.path.abspath(codemod_engine.__file__)}
+    pending = [module]
+    while pending:
+        for source in _local_modules(pending.pop(), directory):
+            dep = os.path.abspath(source.__file__)
+            if dep not in deps:
+                deps.add(dep)
+                pending.append(source)
+    return module, sorted(deps)
+
+
+def _load(name):
+    loaded = _loaded.get(name)
+    if loaded is None:
+        path = _find(name)
+        loaded = _loaded[name] = _compile(path, *_import(path))
+    return loaded
+
+
+def _compile(path, module, deps):
+    name = module.__name__
+    if hasattr(module, 'transform'):
+        return Codemod(path, deps, module, module.transform, None, None)
+    if not hasattr(module, 'RULES'):
+        raise ValueError('%s defines neither RULES nor transform()' % name)
+    # A table of ClassRules had to import tw_classes to build them.
+    tw_classes = sys.modules.get('tw_classes')
+    if tw_classes is not None and any(isinstance(r, tw_classes.ClassRule) for r in module.RULES):
+        scanner = tw_classes.ClassRewriter(module.RULES, getattr(module, 'PROPS', None))
+        return Codemod(path, deps, module, scanner.apply, scanner, None)
+    scanner = codemod_engine.compile_rules(module.RULES)
+    return Codemod(path, deps, module, scanner.apply, scanner, scanner.encoded())
+
+
+def chain(codemod):
+    """The codemods a name stands for: 'fix_tabs,fix_tab_badge' is a chain of two."""
+    return codemod.split(',')
+
+
+def load_codemod(name):
+    """Return the transform function for a codemod module name or path."""
+    return _load(name).transform
+
+
+def rule_table(name):
+    """The codemod_engine.RuleSet a codemod runs, or None for other codemods and chains."""
+    if len(chain(name)) > 1:
+        return None
+    scanner = _load(name).scanner
+    return scanner if isinstance(scanner, codemod_engine.RuleSet) else None
+
+
+def rule_names(name):
+    """Names used in --stats for a codemod's rules (for a chain, its codemods)."""
+    if len(chain(name)) > 1:
+        return chain(name)
+    scanner = _load(name).scanner
+    return list(scanner.names) if scanner is not None else ['transform']
+
+
+def cache_key(name, allow_overlap=False, validate=True):
+    """Cache key for a codemod or chain.
+
+    It changes with the codemods' sources and the local modules they use,
+    and with the options that decide what gets written.
+    """
+    key = ''.join(codemod_cache.codemod_hash(*_load(n).deps) for n in chain(name))
+    if allow_overlap and len(chain(name)) > 1:
+        key += ':overlap'
+    return key if validate else key + ':unvalidated'
+
+
+def stage_edits(name, text, spans=None):
+    """The edits a codemod makes to text, trimmed to what they change.
+
+    spans limits a rule table to those regions of text (see RuleSet.scan).
+    transform() codemods, tw_classes tables and tables with counted rules
+    always see the whole text.  Returns (edits, whether spans applied).
+    """
+    codemod = _load(name)
+    limited = (spans is not None and isinstance(codemod.scanner, codemod_engine.RuleSet)
+               and not any(rule.count for rule in codemod.scanner.rules))
+    if limited:
+        edits = codemod.scanner.scan(text, spans)
+    elif codemod.scanner is not None:
+        edits = codemod.scanner.scan(text)
+    else:
+        edits = span_diff.edits_between(text, codemod.transform(text))
+    return edit_buffer.trim(text, edits), limited
+
+
+def _run_chain(names, content, profile=False, allow_overlap=False):
+    """Run the codemods names in turn over content, in one EditBuffer.
+
+    Returns (new content, net edits tagged with the codemod's index,
+    timings or None, conflicts allowed).  Raises EditConflict unless
+    allow_overlap.
+    """
+    buffer = edit_buffer.EditBuffer(content, strict=not allow_overlap, names=names)
+    timings = [] if profile else None
+    for stage, name in enumerate(names):
+        codemod = _load(name)
+        text = buffer.text()
+        if profile:
+            timings += [t._replace(name='%s: %s' % (name, t.name))
+                        for t in codemod_profile.profile_text(codemod.module, codemod.scanner, text)]
+        buffer.apply(stage_edits(name, text)[0], stage)
+    return buffer.text(), buffer.edits(), timings, buffer.conflicts
+
+
+def _apply_mapped(table, path):
+    """Run an encoded rule table over the mapped file.
+
+    Returns (True, new bytes or None if nothing changes), or (False, None)
+    when the file is not ASCII: bytes regexes only agree with their str
+    versions on ASCII input.
+    """
+    with codemod_io.source(path) as data:
+        if not codemod_io.is_ascii(data):
+            return False, None
+        edits = [e for e in table.scan(data) if data[e[0]:e[1]] != e[2]]
+        if not edits:
+            return True, None
+        return True, span_diff.apply_edits(data, edits)
+
+
+def _syntax_error(path, content, new_content):
+    """The TsxSyntaxError new_content has and content (None: read path) had not."""
+    if not tsx_validate.applies_to(path):
+        return None
+    if isinstance(new_content, bytes):
+        new_content = new_content.decode('utf-8')
+    error = tsx_validate.validate(new_content)
+    if error is not None:
+        if content is None:
+            content = codemod_io.read_text(path)
+        if tsx_validate.validate(content) is not None:
+            # Already broken (fix_escapes and friends): not the codemod's doing.
+            return None
+    return error
+
+
+def _broken(path, error, timings=None):
+    return Result(path, FAILED, 'output does not parse, not written: %s' % error, timings=timings, pid=os.getpid())
+
+
+def process_file(codemod, path, content=None, keep_output=False, dry_run=False, stats=False, profile=False,
+                 write=True, validate=True, allow_overlap=False):
+    """Apply a codemod to one file and return a Result.
+
+    output is the new content when keep_output is set and the file changed.
+    A dry run leaves the file alone and returns its diff instead, and so
+    does write=False, without the diff.  profile adds per-rule timings,
+    measured in a separate pass before the real one.  With validate, new
+    content that breaks the syntax of a TS/TSX file is not written and the
+    result is a failure.  A chain of codemods fails on conflicting edits
+    unless allow_overlap.
+
+    Plain runs of rule tables scan the mapped file as bytes; everything
+    else works on the decoded text.  Changed files are replaced atomically.
+    """
+    timings = None
+    try:
+        stages = chain(codemod)
+        if len(stages) == 1:
+            _, _, module, transform, scanner, encoded = _load(codemod)
+        else:
+            encoded = None
+        if content is None and encoded is not None and not (dry_run or stats or profile):
+            done, output = _apply_mapped(encoded, path)
+            if done:
+                if output is None:
+                    return Result(path, UNCHANGED, '', pid=os.getpid())
+                error = validate and _syntax_error(path, None, output)
+                if error:
+                    return _broken(path, error)
+                if write:
+                    codemod_io.write_atomic(path, output)
+                return Result(path, CHANGED, '', output if keep_output else None, pid=os.getpid())
+        if content is None:
+            content = codemod_io.read_text(path)
+        detail = ''
+        if len(stages) > 1:
+            new_content, edits, timings, conflicts = _run_chain(stages, content, profile, allow_overlap)
+            names = stages
+            if conflicts:
+                detail = '%d overlapping edits allowed' % len(conflicts)
+        else:
+            if profile:
+                timings = codemod_profile.profile_text(module, scanner, content)
+            if scanner is not None:
+                edits = list(scanner.scan(content))
+                new_content = span_diff.apply_edits(content, edits)
+            else:
+                new_content = transform(content)
+                edits = span_diff.edits_between(content, new_content) if dry_run or stats else []
+            names = scanner.names if scanner is not None else ()
+        if new_content == content:
+            return Result(path, UNCHANGED, '', timings=timings, pid=os.getpid())
+        error = validate and _syntax_error(path, content, new_content)
+        if error:
+            return _broken(path, error, timings)
+        if write and not dry_run:
+            codemod_io.write_atomic(path, new_content)
+        result = Result(path, CHANGED, detail, new_content if keep_output else None,
+                        timings=timings, pid=os.getpid())
+        if dry_run:
+            result = result._replace(diff=span_diff.unified_diff(content, edits, path))
+        if stats:
+            hits, removed, added = span_diff.stats(content, edits, names)
+            result = result._replace(hits=hits, removed=removed, added=added)
+        return result
+    except Exception as e:
+        return Result(path, FAILED, '%s: %s' % (type(e).__name__, e), timings=timings, pid=os.getpid())
+
+
+def expand(patterns):
+    """Expand glob patterns into a sorted list of unique files."""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        paths.update(p for p in matches if os.path.isfile(p))
+    return sorted(paths)
+
+
+def run(codemod, paths, jobs=None, cache=None, force=False, out=sys.stdout,
+        dry_run=False, stats=False, diff_out=None, profile=None, atomic=False, validate=True,
+        allow_overlap=False):
+    """Run a codemod over paths, printing each result as it arrives.
+
+    With a codemod_cache.Cache, files whose content the codemod has already
+    seen are answered from the cache without running it; force skips the
+    lookups but still records fresh results.  A dry run writes no files and
+    prints each diff to diff_out (default: out) as soon as it is ready;
+    stats prints per-rule hit counts and bytes changed after the summary.
+    Passing a codemod_profile.Profile collects per-rule timings into it;
+    profiled runs never answer from the cache.
+
+    atomic holds every write back until all files are done and writes
+    nothing if any failed; the first failure cancels the files not started
+    yet.  validate and allow_overlap are passed on to process_file.
+
+    Returns a dict mapping status to the list of paths with that status.
+    """
+    results = {CHANGED: [], UNCHANGED: [], FAILED: []}
+    diff_out = diff_out or out
+    hits = Counter()
+    removed = added = 0
+    # (path, new content) of changed files, written at the end when atomic.
+    staged = []
+    write = not (atomic or dry_run)
+
+    def report(path, status, detail, diff=None):
+        results[status].append(path)
+        if diff:
+            diff_out.write(diff)
+            diff_out.flush()
+        line = '%-9s  %s' % (status, path)
+        if detail:
+            line += '  (%s)' % detail
+        print(line, file=out, flush=True)
+
+    # (path, content key) for every file that needs the codemod run.  Workers
+    # read the files themselves rather than being sent their content.
+    pending = []
+    codemod_key = None
+    if cache is None:
+        pending = [(path, None) for path in paths]
+    else:
+        codemod_key = cache_key(codemod, allow_overlap, validate)
+        for path in paths:
+            try:
+                with codemod_io.source(path) as data:
+                    key = codemod_cache.content_hash(data)
+                hit = None if force or profile is not None else cache.get(key, codemod_key)
+                if hit is codemod_cache.UNCHANGED:
+                    report(path, UNCHANGED, 'cached')
+                elif hit is not None and not stats:
+                    # Per-rule hits are not cached, so --stats reruns changed files.
+                    diff = None
+                    if dry_run:
+                        content = codemod_io.read_text(path)
+                        diff = span_diff.unified_diff(content, span_diff.edits_between(content, hit), path)
+                    elif write:
+                        codemod_io.write_atomic(path, hit)
+                    else:
+                        staged.append((path, hit))
+                    report(path, CHANGED, 'cached', diff)
+                else:
+                    pending.append((path, key))
+            except (OSError, UnicodeDecodeError) as e:
+                report(path, FAILED, '%s: %s' % (type(e).__name__, e))
+
+    def finish(result, key):
+        nonlocal removed, added
+        if cache is not None and result.status != FAILED:
+            cache.put(key, codemod_key, result.output)
+        if result.hits:
+            hits.update(result.hits)
+            removed += result.removed
+            added += result.added
+        if result.timings:
+            profile.add(result.path, result.timings, result.pid)
+        if result.status == CHANGED and atomic and not dry_run:
+            staged.append((result.path, result.output))
+        report(result.path, result.status, result.detail, result.diff)
+
+    keep_output = cache is not None or atomic
+    options = (keep_output, dry_run, stats, profile is not None, not atomic, validate, allow_overlap)
+    skipped = 0
+    if jobs == 1 or len(pending) <= 1:
+        for n, (path, key) in enumerate(pending):
+            if atomic and results[FAILED]:
+                skipped = len(pending) - n
+                break
+            finish(process_file(codemod, path, None, *options), key)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(process_file, codemod, path, None, *options): key
+                       for path, key in pending}
+            for future in as_completed(futures):
+                if future.cancelled():
+                    skipped += 1
+                    continue
+                finish(future.result(), futures[future])
+                if atomic and results[FAILED]:
+                    for other in futures:
+                        other.cancel()
+
+    note = ''
+    if dry_run:
+        note = ' (dry run, nothing written)'
+    elif atomic and (results[FAILED] or skipped):
+        note = ' (%d not run; nothing written)' % skipped if skipped else ' (nothing written)'
+    elif staged:
+        codemod_io.write_all(staged)
+    print('%d changed, %d unchanged, %d failed%s' % (
+        len(results[CHANGED]), len(results[UNCHANGED]), len(results[FAILED]), note), file=out)
+    if stats:
+        print_stats(rule_names(codemod), hits, removed, added, out)
+    return results
+
+
+def print_stats(names, hits, removed, added, out=sys.stdout):
+    """Print hits per rule (unused rules included, marked) and bytes changed."""
+    width = max([len(n) for n in names] + [len(n) for n in hits] + [4])
+    print('%-*s  %6s' % (width, 'rule', 'hits'), file=out)
+    for name in names + [n for n in hits if n not in names]:
+        print('%-*s  %6d%s' % (width, name, hits[name], '  (no matches)' if not hits[name] else ''), file=out)
+    print('%d bytes removed, %d bytes added (%+d)' % (removed, added, added - removed), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Apply a codemod to every file matching the given globs.')
+    parser.add_argument('codemod', help='codemod module name or path, e.g. make_compact, or several '
+                                        'separated by commas to chain them, e.g. fix_tabs,fix_tab_badge')
+    parser.add_argument('globs', nargs='+', help="files or glob patterns, e.g. 'src/**/*.tsx'")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='ignore cached results and rerun on every file')
+    parser.add_argument('--no-cache', action='store_true', help='neither read nor update the result cache')
+    parser.add_argument('--cache-size', type=int, default=codemod_cache.DEFAULT_SIZE,
+                        help='maximum cached results to keep (default: %(default)s)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='write nothing; print a unified diff per file to stdout, statuses to stderr')
+    parser.add_argument('--stats', action='store_true', help='print hits per rule and bytes changed')
+    parser.add_argument('--atomic', action='store_true',
+                        help='stop at the first failure and write files only if every file succeeded')
+    parser.add_argument('--allow-overlap', action='store_true',
+                        help='in a chain, let a codemod rewrite text an earlier one inserted instead of failing')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='write output even if it no longer tokenizes as TS/TSX')
+    parser.add_argument('--profile', action='store_true', help='time every rule and print the slowest first')
+    parser.add_argument('--trace', metavar='PATH', help='write per-rule timings as Chrome trace JSON')
+    parser.add_argument('--slow', type=float, default=codemod_profile.SLOW * 1e3, metavar='MS',
+                        help='flag rules slower than this on one file (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    paths = expand(args.globs)
+    if not paths:
+        parser.error('no files match %s' % ' '.join(args.globs))
+    for name in chain(args.codemod):
+        try:
+            load_codemod(name)
+        except (ImportError, ValueError) as e:
+            parser.error('cannot load codemod %s: %s' % (name, e))
+    profile = codemod_profile.Profile() if args.profile or args.trace else None
+    options = dict(jobs=args.jobs, dry_run=args.dry_run, stats=args.stats, profile=profile,
+                   atomic=args.atomic, validate=not args.no_validate, allow_overlap=args.allow_overlap)
+    if args.dry_run:
+        options.update(out=sys.stderr, diff_out=sys.stdout)
+    if args.no_cache:
+        results = run(args.codemod, paths, **options)
+    else:
+        with codemod_cache.Cache(max_entries=args.cache_size) as cache:
+            results = run(args.codemod, paths, cache=cache, force=args.force, **options)
+    if args.profile:
+        profile.report(options.get('out', sys.stdout), slow=args.slow / 1e3)
+    if args.trace:
+        profile.trace(args.trace)
+    return 1 if results[FAILED] else 0
+
+
+def script_main(codemod, default=ADMIN_PANEL):
+    """Entry point for running a codemod script directly.
+
+    With no arguments the script targets default (AdminPanel.tsx, as the
+    scripts always have); otherwise the arguments are files or globs.
+    """
+    globs = sys.argv[1:] or [os.path.join(ROOT, default)]
+    sys.exit(main([codemod] + globs))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,415 @@
+"""Keep codemods applied while you edit.
+
+    python codemod_watch.py fix_tabs,fix_avatars                # watches src/ and api/
+    python codemod_watch.py make_compact src/components --dry-run
+    python codemod_watch.py densify --poll --debounce 0.3
+
+A long-running process: the codemods are loaded and compiled once, and
+every .ts/.tsx file under the watched directories is run through them when
+it is saved.  Saves are collected until none arrived for --debounce
+seconds, so an editor's save-all or a git checkout is one batch.
+
+For every file the watcher keeps the content it last saw and its top-level
+block index (tsx_index).  On a save the changed lines are found against
+that content and widened to the declarations they fall in; the index is
+updated for just that stretch and rule tables only scan it.  transform()
+codemods and tables with counted rules still see the whole file, warm.
+A file the watcher has not seen before is run whole.
+
+Output is validated like the runner's and written atomically; the
+watcher's own writes are recognized and not run again.  Output that the
+codemods would change again on the next save (make_compact wraps every
+Apply it finds, even wrapped ones) is reported as failed, not written.  Directories are
+watched with inotify on Linux (through ctypes) and polled elsewhere, or
+with --poll.
+"""
+import argparse
+import bisect
+import os
+import select
+import struct
+import sys
+import time
+from collections import namedtuple
+
+import codemod_io
+import codemod_runner
+import edit_buffer
+import span_diff
+import tsx_index
+import tsx_validate
+
+DEBOUNCE = 0.1
+INTERVAL = 0.5
+SKIP_DIRS = frozenset(('node_modules', 'dist', 'build'))
+
+# What the watcher knows about a file: the content it last saw or wrote and
+# that content's tsx_index block index (None if it did not tokenize).
+FileState = namedtuple('FileState', 'content index')
+
+
+def _watched(path):
+    return tsx_validate.applies_to(path)
+
+
+def _walk(root):
+    """Directories under root, skipping hidden and build directories."""
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS]
+        yield dirpath
+
+
+def files(roots):
+    """Every watched file under roots."""
+    for root in roots:
+        for dirpath in _walk(root):
+            for entry in os.listdir(dirpath):
+                path = os.path.join(dirpath, entry)
+                if _watched(path) and os.path.isfile(path):
+                    yield path
+
+
+class Inotify:
+    """Changed files under roots, from Linux inotify."""
+
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, roots):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._errno = ctypes.get_errno
+        self.roots = roots
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self._errno(), 'inotify_init1: %s' % os.strerror(self._errno()))
+        self.dirs = {}
+        try:
+            for root in roots:
+                self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_tree(self, root):
+        for path in _walk(root):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+            if wd < 0:
+                raise OSError(self._errno(), 'inotify_add_watch %s: %s' % (path, os.strerror(self._errno())))
+            self.dirs[wd] = path
+
+    def wait(self, timeout=None):
+        """Files changed within timeout seconds (None: wait for one); [] if none."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        changed = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, size = self._EVENT.unpack_from(data, pos)
+                name = os.fsdecode(data[pos + self._EVENT.size:pos + self._EVENT.size + size].rstrip(b'\0'))
+                pos += self._EVENT.size + size
+                if mask & self.IN_Q_OVERFLOW:
+                    # Events were dropped: every file may have changed.
+                    changed.extend(files(self.roots))
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                directory = self.dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO) and not name.startswith('.') \
+                            and name not in SKIP_DIRS:
+                        # A new directory may already hold files (git checkout, mv).
+                        self._add_tree(path)
+                        changed.extend(files([path]))
+                elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO) and _watched(path):
+                    changed.append(path)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class Poller:
+    """Changed files under roots, by comparing mtimes and sizes every interval."""
+
+    def __init__(self, roots, interval=INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.seen = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in files(self.roots):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+            snapshot = self._snapshot()
+            changed = [p for p, stamp in snapshot.items() if self.seen.get(p) != stamp]
+            self.seen = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def watcher(roots, poll=False, interval=INTERVAL):
+    """An Inotify watcher where the platform has one, else a Poller."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return Inotify(roots)
+        except (OSError, AttributeError):
+            pass
+    return Poller(roots, interval)
+
+
+def batches(watcher, debounce=DEBOUNCE):
+    """Yield sorted lists of changed files, once no change came for debounce seconds."""
+    while True:
+        changed = set(watcher.wait())
+        while changed:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed.update(more)
+        if changed:
+            yield sorted(changed)
+
+
+def _index(content):
+    try:
+        return tsx_index.build_index(content)
+    except tsx_index.TsxSyntaxError:
+        return None
+
+
+def _widen(index, spans, text):
+    """spans grown to whole lines and to the declarations they touch."""
+    blocks = sorted((b.start, b.end) for b in index.values())
+    widened = []
+    for start, end in spans:
+        start = text.rfind('\n', 0, start) + 1
+        end = text.find('\n', end)
+        end = len(text) if end < 0 else end + 1
+        for block_start, block_end in blocks:
+            if block_start < end and start < block_end:
+                start = min(start, block_start)
+                end = max(end, block_end)
+        widened.append((start, end))
+    return widened
+
+
+def _carry(spans, edits):
+    """spans of a text moved to where they are once edits, all inside spans, are applied."""
+    ends = []
+    shifts = []
+    shift = 0
+    for start, end, replacement, *_ in edits:
+        shift += len(replacement) - (end - start)
+        ends.append(end)
+        shifts.append(shift)
+
+    def moved(pos):
+        k = bisect.bisect_right(ends, pos)
+        return pos + (shifts[k - 1] if k else 0)
+
+    return [(moved(start), moved(end)) for start, end in spans]
+
+
+class Session:
+    """A codemod (or chain) and the state of every file it watches."""
+
+    def __init__(self, codemod, dry_run=False, validate=True, allow_overlap=False, out=sys.stdout):
+        self.stages = codemod_runner.chain(codemod)
+        self.dry_run = dry_run
+        self.validate = validate
+        self.allow_overlap = allow_overlap
+        self.out = out
+        self.files = {}
+
+    def prime(self, paths):
+        """Read and index paths, so their first save is already incremental."""
+        for path in paths:
+            try:
+                content = codemod_io.read_text(path)
+            except (OSError, UnicodeDecodeError):
+                continue
+            self.files[path] = FileState(content, _index(content))
+
+    def _changes(self, state, content):
+        """(spans of content to scan or None for all of it, index of content)."""
+        if state is None or state.index is None:
+            return None, _index(content)
+        edits = span_diff.edits_between(state.content, content)
+        delta = len(content) - len(state.content)
+        try:
+            index = tsx_index.update_index(state.index, content, edits[0][0], edits[-1][1] + delta, delta)
+        except tsx_index.TsxSyntaxError:
+            return None, None
+        spans = []
+        shift = 0
+        for start, end, replacement, _ in edits:
+            spans.append((start + shift, start + shift + len(replacement)))
+            shift += len(replacement) - (end - start)
+        return _widen(index, spans, content), index
+
+    def process(self, path):
+        """Run the codemods over path if it changed; returns a Result or None."""
+        started = time.perf_counter()
+        try:
+            content = codemod_io.read_text(path)
+        except FileNotFoundError:
+            self.files.pop(path, None)
+            return None
+        except (OSError, UnicodeDecodeError) as e:
+            return codemod_runner.Result(path, codemod_runner.FAILED, '%s: %s' % (type(e).__name__, e))
+        state = self.files.get(path)
+        if state is not None and state.content == content:
+            # Touched, or our own write coming back.
+            return None
+        spans, index = self._changes(state, content)
+        self.files[path] = FileState(content, index)
+        scope = 'whole file' if spans is None else '%d chars' % sum(b - a for a, b in spans)
+        try:
+            buffer, spans = self._apply(content, spans)
+            output = buffer.text()
+            # Saving again would run the codemods over their own output, so
+            # one that still matches it would rewrite the file on every save.
+            again = output != content and self._apply(output, spans)[0].text() != output
+        except Exception as e:
+            return codemod_runner.Result(path, codemod_runner.FAILED, '%s: %s' % (type(e).__name__, e))
+        if output == content:
+            return self._result(path, codemod_runner.UNCHANGED, scope, started)
+        if again:
+            return self._result(path, codemod_runner.FAILED,
+                                'a second run changes the output again, not written', started)
+        if self.validate and tsx_validate.applies_to(path):
+            error = tsx_validate.validate(output)
+            if error is not None and tsx_validate.validate(content) is None:
+                return self._result(path, codemod_runner.FAILED,
+                                    'output does not parse, not written: %s' % error, started)
+        edits = buffer.edits()
+        if self.dry_run:
+            return self._result(path, codemod_runner.CHANGED, '%d edits, %s' % (len(edits), scope), started,
+                                span_diff.unified_diff(content, edits, os.path.relpath(path)))
+        codemod_io.write_atomic(path, output)
+        if index is not None:
+            delta = len(output) - len(content)
+            try:
+                index = tsx_index.update_index(index, output, edits[0][0], edits[-1][1] + delta, delta)
+            except tsx_index.TsxSyntaxError:
+                index = None
+        self.files[path] = FileState(output, index)
+        return self._result(path, codemod_runner.CHANGED, '%d edits, %s' % (len(edits), scope), started)
+
+    def _apply(self, content, spans):
+        """Run the stages over spans of content (None: all of it).
+
+        Returns the EditBuffer and the spans in its text.
+        """
+        buffer = edit_buffer.EditBuffer(content, strict=not self.allow_overlap, names=self.stages)
+        for stage, name in enumerate(self.stages):
+            text = buffer.text()
+            edits, limited = codemod_runner.stage_edits(name, text, spans)
+            buffer.apply(edits, stage)
+            if edits:
+                spans = _carry(spans, edits) if limited else None
+        return buffer, spans
+
+    def _result(self, path, status, detail, started, diff=None):
+        detail = '%s, %.0f ms' % (detail, (time.perf_counter() - started) * 1e3)
+        return codemod_runner.Result(path, status, detail, diff=diff)
+
+
+def serve(session, watcher, debounce=DEBOUNCE, out=sys.stdout, diff_out=None, verbose=False):
+    """Process every batch of saves until interrupted."""
+    diff_out = diff_out or out
+    for batch in batches(watcher, debounce):
+        for path in batch:
+            result = session.process(path)
+            if result is None or (result.status == codemod_runner.UNCHANGED and not verbose):
+                continue
+            if result.diff:
+                diff_out.write(result.diff)
+                diff_out.flush()
+            print('%-9s  %s  (%s)' % (result.status, os.path.relpath(path), result.detail),
+                  file=out, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-apply codemods to files as they are saved.')
+    parser.add_argument('codemod', help='codemod module name, or several separated by commas')
+    parser.add_argument('dirs', nargs='*', help='directories to watch (default: src and api)')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE,
+                        help='seconds without saves before a batch runs (default: %(default)s)')
+    parser.add_argument('--poll', action='store_true', help='poll for changes instead of using inotify')
+    parser.add_argument('--interval', type=float, default=INTERVAL,
+                        help='seconds between polls (default: %(default)s)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='write nothing; print a unified diff per save to stdout, statuses to stderr')
+    parser.add_argument('--allow-overlap', action='store_true',
+                        help='in a chain, let a codemod rewrite text an earlier one inserted '
+                             'instead of failing')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='write output even if it no longer tokenizes as TS/TSX')
+    parser.add_argument('-v', '--verbose', action='store_true', help='report unchanged files too')
+    args = parser.parse_args(argv)
+
+    dirs = args.dirs or [d for d in (os.path.join(codemod_runner.ROOT, name) for name in ('src', 'api'))
+                         if os.path.isdir(d)]
+    missing = [d for d in dirs if not os.path.isdir(d)]
+    if missing or not dirs:
+        parser.error('not a directory: %s' % ' '.join(missing or ['src']))
+    for name in codemod_runner.chain(args.codemod):
+        try:
+            codemod_runner.load_codemod(name)
+        except (ImportError, ValueError) as e:
+            parser.error('cannot load codemod %s: %s' % (name, e))
+    out = sys.stderr if args.dry_run else sys.stdout
+    session = Session(args.codemod, args.dry_run, not args.no_validate, args.allow_overlap, out)
+    session.prime(files(dirs))
+    watch = watcher(dirs, args.poll, args.interval)
+    print('watching %d files in %s (%s); Ctrl+C to stop' % (
+        len(session.files), ', '.join(os.path.relpath(d) for d in dirs),
+        'inotify' if isinstance(watch, Inotify) else 'polling every %ss' % args.interval),
+        file=out, flush=True)
+    try:
+        serve(session, watch, args.debounce, out, sys.stdout, args.verbose)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watch.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,35 @@
+from tw_classes import ClassRule
+
+# Densify spacing everywhere, token by token, the way make_compact.py does
+# for the UsersView cards - class order no longer matters.
+RULES = [
+    # Card headers: px-5 py-4 gap-4 -> px-3 py-2.5 gap-3
+    ClassRule({'px-5': 'px-3', 'py-4': 'py-2.5', 'gap-4': 'gap-3'},
+              requires={'px-5', 'py-4'}, name='card header'),
+
+    # Expanded content: px-5 pb-5 pt-2 space-y-4 -> px-3 pb-3 pt-1 space-y-3
+    ClassRule({'px-5': 'px-3', 'pb-5': 'pb-3', 'pt-2': 'pt-1', 'space-y-4': 'space-y-3'},
+              requires={'pb-5', 'space-y-4'}, name='expanded content'),
+
+    # Avatars: h-12 w-12 rounded-xl -> h-9 w-9 rounded-lg
+    ClassRule({'h-12': 'h-9', 'w-12': 'w-9', 'rounded-xl': 'rounded-lg'},
+              requires={'h-12', 'w-12'}, name='avatar'),
+
+    # Buttons: px-4 py-2 / py-2.5 rounded-lg text-sm gap-2 -> px-2.5 py-1.5 rounded-md text-xs gap-1
+    ClassRule({'px-4': 'px-2.5', 'py-2': 'py-1.5', 'py-2.5': 'py-1.5', 'rounded-lg': 'rounded-md',
+               'text-sm': 'text-xs', 'gap-2': 'gap-1'},
+              requires={'px-4', 'font-medium', 'disabled:opacity-50'}, name='buttons'),
+
+    # Section titles: text-xs mb-2 -> text-[10px] mb-1.5
+    ClassRule({'text-xs': 'text-[10px]', 'mb-2': 'mb-1.5'},
+              requires={'uppercase', 'tracking-wider', 'mb-2'}, name='section title'),
+]
+
+# Icons: size={16} -> size={14}, size={20} -> size={18}
+PROPS = {
+    'size': {'16': '14', '20': '18'},
+}
+
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('densify')
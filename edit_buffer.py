@@ -0,0 +1,170 @@
+"""Piece-table buffer for running several codemods over one text.
+
+    buffer = EditBuffer(content)
+    for stage, codemod in enumerate(chain):
+        text = buffer.text()
+        buffer.apply(edits_of(codemod, text), stage)     # raises EditConflict
+    new_content = buffer.text()
+    edits = buffer.edits()          # against content, rule = stage
+
+The buffer is a list of pieces, each a slice of the original text or of a
+replacement, tagged with the stage that inserted it.  Applying a batch of
+edits rewrites the piece list in one pass and copies no text; text() joins
+the pieces once per stage that changed something, and only because the
+next stage's regexes need a str.
+
+Since every piece knows its stage, an edit that rewrites text inserted by
+an earlier stage is caught: two codemods in a chain touching the same text
+is how one silently clobbers the other.  By default that raises
+EditConflict; with strict=False the edit is applied and the conflict kept
+in conflicts.  Edits next to another stage's text are fine.
+
+edits() gives the net change against the original text, one edit per
+changed region, tagged with the stage that inserted its text (or deleted
+it), so span_diff can diff and count it like a single codemod's edits.
+"""
+from collections import namedtuple
+
+# One slice of text: source[start:end], inserted by stage (None: original).
+Piece = namedtuple('Piece', 'source start end stage')
+
+# stage edited text that other inserted; start/end are offsets into the
+# text stage was applied to, rule the rule index of the edit.
+Conflict = namedtuple('Conflict', 'stage other start end rule')
+
+
+class EditConflict(ValueError):
+    def __init__(self, conflict, text, names=None):
+        self.conflict = conflict
+        name = (lambda stage: names[stage]) if names else (lambda stage: 'stage %s' % stage)
+        line = text.count('\n', 0, conflict.start) + 1
+        super().__init__('%s edits text inserted by %s (line %d: %r)' % (
+            name(conflict.stage), name(conflict.other), line, text[conflict.start:conflict.end][:40]))
+
+
+def trim(text, edits):
+    """Shrink edits to the characters they really change.
+
+    Codemods that return whole text are diffed by line; an edit covering a
+    whole line would otherwise claim text on it that another stage wrote.
+    """
+    trimmed = []
+    for start, end, replacement, *rule in edits:
+        old = text[start:end]
+        prefix = 0
+        limit = min(len(old), len(replacement))
+        while prefix < limit and old[prefix] == replacement[prefix]:
+            prefix += 1
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and old[-1 - suffix] == replacement[-1 - suffix]:
+            suffix += 1
+        if prefix == len(old) == len(replacement):
+            continue
+        trimmed.append((start + prefix, end - suffix, replacement[prefix:len(replacement) - suffix], *rule))
+    return trimmed
+
+
+class EditBuffer:
+    """An original text plus the edits of successive stages."""
+
+    def __init__(self, text, strict=True, names=None):
+        self.original = text
+        self.pieces = [Piece(text, 0, len(text), None)] if text else []
+        self.strict = strict
+        self.names = names
+        self.conflicts = []
+        self._text = text
+
+    def text(self):
+        """The current text."""
+        if self._text is None:
+            self._text = ''.join(p.source[p.start:p.end] for p in self.pieces)
+        return self._text
+
+    def __len__(self):
+        return sum(p.end - p.start for p in self.pieces)
+
+    def _conflict(self, stage, other, start, end, rule):
+        conflict = Conflict(stage, other, start, end, rule)
+        if self.strict:
+            raise EditConflict(conflict, self.text(), self.names)
+        self.conflicts.append(conflict)
+
+    def apply(self, edits, stage):
+        """Apply edits (start, end, replacement, rule) made against text().
+
+        Edits must be sorted and must not overlap.  Raises EditConflict
+        (strict, leaving the buffer as it was) or records a Conflict when an
+        edit touches text another stage inserted; returns the number of
+        edits applied.
+        """
+        if not edits:
+            return 0
+        pieces = []
+        current = list(self.pieces)     # split as we go; self.pieces is kept for a conflict
+        i = 0                   # next piece to look at
+        offset = 0              # offset of current[i] in the current text
+        last = 0
+        for start, end, replacement, *rule in edits:
+            rule = rule[0] if rule else None
+            if start < last or end < start:
+                raise ValueError('edits overlap or are out of order at %d' % start)
+            # Keep whole pieces before the edit.
+            while i < len(current) and offset + current[i].end - current[i].start <= start:
+                piece = current[i]
+                pieces.append(piece)
+                offset += piece.end - piece.start
+                i += 1
+            # The piece the edit starts in: keep its head.
+            if i < len(current) and offset < start:
+                piece = current[i]
+                cut = piece.start + start - offset
+                pieces.append(piece._replace(end=cut))
+                if start == end and piece.stage not in (None, stage) and cut < piece.end:
+                    self._conflict(stage, piece.stage, start, end, rule)
+                current[i] = piece._replace(start=cut)
+                offset = start
+            # Pieces the edit covers, whole or in part.
+            while i < len(current) and offset < end:
+                piece = current[i]
+                length = piece.end - piece.start
+                if piece.stage not in (None, stage) and length:
+                    self._conflict(stage, piece.stage, start, end, rule)
+                if offset + length > end:
+                    current[i] = piece._replace(start=piece.start + end - offset)
+                    offset = end
+                    break
+                offset += length
+                i += 1
+            # An empty piece marks a deletion, so edits() can tell who made it.
+            pieces.append(Piece(replacement, 0, len(replacement), stage))
+            last = end
+        pieces.extend(current[i:])
+        self.pieces = [p for p in pieces if p.end > p.start or p.stage is not None]
+        self._text = None
+        return len(edits)
+
+    def edits(self):
+        """Net edits against the original text: (start, end, replacement, stage)."""
+        edits = []
+        position = 0            # offset in the original text
+        pending = None          # [start, replacement pieces, stage] of the edit being built
+        for piece in self.pieces:
+            if piece.stage is None:
+                if piece.start != position and pending is None:
+                    pending = [position, [], None]
+                if pending is not None:
+                    edits.append((pending[0], piece.start, ''.join(pending[1]), pending[2]))
+                    pending = None
+                position = piece.end
+                continue
+            if pending is None:
+                pending = [position, [], piece.stage]
+            elif pending[2] is None:
+                pending[2] = piece.stage
+            pending[1].append(piece.source[piece.start:piece.end])
+        if pending is not None or position != len(self.original):
+            start, replacement, stage = pending or (position, [], None)
+            edits.append((start, len(self.original), ''.join(replacement), stage))
+        return [e for e in edits if e[1] > e[0] or e[2]]
@@ -1,40 +1,6 @@
 import re
 
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Fix Apply button (line 561-564)
-content = re.sub(
-    r'className="px-4 py-2 bg-blue-600 text-white rounded-lg text-sm font-medium hover:bg-blue-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors flex items-center gap-2"\s*>\s*<Check size=\{16\} />\s*Apply',
-    r'className="px-2.5 py-1.5 bg-blue-600 text-white rounded-md text-xs font-medium hover:bg-blue-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors flex items-center gap-1">\n                                                    <Check size={14} />\n                                                    <span className="hidden sm:inline">Apply</span>',
-    content
-)
-
-# Fix Ban button
-content = re.sub(
-    r'(className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 \$\{user\.isBanned\s*\?\s*[^}]+\}\s*`\})\s*>\s*<Ban size=\{16\} />\s*\{user\.isBanned \? \'Unban User\' : \'Ban User\'\}',
-    r'\1>\n                                                    <Ban size={14} />\n                                                    <span className="hidden sm:inline">{user.isBanned ? \'Unban\' : \'Ban\'}</span>',
-    content
-)
-# Update the button className for Ban
-content = re.sub(
-    r'className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 \$\{user\.isBanned',
-    r'className={`px-2 py-1.5 rounded-md text-xs font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-1 ${user.isBanned',
-    content
-)
-
-# Fix Restrict button
-content = re.sub(
-    r'<AlertCircle size=\{16\} />\s*\{user\.isRestricted \|\| !user\.canUpload \? \'Unrestrict User\' : \'Restrict User\'\}',
-    r'<AlertCircle size={14} />\n                                                    <span className="hidden sm:inline">{user.isRestricted || !user.canUpload ? \'Unrestrict\' : \'Restrict\'}</span>',
-    content
-)
-# Update Restrict button className
-content = re.sub(
-    r'className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 \$\{user\.isRestricted \|\| !user\.canUpload',
-    r'className={`px-2 py-1.5 rounded-md text-xs font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-1 ${user.isRestricted || !user.canUpload',
-    content
-)
+from codemod_engine import Rule
 
 # Fix Trust button and ADD delete button after it
 trust_button_pattern = r'(<button\s+onClick=\{\(\) => onAction\(user\._id, user\.isTrusted \? \'untrust\' : \'trust\'\)\}\s+disabled=\{isProcessing\}\s+className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 sm:col-span-2 \$\{user\.isTrusted[^}]+\}`\}\s*>\s*)<Shield size=\{16\} />\s*\{user\.isTrusted \? \'Remove Trusted Status\' : \'Mark as Trusted User\'\}\s*</button>'
@@ -61,16 +27,38 @@ replacement = r'''<button
                                                     <span className="hidden sm:inline">Delete</span>
                                                 </button>'''
 
-content = re.sub(trust_button_pattern, replacement, content, flags=re.DOTALL)
+RULES = [
+    # Fix Apply button (line 561-564)
+    Rule(r'className="px-4 py-2 bg-blue-600 text-white rounded-lg text-sm font-medium hover:bg-blue-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors flex items-center gap-2"\s*>\s*<Check size=\{16\} />\s*Apply',
+         r'className="px-2.5 py-1.5 bg-blue-600 text-white rounded-md text-xs font-medium hover:bg-blue-700 disabled:opacity-50 disabled:cursor-not-allowed transition-colors flex items-center gap-1">\n                                                    <Check size={14} />\n                                                    <span className="hidden sm:inline">Apply</span>',
+         name='apply button'),
+
+    # Fix Ban button, including its className
+    Rule(r"className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 (\$\{user\.isBanned\s*\?\s*[^}]+\}\s*`\})\s*>\s*<Ban size=\{16\} />\s*\{user\.isBanned \? 'Unban User' : 'Ban User'\}",
+         r"""className={`px-2 py-1.5 rounded-md text-xs font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-1 \1>\n                                                    <Ban size={14} />\n                                                    <span className="hidden sm:inline">{user.isBanned ? 'Unban' : 'Ban'}</span>""",
+         name='ban button'),
+    # Update the button className for Ban
+    Rule(r'className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 \$\{user\.isBanned',
+         r'className={`px-2 py-1.5 rounded-md text-xs font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-1 ${user.isBanned',
+         name='ban class'),
+
+    # Fix Restrict button
+    Rule(r"<AlertCircle size=\{16\} />\s*\{user\.isRestricted \|\| !user\.canUpload \? 'Unrestrict User' : 'Restrict User'\}",
+         r"""<AlertCircle size={14} />\n                                                    <span className="hidden sm:inline">{user.isRestricted || !user.canUpload ? 'Unrestrict' : 'Restrict'}</span>""",
+         name='restrict button'),
+    # Update Restrict button className
+    Rule(r'className=\{`px-4 py-2\.5 rounded-lg text-sm font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-2 \$\{user\.isRestricted \|\| !user\.canUpload',
+         r'className={`px-2 py-1.5 rounded-md text-xs font-medium transition-colors disabled:opacity-50 disabled:cursor-not-allowed flex items-center justify-center gap-1 ${user.isRestricted || !user.canUpload',
+         name='restrict class'),
 
-# Fix Processing indicator
-content = re.sub(
-    r'<div className="flex items-center justify-center gap-2 text-sm text-blue-600 dark:text-blue-400 py-2">\s*<Loader2 size=\{16\} className="animate-spin" />',
-    r'<div className="flex items-center justify-center gap-2 text-xs text-blue-600 dark:text-blue-400 py-1">\n                                        <Loader2 size={14} className="animate-spin" />',
-    content
-)
+    Rule(trust_button_pattern, replacement, flags=re.DOTALL, name='trust and delete buttons'),
 
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
+    # Fix Processing indicator
+    Rule(r'<div className="flex items-center justify-center gap-2 text-sm text-blue-600 dark:text-blue-400 py-2">\s*<Loader2 size=\{16\} className="animate-spin" />',
+         r'<div className="flex items-center justify-center gap-2 text-xs text-blue-600 dark:text-blue-400 py-1">\n                                        <Loader2 size={14} className="animate-spin" />',
+         name='processing indicator'),
+]
 
-print('All button fixes and delete button added!')
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('finish_buttons')
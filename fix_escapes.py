@@ -1,10 +1,10 @@
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+from codemod_engine import literal
 
 # Remove escaped quotes
-content = content.replace("\\'", "'")
+RULES = [
+    literal("\\'", "'", name='escaped quote'),
+]
 
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'w', encoding='utf-8') as f:
-    f.write(content)
-
-print('Fixed escaped quotes!')
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('fix_escapes')
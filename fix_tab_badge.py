@@ -1,13 +1,4 @@
-import re
-
-file_path = r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx'
-
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Regex to find the TabButton component
-# We look for the function definition and its return statement
-pattern = r'function TabButton\(\{ active, onClick, icon, label, count \}: any\) \{[\s\S]*?return \([\s\S]*?<\/motion\.button>\s*\)\s*\}'
+import tsx_index
 
 # New implementation with absolute positioning for the badge
 new_component = '''function TabButton({ active, onClick, icon, label, count }: any) {
@@ -30,12 +21,15 @@ new_component = '''function TabButton({ active, onClick, icon, label, count }: a
     )
 }'''
 
-# Perform the replacement
-new_content = re.sub(pattern, new_component, content)
 
-if new_content != content:
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
-    print("Successfully updated TabButton component.")
-else:
-    print("Could not find TabButton component to replace.")
+def transform(content):
+    # Only the motion.button version of TabButton gets the badge update
+    block = tsx_index.build_index(content).get('TabButton')
+    if block is None or '</motion.button>' not in content[block.start:block.end]:
+        return content
+    return content[:block.start] + new_component + content[block.end:]
+
+
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('fix_tab_badge')
@@ -0,0 +1,394 @@
+"""Remove the unused imports an ESLint report lists, every file in one pass.
+
+    python fix_unused_imports.py lint_output.json
+    python fix_unused_imports.py lint_log.txt --path src/components --dry-run
+    python fix_unused_imports.py                  # latest run in the lint index
+
+The report is read with lint_report (JSON or stylish text, any encoding),
+or taken from the latest run ingested into the lint index when no report
+is given.  no-unused-vars diagnostics are grouped by file and each file is
+fixed in one pass: all of its unused import bindings are removed with a
+single set of edits, and an import left with no bindings is removed
+entirely.  Files are fixed in parallel, checked with tsx_validate and
+replaced atomically.
+
+Only import bindings are touched.  A diagnostic is located by its line and
+column, or by name when the file has changed since the report, and the
+binding is removed only if the name appears nowhere else in the file:
+reports go stale, and an import they list may be in use by now.  Anything
+else (unused locals, parameters) is left alone and reported as skipped.
+Imports of modules that may have side effects keep a bare import 'module',
+unless they only imported types (import type, or type on every specifier).
+"""
+import argparse
+import os
+import re
+import sys
+from collections import defaultdict, namedtuple
+
+import codemod_io
+import lint_report
+import span_diff
+import tsx_index
+import tsx_validate
+from codemod_runner import CHANGED, FAILED, UNCHANGED, Result
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RULES = ('@typescript-eslint/no-unused-vars', 'no-unused-vars')
+
+# Packages whose import does nothing but bind names.  An import of anything
+# else that loses all its bindings is kept as a bare import 'module', since
+# verbatimModuleSyntax keeps it in the bundle and it may register a plugin
+# (jspdf-autotable does).  Relative imports of TS modules are dropped too.
+SIDE_EFFECT_FREE = frozenset(('react', 'react-dom', 'lucide-react', 'framer-motion'))
+
+_UNUSED = re.compile(r"'([^']+)' is defined but never used")
+# A comment line aimed at the line below it, removed along with that line.
+_DIRECTIVE = re.compile(r'\s*//\s*(?:@ts-|eslint-disable-next-line)')
+# The element name a JSX token starts with (B of <B.Item ...>).
+_JSX_TAG = re.compile(r'<\s*([^\W\d][\w$]*|\$[\w$]*)')
+
+# One import declaration.  bindings are Bindings in source order; braces
+# is the (start, end) of the {...} group or None; source is the offset of
+# the module string; type_only is True for import type.
+Import = namedtuple('Import', 'start end bindings braces source type_only')
+# local is the name the import binds; start/end span the whole specifier
+# (type Foo as Bar); named is True inside the braces; type_only is True
+# for a type Foo specifier or any binding of an import type.
+Binding = namedtuple('Binding', 'local start end named type_only')
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _binding(text, tokens, named, type_only):
+    """Binding for the tokens of one specifier: [type] name [as local], * as ns."""
+    names = [t for t in tokens if t.kind in ('name', 'string')]
+    # type Foo, type Foo as Bar; not a name type (type as Bar).
+    inline = len(tokens) > 1 and _value(text, tokens[0]) == 'type' and _value(text, tokens[1]) != 'as'
+    return Binding(_value(text, names[-1]), tokens[0].start, tokens[-1].end, named, type_only or inline)
+
+
+def parse_imports(text, tokens=None):
+    """Every static import declaration in text, as Imports."""
+    tokens = tsx_index.scan(text) if tokens is None else tokens
+    imports = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if not (token.kind == 'name' and token.depth == 0 and _value(text, token) == 'import'
+                and i + 1 < len(tokens) and _value(text, tokens[i + 1]) not in ('(', '.')):
+            i += 1
+            continue
+        j = i + 1
+        type_only = (_value(text, tokens[j]) == 'type' and j + 1 < len(tokens)
+                     and _value(text, tokens[j + 1]) not in (',', 'from', '='))
+        if type_only:
+            j += 1
+        bindings = []
+        braces = None
+        specifier = []
+        while j < len(tokens) and not (tokens[j].kind == 'string' and tokens[j].depth == 0):
+            t = tokens[j]
+            value = _value(text, t)
+            if value == '{':
+                braces = t.start
+            elif value == '}':
+                if specifier:
+                    bindings.append(_binding(text, specifier, True, type_only))
+                specifier = []
+                braces = (braces, t.end)
+            elif value == ',' or (value == 'from' and t.depth == 0):
+                if specifier:
+                    bindings.append(_binding(text, specifier, t.depth > 0, type_only))
+                specifier = []
+            else:
+                specifier.append(t)
+            j += 1
+        if j == len(tokens) or _value(text, tokens[j - 1]) == '=':
+            # import x = require(...), or a truncated file.
+            i = j
+            continue
+        end = tokens[j].end
+        if j + 1 < len(tokens) and _value(text, tokens[j + 1]) == ';':
+            end = tokens[j + 1].end
+        imports.append(Import(token.start, end, bindings, braces, tokens[j].start, type_only))
+        i = j + 1
+    return imports
+
+
+def _runs(items, removed):
+    """Maximal runs of consecutive removed items, as (first, last) indexes."""
+    runs = []
+    for k, item in enumerate(items):
+        if item in removed:
+            if runs and runs[-1][1] == k - 1:
+                runs[-1][1] = k
+            else:
+                runs.append([k, k])
+    return runs
+
+
+def _list_edits(text, items, removed):
+    """Edits deleting removed items from a comma-separated list of spans.
+
+    A run of items is deleted with the separator after it, or before it
+    when it ends the list.  Items on lines of their own take their whole
+    lines with them; items sharing a line take the spaces around them.
+    """
+    edits = []
+    for first, last in _runs(items, removed):
+        start, end = items[first].start, items[last].end
+        if last + 1 < len(items):
+            following = items[last + 1].start
+            comma = text.index(',', end) + 1
+            line = span_diff._line_start(text, start)
+            if '\n' not in text[comma:following]:
+                end = following
+            elif not text[line:start].strip():
+                start = line
+                end = span_diff._line_end(text, comma)
+            elif first > 0:
+                start = text.rindex(',', 0, start) + 1
+                end = comma
+            else:
+                end = comma + len(text[comma:following]) - len(text[comma:following].lstrip(' \t'))
+        elif first > 0:
+            start = items[first - 1].end
+        edits.append((start, end, ''))
+    return edits
+
+
+def _side_effect_free(module):
+    if module.startswith('.'):
+        return not module.endswith('.css')
+    return module in SIDE_EFFECT_FREE
+
+
+def _statement_edit(text, imp):
+    """Edit deleting a whole import declaration and its line if it is alone there.
+
+    An import of a module that may have side effects is kept as a bare
+    import, unless it only imported types: those never load the module.
+    """
+    start, end = imp.start, imp.end
+    types = imp.bindings and all(b.type_only for b in imp.bindings)
+    if not types and not _side_effect_free(text[imp.source + 1:text.index(text[imp.source], imp.source + 1)]):
+        return (start, imp.source, 'import ')
+    line = span_diff._line_start(text, start)
+    after_end = span_diff._line_end(text, end)
+    if text[line:start].strip() or text[end:after_end].strip():
+        return (start, end, '')
+    if line > 0:
+        previous = span_diff._line_start(text, line - 1)
+        if _DIRECTIVE.match(text, previous, line):
+            line = previous
+    return (line, after_end, '')
+
+
+def import_edits(text, imp, unused):
+    """Edits removing the bindings of imp whose local names are in unused."""
+    removed = {b for b in imp.bindings if b.local in unused}
+    if not removed:
+        return []
+    if len(removed) == len(imp.bindings):
+        return [_statement_edit(text, imp)]
+    named = [b for b in imp.bindings if b.named]
+    top = [b for b in imp.bindings if not b.named]
+    edits = []
+    if imp.braces:
+        # The {...} group is an item of the top-level list, removed once it is empty.
+        group = Binding(None, imp.braces[0], imp.braces[1], False, False)
+        top.append(group)
+        if all(b in removed for b in named):
+            removed.add(group)
+        else:
+            edits += _list_edits(text, named, removed)
+    top.sort(key=lambda b: b.start)
+    edits += _list_edits(text, top, removed)
+    return sorted(edits)
+
+
+def _offset(text, line, column):
+    """Offset of a 1-based line and column, or None if the file is shorter."""
+    pos = 0
+    for _ in range(line - 1):
+        pos = text.find('\n', pos) + 1
+        if pos == 0:
+            return None
+    return pos + column - 1
+
+
+def _names_used(text, tokens, imports):
+    """Names the code outside the imports refers to: identifiers and JSX tags.
+
+    Comments and strings are not code, and a property name after . or ?.
+    does not refer to an import.
+    """
+    spans = [(imp.start, imp.end) for imp in imports]
+    used = set()
+    for k, token in enumerate(tokens):
+        if any(a <= token.start < b for a, b in spans):
+            continue
+        if token.kind == 'name':
+            if not (k and _value(text, tokens[k - 1]) in ('.', '?.')):
+                used.add(_value(text, token))
+        elif token.kind == 'jsx':
+            m = _JSX_TAG.match(text, token.start)
+            if m is not None:
+                used.add(m.group(1))
+    return used
+
+
+def unused_bindings(text, imports, diagnostics, tokens=None):
+    """Local names to remove for diagnostics ((line, column, name), ...).
+
+    The binding is found at the reported position, or by name when the
+    file has moved on since the report.  Either way it is only removed if
+    the name does not occur outside the imports any more: a stale report
+    can list an import that has been put to use since.
+
+    Returns (names, skipped) where skipped lists the (line, column, name)
+    that are not unused import bindings in the current text.  tokens are
+    text's tsx_index tokens, scanned again when not given.
+    """
+    used = _names_used(text, tsx_index.scan(text) if tokens is None else tokens, imports)
+    # ESLint points at the local name, the last word of the specifier.
+    by_offset = {b.end - len(b.local): b for imp in imports for b in imp.bindings}
+    by_local = {b.local: b for imp in imports for b in imp.bindings}
+    names = set()
+    skipped = []
+    for line, column, name in diagnostics:
+        binding = by_offset.get(_offset(text, line, column)) if line and column else None
+        if binding is None or binding.local != name:
+            binding = by_local.get(name)
+        if binding is not None and name not in used:
+            names.add(name)
+        else:
+            skipped.append((line, column, name))
+    return names, skipped
+
+
+def fix_file(path, diagnostics, dry_run=False, root=ROOT):
+    """Remove the unused imports diagnostics point at in path; returns a Result.
+
+    path is relative to root, as in the report.
+    """
+    try:
+        content = codemod_io.read_text(os.path.join(root, path))
+        tokens = tsx_index.scan(content)
+        imports = parse_imports(content, tokens)
+        names, skipped = unused_bindings(content, imports, diagnostics, tokens)
+        edits = []
+        for imp in imports:
+            edits += import_edits(content, imp, names)
+        detail = ('%d removed' % len(names)) if names else ''
+        if skipped:
+            detail += '%s%d skipped: %s' % ('; ' if detail else '', len(skipped),
+                                           ', '.join(sorted({n for _, _, n in skipped})))
+        if not edits:
+            return Result(path, UNCHANGED, detail)
+        new_content = span_diff.apply_edits(content, edits)
+        error = tsx_validate.validate(new_content)
+        if error is not None and tsx_validate.validate(content) is None:
+            return Result(path, FAILED, 'output does not parse, not written: %s' % error)
+        if dry_run:
+            return Result(path, CHANGED, detail, diff=span_diff.unified_diff(content, edits, path))
+        codemod_io.write_atomic(os.path.join(root, path), new_content)
+        return Result(path, CHANGED, detail)
+    except Exception as e:
+        return Result(path, FAILED, '%s: %s' % (type(e).__name__, e))
+
+
+def collect(reports=None, prefix=None, path=None, db=lint_report.DEFAULT_DB):
+    """Map file path -> [(line, column, name)] of unused-variable diagnostics.
+
+    Reads the given reports, or the latest run in the lint index.
+    """
+    messages = []
+    if reports:
+        normalize = lint_report.PathNormalizer(prefix=prefix)
+        for report in reports:
+            for file, m in lint_report.iter_messages(report):
+                if m.get('ruleId') in RULES:
+                    messages.append((normalize(file), m.get('line'), m.get('column'), m.get('message', '')))
+    else:
+        with lint_report.LintIndex(db) as index:
+            run = index.latest()
+            for rule in RULES if run is not None else ():
+                messages += [(p, line, col, message)
+                             for _, p, line, col, _, _, message in index.query(run, rule, path)]
+    by_file = defaultdict(set)
+    wanted = path.replace('\\', '/').strip('/') if path else None
+    for file, line, column, message in messages:
+        m = _UNUSED.match(message)
+        if m is None or (wanted and file != wanted and not file.startswith(wanted + '/')):
+            continue
+        by_file[file].add((line, column, m.group(1)))
+    return {file: sorted(found) for file, found in by_file.items()}
+
+
+def run(diagnostics, root=ROOT, jobs=None, dry_run=False, out=sys.stdout, diff_out=None):
+    """Fix every file in diagnostics (from collect) and print a line per file.
+
+    Returns a dict mapping status to the list of paths with that status.
+    """
+    results = {CHANGED: [], UNCHANGED: [], FAILED: []}
+    diff_out = diff_out or out
+
+    def report(result):
+        results[result.status].append(result.path)
+        if result.diff:
+            diff_out.write(result.diff)
+            diff_out.flush()
+        line = '%-9s  %s' % (result.status, result.path)
+        if result.detail:
+            line += '  (%s)' % result.detail
+        print(line, file=out, flush=True)
+
+    work = []
+    for file, found in sorted(diagnostics.items()):
+        if os.path.isfile(os.path.join(root, file)):
+            work.append((file, found))
+        else:
+            # Reports outlive the files they mention.
+            report(Result(file, UNCHANGED, 'no longer exists'))
+
+    if jobs == 1 or len(work) <= 1:
+        for file, found in work:
+            report(fix_file(file, found, dry_run, root))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            files, found = zip(*work)
+            for result in pool.map(fix_file, files, found, [dry_run] * len(work), [root] * len(work)):
+                report(result)
+    print('%d changed, %d unchanged, %d failed%s' % (
+        len(results[CHANGED]), len(results[UNCHANGED]), len(results[FAILED]),
+        ' (dry run, nothing written)' if dry_run else ''), file=out)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Remove the unused imports listed in ESLint reports.')
+    parser.add_argument('reports', nargs='*', help='ESLint reports (default: the latest run in the lint index)')
+    parser.add_argument('--prefix', help='project directory as it appears in the report paths')
+    parser.add_argument('--path', help='only fix this file or directory, relative to the project')
+    parser.add_argument('--db', default=lint_report.DEFAULT_DB, help='lint index (default: %(default)s)')
+    parser.add_argument('--root', default=ROOT, help='project directory the report paths are relative to')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='write nothing; print a unified diff per file to stdout, statuses to stderr')
+    args = parser.parse_args(argv)
+
+    if not args.reports and not os.path.exists(args.db):
+        parser.error('no report given and nothing indexed; pass a report or run "lint_report.py ingest" first')
+    diagnostics = collect(args.reports, args.prefix, args.path, args.db)
+    options = dict(out=sys.stderr, diff_out=sys.stdout) if args.dry_run else {}
+    results = run(diagnostics, args.root, jobs=args.jobs, dry_run=args.dry_run, **options)
+    return 1 if results[FAILED] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,569 @@
+"""Module import graph of the project, and the dead code it shows.
+
+    python import_graph.py check                       # unreachable modules, unused exports, cycles
+    python import_graph.py dependents src/components/AdminPanel.tsx
+    python import_graph.py dependencies src/App.tsx --all
+    python import_graph.py check --entry src/App.tsx
+
+Every .ts/.tsx/.js source under src/, api/, lib/ and scripts/ and in the
+project root is tokenized with tsx_index and its imports and exports are
+read off the top-level tokens: default, named and namespace specifiers,
+type-only imports, side-effect imports, re-exports (export ... from),
+dynamic import() and require().  Relative specifiers are resolved the way
+the bundler does (extension optional, index files, .js meaning .ts);
+anything else is a package.
+
+Parses are cached in .codemod_cache/imports.sqlite by file content, so a
+rebuild only tokenizes the files that changed since, in parallel when
+there are many.  A build of the whole tree from the cache takes a few
+tens of milliseconds, which is what dependents and dependencies cost.
+
+check starts from the entry points (the module scripts in index.html, the
+Vercel functions in api/, scripts/ and the sources in the root, or the
+--entry modules) and reports:
+
+- modules no entry reaches: still type-checked and linted, never shipped;
+- exports of reachable modules that no reachable module imports;
+- import cycles, ignoring type-only imports, which vanish at runtime.
+"""
+import argparse
+import json
+import os
+import posixpath
+import sys
+from collections import namedtuple
+
+import codemod_cache
+import tsx_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DIRS = ('src', 'api', 'lib', 'scripts')
+DEFAULT_CACHE = os.path.join(codemod_cache.CACHE_DIR, 'imports.sqlite')
+SUFFIXES = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs')
+SKIP_DIRS = frozenset(('node_modules', 'dist', 'build'))
+
+# Extensions tried, in order, for a relative specifier without one.
+_RESOLVE = ('.ts', '.tsx', '.d.ts', '.js', '.jsx', '.mjs', '.cjs')
+# What a .js specifier may stand for in a TS project.
+_JS_AS_TS = {'.js': ('.ts', '.tsx'), '.jsx': ('.tsx',), '.mjs': ('.mts',), '.cjs': ('.cts',)}
+
+# One import or re-export of a module.  names are the imported names
+# ('default', '*' for a namespace or everything, or the export's name),
+# empty for a side-effect import.  kind is one of import, type, reexport,
+# dynamic, require.
+ImportRef = namedtuple('ImportRef', 'source names kind line')
+
+# A parsed file: its ImportRefs, the names it exports and the
+# TsxSyntaxError text if it did not tokenize.
+Module = namedtuple('Module', 'path imports exports error')
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _name(text, token):
+    value = _value(text, token)
+    return value[1:-1] if token.kind == 'string' else value
+
+
+def _specifiers(text, tokens, i):
+    """Split the {...} starting at tokens[i] into specifiers; returns (specifiers, index after })."""
+    specifiers = []
+    current = []
+    j = i + 1
+    while j < len(tokens) and _value(text, tokens[j]) != '}':
+        if _value(text, tokens[j]) == ',':
+            if current:
+                specifiers.append(current)
+            current = []
+        else:
+            current.append(_name(text, tokens[j]))
+        j += 1
+    if current:
+        specifiers.append(current)
+    # [type] name [as alias]
+    specifiers = [s[1:] if len(s) > 1 and s[0] == 'type' and s[1] != 'as' else s for s in specifiers]
+    return specifiers, j + 1
+
+
+def _from(text, tokens, j):
+    """The module string after 'from' at tokens[j], and the index past it, or (None, j)."""
+    if (j + 1 < len(tokens) and _value(text, tokens[j]) == 'from'
+            and tokens[j + 1].kind == 'string'):
+        return tokens[j + 1], j + 2
+    return None, j
+
+
+def parse(text):
+    """Module (without a path) for a source text."""
+    try:
+        tokens = tsx_index.scan(text)
+    except tsx_index.TsxSyntaxError as e:
+        return Module(None, [], [], str(e))
+    imports = []
+    exports = []
+
+    def ref(source_token, names, kind):
+        line = tsx_index.position(text, source_token.start)[0]
+        imports.append(ImportRef(_name(text, source_token), tuple(names), kind, line))
+
+    i = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        value = _value(text, token)
+        after = _value(text, tokens[i + 1]) if i + 1 < n else ''
+        if token.kind != 'name' or (i and _value(text, tokens[i - 1]) in ('.', '?.')):
+            i += 1
+        elif value in ('import', 'require') and after == '(':
+            # import('./x') anywhere, require('./x') anywhere.
+            if i + 3 < n and tokens[i + 2].kind == 'string' and _value(text, tokens[i + 3]) in (')', ','):
+                ref(tokens[i + 2], ['*'], 'dynamic' if value == 'import' else 'require')
+            i += 2
+        elif value == 'import' and token.depth == 0 and after != '.':
+            i = _parse_import(text, tokens, i, ref)
+        elif value == 'export' and token.depth == 0:
+            i = _parse_export(text, tokens, i, ref, exports)
+        else:
+            i += 1
+    return Module(None, imports, exports, None)
+
+
+def _parse_import(text, tokens, i, ref):
+    j = i + 1
+    kind = 'import'
+    if (_value(text, tokens[j]) == 'type' and j + 1 < len(tokens)
+            and _value(text, tokens[j + 1]) not in (',', 'from', '=')):
+        kind = 'type'
+        j += 1
+    if tokens[j].kind == 'string':
+        ref(tokens[j], [], kind)
+        return j + 1
+    names = []
+    while j < len(tokens):
+        value = _value(text, tokens[j])
+        if value == '{':
+            specifiers, j = _specifiers(text, tokens, j)
+            names += [s[0] for s in specifiers]
+        elif value == '*':
+            names.append('*')
+            j += 3                      # * as name
+        elif value == ',':
+            j += 1
+        elif value == 'from':
+            source, j = _from(text, tokens, j)
+            if source is not None:
+                ref(source, names, kind)
+            return j
+        elif tokens[j].kind == 'name' and not names:
+            names.append('default')
+            j += 1
+        else:
+            # import x = require(...): the require is picked up on its own.
+            return j
+    return j
+
+
+def _parse_export(text, tokens, i, ref, exports):
+    j = i + 1
+    if j >= len(tokens):
+        return j
+    value = _value(text, tokens[j])
+    kind = 'reexport'
+    if value == 'type' and j + 1 < len(tokens) and _value(text, tokens[j + 1]) in ('{', '*'):
+        kind = 'type'
+        j += 1
+        value = _value(text, tokens[j])
+    if value == 'default':
+        exports.append('default')
+        return j + 1
+    if value == '*':
+        j += 1
+        if _value(text, tokens[j]) == 'as':
+            exports.append(_name(text, tokens[j + 1]))
+            j += 2
+        source, j = _from(text, tokens, j)
+        if source is not None:
+            ref(source, ['*'], kind)
+        return j
+    if value == '{':
+        specifiers, j = _specifiers(text, tokens, j)
+        exports.extend(s[-1] for s in specifiers)
+        source, j = _from(text, tokens, j)
+        if source is not None:
+            ref(source, [s[0] for s in specifiers], kind)
+        return j
+    while j < len(tokens) and _value(text, tokens[j]) in ('declare', 'async', 'abstract', 'const'):
+        # export const enum / export declare const / export async function
+        if _value(text, tokens[j]) == 'const' and _value(text, tokens[j + 1]) != 'enum':
+            break
+        j += 1
+    keyword = _value(text, tokens[j]) if j < len(tokens) else ''
+    if keyword in ('function', 'class', 'const', 'let', 'var', 'interface', 'type', 'enum', 'namespace'):
+        j += 1
+        if j < len(tokens) and _value(text, tokens[j]) == '*':
+            j += 1
+        if j < len(tokens) and tokens[j].kind == 'name':
+            exports.append(_value(text, tokens[j]))
+        elif j < len(tokens) and _value(text, tokens[j]) in ('{', '['):
+            # export const { a, b } = ...
+            depth = tokens[j].depth
+            k = j + 1
+            while k < len(tokens) and tokens[k].depth > depth:
+                if tokens[k].kind == 'name' and _value(text, tokens[k + 1]) in (',', '}', ']', '='):
+                    exports.append(_value(text, tokens[k]))
+                k += 1
+    return j
+
+
+def _hash():
+    """Cache key for the parser: this file and the tokenizer."""
+    return codemod_cache.codemod_hash(__file__) + codemod_cache.codemod_hash(tsx_index.__file__)
+
+
+def _encode(module):
+    return json.dumps({'imports': [list(r) for r in module.imports], 'exports': module.exports,
+                       'error': module.error})
+
+
+def _decode(path, data):
+    data = json.loads(data)
+    imports = [ImportRef(source, tuple(names), kind, line) for source, names, kind, line in data['imports']]
+    return Module(path, imports, data['exports'], data['error'])
+
+
+def _parse_file(root, path):
+    with open(os.path.join(root, path), encoding='utf-8', errors='replace', newline='') as f:
+        return parse(f.read())._replace(path=path)
+
+
+def sources(root=ROOT, dirs=DIRS):
+    """Every source file under dirs and in root, as paths relative to root with forward slashes."""
+    found = [entry for entry in os.listdir(root)
+             if entry.endswith(SUFFIXES) and os.path.isfile(os.path.join(root, entry))]
+    for directory in dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS)
+            relative = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            found += [relative + '/' + f for f in filenames if f.endswith(SUFFIXES)]
+    return sorted(found)
+
+
+def parse_all(root=ROOT, paths=None, cache_path=DEFAULT_CACHE, jobs=None):
+    """{path: Module} for paths (default: sources(root)), cached by content."""
+    paths = sources(root) if paths is None else paths
+    modules = {}
+    missing = []
+    cache = codemod_cache.Cache(cache_path, max_entries=8192) if cache_path else None
+    try:
+        parser_key = _hash() if cache else None
+        keys = {}
+        for path in paths:
+            if cache is not None:
+                with open(os.path.join(root, path), 'rb') as f:
+                    keys[path] = codemod_cache.content_hash(f.read())
+                hit = cache.get(keys[path], parser_key)
+                if hit is not None and hit is not codemod_cache.UNCHANGED:
+                    modules[path] = _decode(path, hit)
+                    continue
+            missing.append(path)
+        if jobs == 1 or len(missing) < 8:
+            parsed = [_parse_file(root, path) for path in missing]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                parsed = list(pool.map(_parse_file, [root] * len(missing), missing, chunksize=8))
+        for module in parsed:
+            modules[module.path] = module
+            if cache is not None:
+                cache.put(keys[module.path], parser_key, _encode(module))
+    finally:
+        if cache is not None:
+            cache.close()
+    return modules
+
+
+class Graph:
+    """Resolved import edges between the modules of a project."""
+
+    def __init__(self, modules, root=ROOT):
+        self.root = root
+        self.modules = modules
+        # path -> [(target path or None, ImportRef)]; None: a package or a missing file.
+        self.edges = {}
+        self.importers = {path: [] for path in modules}
+        for path, module in modules.items():
+            edges = self.edges[path] = []
+            for ref in module.imports:
+                target = self.resolve(path, ref.source)
+                edges.append((target, ref))
+                if target is not None:
+                    self.importers[target].append((path, ref))
+
+    def resolve(self, importer, source):
+        """The module path a specifier in importer refers to, or None."""
+        if not source.startswith(('./', '../', '/')) and source not in ('.', '..'):
+            return None
+        if source.startswith('/'):
+            base = posixpath.normpath(source.lstrip('/'))
+        else:
+            base = posixpath.normpath(posixpath.join(posixpath.dirname(importer), source))
+        stem, extension = posixpath.splitext(base)
+        candidates = [base] + [base + e for e in _RESOLVE] + [base + '/index' + e for e in _RESOLVE]
+        candidates += [stem + e for e in _JS_AS_TS.get(extension, ())]
+        for candidate in candidates:
+            if candidate in self.modules:
+                return candidate
+        return None
+
+    def packages(self, path):
+        """Bare specifiers path imports, like 'react' or 'lucide-react/icons'."""
+        return sorted({ref.source for target, ref in self.edges[path]
+                       if target is None and not ref.source.startswith(('.', '/'))})
+
+    def unresolved(self):
+        """(path, ImportRef) for relative imports of files that are not sources (CSS, assets, typos)."""
+        return [(path, ref) for path, edges in self.edges.items() for target, ref in edges
+                if target is None and ref.source.startswith(('.', '/'))
+                and not os.path.exists(os.path.join(self.root, posixpath.normpath(
+                    posixpath.join(posixpath.dirname(path), ref.source))))]
+
+    def _walk(self, starts, step, depth=None, kinds=None):
+        seen = {}
+        frontier = list(starts)
+        level = 0
+        while frontier and (depth is None or level < depth):
+            level += 1
+            following = []
+            for path in frontier:
+                for other, ref in step(path):
+                    if other is not None and other not in seen and (kinds is None or ref.kind in kinds):
+                        seen[other] = level
+                        following.append(other)
+            frontier = following
+        return seen
+
+    def dependencies(self, path, depth=None, kinds=None):
+        """{module: distance} of everything path imports, directly or not (through kinds of import)."""
+        return self._walk([path], lambda p: self.edges[p], depth, kinds)
+
+    def dependents(self, path, depth=None):
+        """{module: distance} of everything that imports path, directly or not."""
+        return self._walk([path], lambda p: self.importers[p], depth)
+
+    def reachable(self, entries, kinds=None, cut=()):
+        """Modules reachable from entries, entries included.
+
+        kinds limits the walk to those kinds of import; cut is a set of
+        (importer, imported) edges to leave out.
+        """
+        step = lambda p: [(t, r) for t, r in self.edges[p] if (p, t) not in cut]
+        return set(entries) | set(self._walk(entries, step if cut else lambda p: self.edges[p], kinds=kinds))
+
+    def unused_exports(self, live, entries=()):
+        """{path: [names]} of exports of live modules that no live module imports.
+
+        A namespace import, an export * or a dynamic import uses every name.
+        Entry modules export to whatever loads them and are skipped.
+        """
+        unused = {}
+        for path in sorted(live):
+            if path in entries:
+                continue
+            exports = self.modules[path].exports
+            if not exports:
+                continue
+            used = set()
+            for importer, ref in self.importers[path]:
+                if importer in live:
+                    used.update(ref.names)
+            if '*' in used:
+                continue
+            names = [name for name in exports if name not in used]
+            if names:
+                unused[path] = names
+        return unused
+
+    def cycles(self):
+        """Import cycles (strongly connected modules), ignoring type-only imports."""
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+        counter = 0
+        for start in sorted(self.modules):
+            if start in index:
+                continue
+            work = [(start, iter(self.edges[start]))]
+            index[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                path, edges = work[-1]
+                for target, ref in edges:
+                    if target is None or ref.kind == 'type':
+                        continue
+                    if target not in index:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.edges[target])))
+                        break
+                    if target in on_stack:
+                        low[path] = min(low[path], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[path])
+                    if low[path] == index[path]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == path:
+                                break
+                        if len(component) > 1 or any(t == path and r.kind != 'type'
+                                                     for t, r in self.edges[path]):
+                            cycles.append(self._order(sorted(component)))
+        return sorted(cycles)
+
+    def _order(self, component):
+        """A cycle through component, as a path list starting and ending at its first module."""
+        members = set(component)
+        start = component[0]
+        # Breadth-first back to start, inside the component.
+        previous = {start: None}
+        frontier = [start]
+        while frontier:
+            following = []
+            for path in frontier:
+                for target, ref in self.edges[path]:
+                    if target == start and ref.kind != 'type':
+                        route = [path]
+                        while previous[route[-1]] is not None:
+                            route.append(previous[route[-1]])
+                        return route[::-1] + [start]
+                    if target in members and target not in previous and ref.kind != 'type':
+                        previous[target] = path
+                        following.append(target)
+            frontier = following
+        return component + [start]
+
+
+def entries(root=ROOT):
+    """Default entry points: index.html module scripts, api/ and scripts/ files, root sources."""
+    found = []
+    html = os.path.join(root, 'index.html')
+    if os.path.isfile(html):
+        import re
+        with open(html, encoding='utf-8') as f:
+            for m in re.finditer(r'<script\b[^>]*\btype="module"[^>]*\bsrc="/?([^"]+)"', f.read()):
+                found.append(m.group(1))
+    for path in sources(root, ()):
+        found.append(path)
+    for directory in ('api', 'scripts'):
+        folder = os.path.join(root, directory)
+        if os.path.isdir(folder):
+            found += ['%s/%s' % (directory, f) for f in sorted(os.listdir(folder)) if f.endswith(SUFFIXES)]
+    return found
+
+
+def build(root=ROOT, cache_path=DEFAULT_CACHE, jobs=None):
+    """The Graph of every source under root."""
+    return Graph(parse_all(root, cache_path=cache_path, jobs=jobs), root)
+
+
+def _size(root, path):
+    try:
+        return os.path.getsize(os.path.join(root, path))
+    except OSError:
+        return 0
+
+
+def check(graph, entry_points, out=sys.stdout):
+    """Print unreachable modules, unused exports and cycles; returns the number of findings."""
+    missing = [e for e in entry_points if e not in graph.modules]
+    for entry in missing:
+        print('entry %s is not a source file, ignored' % entry, file=sys.stderr)
+    entry_points = [e for e in entry_points if e in graph.modules]
+    live = graph.reachable(entry_points)
+
+    dead = sorted(p for p in graph.modules if p not in live)
+    print('unreachable modules (%d):' % len(dead), file=out)
+    for path in dead:
+        importers = sorted({p for p, _ in graph.importers[path]})
+        note = '  imported only by %s' % ', '.join(importers) if importers else ''
+        print('  %-50s %7.1f KB%s' % (path, _size(graph.root, path) / 1024, note), file=out)
+
+    unused = graph.unused_exports(live, set(entry_points))
+    print('\nunused exports (%d):' % sum(len(names) for names in unused.values()), file=out)
+    for path, names in unused.items():
+        print('  %s: %s' % (path, ', '.join(names)), file=out)
+
+    cycles = graph.cycles()
+    print('\nimport cycles (%d):' % len(cycles), file=out)
+    for cycle in cycles:
+        print('  ' + ' -> '.join(cycle), file=out)
+
+    broken = [(path, module.error) for path, module in sorted(graph.modules.items()) if module.error]
+    if broken:
+        print('\nnot tokenized, imports unknown (%d):' % len(broken), file=out)
+        for path, error in broken:
+            print('  %s:%s' % (path, error), file=out)
+    return len(dead) + len(unused) + len(cycles)
+
+
+def _relative(root, path):
+    """A command-line path as a graph path."""
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the import graph and report dead modules and cycles.')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('--no-cache', action='store_true', help='parse every file again')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = commands.add_parser('check', help='unreachable modules, unused exports and import cycles')
+    check_parser.add_argument('--entry', action='append', metavar='PATH',
+                              help='entry module (repeatable; default: index.html, api/, scripts/, root files)')
+    for name, text in (('dependents', 'modules that import PATH'), ('dependencies', 'modules PATH imports')):
+        command = commands.add_parser(name, help=text)
+        command.add_argument('path')
+        command.add_argument('--all', action='store_true', help='indirect ones too, with their distance')
+        if name == 'dependencies':
+            command.add_argument('--packages', action='store_true', help='list the packages imported as well')
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    graph = build(root, None if args.no_cache else DEFAULT_CACHE, args.jobs)
+    if args.command == 'check':
+        entry_points = [_relative(root, e) for e in args.entry] if args.entry else entries(root)
+        check(graph, entry_points)
+        return 0
+
+    path = _relative(root, args.path)
+    if path not in graph.modules:
+        parser.error('%s is not a source file under %s' % (args.path, root))
+    walk = graph.dependents if args.command == 'dependents' else graph.dependencies
+    found = walk(path, None if args.all else 1)
+    for other, distance in sorted(found.items(), key=lambda item: (item[1], item[0])):
+        print('%s%s' % (other, '  (%d)' % distance if args.all else ''))
+    if args.command == 'dependencies' and args.packages:
+        packages = set()
+        for module in [path] + list(found):
+            packages.update(graph.packages(module))
+        for package in sorted(packages):
+            print(package)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,512 @@
+"""Find the columns the API filters and sorts on that no index supports.
+
+    python index_advisor.py                  # report, most used unindexed columns first
+    python index_advisor.py --sql            # the candidate migration, to stdout
+    python index_advisor.py --write          # ... written as migrations/NNN_add_query_indexes.sql
+
+Every Supabase query in api/*.ts is read off the tsx_index tokens: the
+table of .from('table') and each call chained after it, including chains
+kept in a variable and extended later (query = query.eq(...)), the way
+api/resources.ts builds its list query.  Filters added under an if are
+optional.  Columns come from eq/neq/in/is/gt/gte/lt/lte, like/ilike,
+contains/containedBy/overlaps, match({...}), filter(col, ...), the
+col.op.value terms of or(`...`) and order(col).
+
+The schema is what migrations/*.sql, schema_fix.sql and
+force_create_table.sql declare: primary keys, UNIQUE constraints and
+CREATE INDEX statements.  resources and users were created in the Supabase
+dashboard and have no CREATE TABLE here; for such tables the primary key
+is assumed to be one of ASSUMED_KEYS.
+
+A column is supported when a btree index starts with it (or, for a sort,
+starts with the query's other equality columns and then it); contains and
+overlaps need a GIN index on the column, and like/ilike with a leading %
+a trigram index, which the migration proposes commented out, as it needs
+the pg_trgm extension.  Each candidate index is the query's required
+equality columns followed by its sort column, or a single column for an
+optional filter; candidates that an existing index or a longer candidate
+already covers are dropped, and the rest are ranked by the number of
+queries they serve.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from collections import namedtuple
+
+import tsx_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCES = ('api/*.ts',)
+SCHEMA = ('migrations/*.sql', 'schema_fix.sql', 'force_create_table.sql')
+ASSUMED_KEYS = ('_id', 'id')
+
+# Filters an index can serve as an equality, as a range, or not usefully.
+EQUALITY = frozenset(('eq', 'in', 'is', 'match'))
+RANGE = frozenset(('gt', 'gte', 'lt', 'lte'))
+ARRAY = frozenset(('contains', 'containedBy', 'overlaps'))
+PATTERN = frozenset(('like', 'ilike'))
+FILTERS = EQUALITY | RANGE | ARRAY | PATTERN | frozenset(('neq', 'filter', 'or', 'textSearch'))
+
+# One column a query uses.  op is the method (eq, order, ...), optional
+# is True when it is only added under a condition, value the pattern of a
+# like filter when it is a literal, for telling prefix from substring.
+Use = namedtuple('Use', 'column op optional value')
+
+# A query: path:line of .from(), the table, the action (select, update,
+# delete, upsert, insert) and its Uses.
+Query = namedtuple('Query', 'path line table action uses')
+
+# An index in the schema; columns is a tuple, method btree/gin/...
+Index = namedtuple('Index', 'table columns method unique source')
+
+_ACTIONS = frozenset(('select', 'update', 'delete', 'upsert', 'insert'))
+_OR_TERM = re.compile(r'(?:^|,)\s*(\w+)\.(?:not\.)?(\w+)\.')
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _string(text, token):
+    if token.kind in ('string', 'template'):
+        return text[token.start + 1:token.end - 1]
+    return None
+
+
+def _close(tokens, j):
+    """Index of the bracket closing the one at tokens[j]."""
+    depth = tokens[j].depth
+    k = j + 1
+    while k < len(tokens) and tokens[k].depth > depth:
+        k += 1
+    return k
+
+
+def _conditional(text, tokens, k):
+    """Whether the statement starting at tokens[k] runs under an if or else."""
+    if k == 0:
+        return False
+    before = tokens[k - 1]
+    value = _value(text, before)
+    if value == 'else':
+        return True
+    if value == ')':
+        # if (...) statement: find the ( and look at what precedes it.
+        j = k - 2
+        while j >= 0 and tokens[j].depth > before.depth:
+            j -= 1
+        return j > 0 and _value(text, tokens[j - 1]) == 'if'
+    if value == '{':
+        return _conditional(text, tokens, k - 1)
+    return False
+
+
+def _chain(text, tokens, j, table, optional, uses):
+    """Read the calls chained from tokens[j] (a '.'); returns (action, index after the chain)."""
+    action = None
+    while (j + 2 < len(tokens) and _value(text, tokens[j]) == '.'
+           and tokens[j + 1].kind == 'name' and _value(text, tokens[j + 2]) == '('):
+        method = _value(text, tokens[j + 1])
+        end = _close(tokens, j + 2)
+        args = tokens[j + 3:end]
+        first = _string(text, args[0]) if args else None
+        if method in _ACTIONS:
+            action = action or method
+        elif method == 'order' and first:
+            uses.append(Use(first, 'order', optional, None))
+        elif method == 'match' and args and _value(text, args[0]) == '{':
+            depth = args[0].depth + 1
+            for k, token in enumerate(args[1:-1], 1):
+                if token.depth == depth and token.kind in ('name', 'string') and _value(text, args[k + 1]) == ':':
+                    uses.append(Use(_string(text, token) or _value(text, token), 'match', optional, None))
+        elif method == 'or' and first:
+            for m in _OR_TERM.finditer(first):
+                uses.append(Use(m.group(1), m.group(2), True, None))
+        elif method in FILTERS and first:
+            value = _string(text, args[2]) if len(args) > 2 and _value(text, args[1]) == ',' else None
+            uses.append(Use(first, method, optional, value))
+        j = end + 1
+    return action, j
+
+
+def queries(text, path):
+    """The Queries of a TS source."""
+    tokens = tsx_index.scan(text)
+    found = []
+    variables = {}          # name -> index in found of the query it holds
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if (token.kind == 'name' and _value(text, token) == 'from' and i > 0
+                and _value(text, tokens[i - 1]) == '.' and i + 3 < len(tokens)
+                and _value(text, tokens[i + 1]) == '(' and tokens[i + 2].kind == 'string'
+                and _value(text, tokens[i + 3]) == ')'):
+            table = _string(text, tokens[i + 2])
+            uses = []
+            action, end = _chain(text, tokens, i + 4, table, False, uses)
+            line = tsx_index.position(text, token.start)[0]
+            found.append(Query(path, line, table, action or 'select', uses))
+            # let query = supabase.from(...) / query = supabase.from(...)
+            root = i - 2
+            while root > 0 and _value(text, tokens[root - 1]) == '.':
+                root -= 2
+            if root >= 2 and _value(text, tokens[root - 1]) == '=' and tokens[root - 2].kind == 'name':
+                variables[_value(text, tokens[root - 2])] = len(found) - 1
+            i = end
+            continue
+        name = _value(text, token) if token.kind == 'name' else None
+        if (name in variables and (i == 0 or _value(text, tokens[i - 1]) not in ('.', '?.'))
+                and i + 1 < len(tokens) and _value(text, tokens[i + 1]) == '.'):
+            # query = query.eq(...) or await query.order(...)
+            start = i - 2 if i >= 2 and _value(text, tokens[i - 1]) == '=' else i
+            if _value(text, tokens[start - 1]) == 'await' if start else False:
+                start -= 1
+            query = found[variables[name]]
+            optional = _conditional(text, tokens, start)
+            action, end = _chain(text, tokens, i + 1, query.table, optional, query.uses)
+            if action and query.action == 'select' and action != 'select':
+                found[variables[name]] = query._replace(action=action)
+            i = max(end, i + 1)
+            continue
+        i += 1
+    return found
+
+
+def _identifier(name):
+    """An SQL identifier as Postgres stores it: quoted kept, unquoted lowercased."""
+    name = name.strip()
+    if name.startswith('"') and name.endswith('"'):
+        return name[1:-1]
+    return name.split('.')[-1].lower()
+
+
+def _columns(text):
+    """Column names of an index or key column list like ("createdAt" DESC, status)."""
+    columns = []
+    for part in _split(text):
+        m = re.match(r'\s*("[^"]+"|[\w.]+)', part)
+        if m:
+            columns.append(_identifier(m.group(1)))
+    return tuple(columns)
+
+
+def _split(text):
+    """Split on commas outside parentheses and quotes."""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for k, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in '"\'':
+            quote = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            parts.append(text[start:k])
+            start = k + 1
+    parts.append(text[start:])
+    return parts
+
+
+_COMMENT = re.compile(r'--[^\n]*|/\*[\s\S]*?\*/')
+_NAME = r'("[^"]+"|[\w.]+)'
+_CREATE_TABLE = re.compile(r'\bcreate\s+table\s+(?:if\s+not\s+exists\s+)?' + _NAME + r'\s*\(', re.I)
+_CREATE_INDEX = re.compile(r'\bcreate\s+(unique\s+)?index\s+(?:concurrently\s+)?(?:if\s+not\s+exists\s+)?'
+                           r'(?:' + _NAME + r'\s+)?on\s+(?:only\s+)?' + _NAME +
+                           r'\s*(?:using\s+(\w+)\s*)?\(', re.I)
+_ALTER_KEY = re.compile(r'\balter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?' + _NAME +
+                        r'\s+add\s+(?:constraint\s+' + _NAME + r'\s+)?(primary\s+key|unique)\s*\(', re.I)
+_ALTER_COLUMN = re.compile(r'\balter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?' + _NAME +
+                           r'\s+add\s+column\s+(?:if\s+not\s+exists\s+)?' + _NAME + r'([^;,]*)', re.I)
+
+
+def _body(text, open_paren):
+    """The text between the parenthesis at open_paren and its match."""
+    depth = 0
+    for k in range(open_paren, len(text)):
+        if text[k] == '(':
+            depth += 1
+        elif text[k] == ')':
+            depth -= 1
+            if depth == 0:
+                return text[open_paren + 1:k]
+    return text[open_paren + 1:]
+
+
+def schema(text, source):
+    """(tables {name: set of columns}, [Index]) declared by an SQL script."""
+    # Blank out comments, keeping offsets for line numbers.
+    text = _COMMENT.sub(lambda m: re.sub(r'[^\n]', ' ', m.group()), text)
+    tables = {}
+    indexes = []
+
+    def where(offset):
+        return '%s:%d' % (source, text.count('\n', 0, offset) + 1)
+
+    for m in _CREATE_TABLE.finditer(text):
+        table = _identifier(m.group(1))
+        columns = tables.setdefault(table, set())
+        for part in _split(_body(text, m.end() - 1)):
+            words = part.split()
+            if not words:
+                continue
+            head = ' '.join(words[:2]).lower()
+            if head in ('primary key', 'unique') or words[0].lower() in ('constraint', 'unique'):
+                key = re.search(r'\b(primary\s+key|unique)\s*\(([^)]*)\)', part, re.I)
+                if key:
+                    indexes.append(Index(table, _columns(key.group(2)), 'btree', True, where(m.start())))
+                continue
+            if words[0].lower() in ('foreign', 'check', 'exclude', 'like'):
+                continue
+            column = _identifier(words[0])
+            columns.add(column)
+            if re.search(r'\b(primary\s+key|unique)\b', part, re.I):
+                indexes.append(Index(table, (column,), 'btree', True, where(m.start())))
+    for m in _CREATE_INDEX.finditer(text):
+        table = _identifier(m.group(3))
+        indexes.append(Index(table, _columns(_body(text, m.end() - 1)), (m.group(4) or 'btree').lower(),
+                             bool(m.group(1)), where(m.start())))
+    for m in _ALTER_KEY.finditer(text):
+        indexes.append(Index(_identifier(m.group(1)), _columns(_body(text, m.end() - 1)), 'btree', True,
+                             where(m.start())))
+    for m in _ALTER_COLUMN.finditer(text):
+        table = _identifier(m.group(1))
+        column = _identifier(m.group(2))
+        if table in tables:
+            tables[table].add(column)
+        if re.search(r'\b(primary\s+key|unique)\b', m.group(3), re.I):
+            indexes.append(Index(table, (column,), 'btree', True, where(m.start())))
+    return tables, indexes
+
+
+def _paths(root, patterns):
+    paths = []
+    for pattern in patterns:
+        paths += sorted(glob.glob(os.path.join(root, pattern)))
+    return paths
+
+
+def _relative(root, path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def load(root=ROOT, sources=SOURCES, scripts=SCHEMA):
+    """([Query], tables, [Index]) of a project."""
+    found = []
+    for path in _paths(root, sources):
+        with open(path, encoding='utf-8') as f:
+            found += queries(f.read(), _relative(root, path))
+    tables = {}
+    indexes = []
+    for path in _paths(root, scripts):
+        with open(path, encoding='utf-8') as f:
+            declared, declared_indexes = schema(f.read(), _relative(root, path))
+        for table, columns in declared.items():
+            tables.setdefault(table, set()).update(columns)
+        indexes += declared_indexes
+    return found, tables, indexes
+
+
+def _same(column, name):
+    return column == name or column.lower() == name
+
+
+def supported(table, columns, indexes, tables, method='btree'):
+    """The Index serving a lookup on columns (leading, in order), or None.
+
+    For a table with no CREATE TABLE, a lookup on ASSUMED_KEYS is taken as
+    served by its primary key, and returns True.
+    """
+    for index in indexes:
+        if index.table != table or (index.method != method and not (method == 'btree' and index.unique)):
+            continue
+        if len(index.columns) >= len(columns) and all(
+                _same(c, i) for c, i in zip(columns, index.columns)):
+            return index
+    if table not in tables and len(columns) == 1 and columns[0] in ASSUMED_KEYS:
+        return True
+    return None
+
+
+def _key(table, column, indexes, tables):
+    """Whether column alone is a primary key or unique on table (assumed, for undeclared tables)."""
+    if table not in tables and column in ASSUMED_KEYS:
+        return True
+    return any(index.table == table and index.unique and len(index.columns) == 1
+               and _same(column, index.columns[0]) for index in indexes)
+
+
+def _quote(column):
+    return column if re.match(r'^[a-z_][a-z0-9_]*$', column) else '"%s"' % column
+
+
+# A proposed index: table, columns, method, the queries it serves and why.
+Candidate = namedtuple('Candidate', 'table columns method queries reason')
+
+
+def candidates(found, tables, indexes):
+    """Candidate indexes, the most used first."""
+    wanted = {}
+
+    def want(table, columns, method, query, reason):
+        key = (table, tuple(columns), method)
+        entry = wanted.setdefault(key, [[], reason])
+        if query not in entry[0]:
+            entry[0].append(query)
+
+    for query in found:
+        required = []
+        for use in query.uses:
+            if use.op in EQUALITY and not use.optional and use.column not in required:
+                required.append(use.column)
+        orders = [u.column for u in query.uses if u.op == 'order']
+        if any(_key(query.table, column, indexes, tables) for column in required):
+            # A key lookup returns a row or a handful; nothing to add.
+            continue
+        if required or orders:
+            columns = required + [c for c in orders[:1] if c not in required]
+            # The sort only helps after the equalities; ranges can follow as well.
+            if not supported(query.table, columns, indexes, tables):
+                want(query.table, columns, 'btree', query,
+                     'sort after equality' if required and orders else 'sort' if orders else 'equality')
+        for use in query.uses:
+            column = use.column
+            if use.op in ARRAY:
+                if not supported(query.table, [column], indexes, tables, 'gin'):
+                    want(query.table, [column], 'gin', query, 'array %s' % use.op)
+            elif use.op in PATTERN and (use.value is None or use.value.startswith('%')):
+                want(query.table, [column], 'trigram', query, 'substring %s' % use.op)
+            elif (use.op in EQUALITY | RANGE or use.op in PATTERN) and use.column not in required:
+                if not supported(query.table, [column], indexes, tables):
+                    want(query.table, [column], 'btree', query,
+                         'optional filter' if use.optional else '%s filter' % use.op)
+
+    # A btree candidate that is a prefix of another on the same table is covered by it.
+    keys = list(wanted)
+    for key in keys:
+        table, columns, method = key
+        if method != 'btree':
+            continue
+        for other in keys:
+            if (other != key and other in wanted and other[0] == table and other[2] == 'btree'
+                    and len(other[1]) > len(columns) and other[1][:len(columns)] == columns):
+                wanted[other][0].extend(q for q in wanted[key][0] if q not in wanted[other][0])
+                del wanted[key]
+                break
+    result = [Candidate(table, columns, method, queries, reason)
+              for (table, columns, method), (queries, reason) in wanted.items()]
+    result.sort(key=lambda c: (-len(c.queries), c.method == 'trigram', c.table, c.columns))
+    return result
+
+
+def _index_name(candidate):
+    suffix = {'gin': '_gin', 'trigram': '_trgm'}.get(candidate.method, '')
+    return 'idx_%s_%s%s' % (candidate.table, '_'.join(re.sub(r'(?<!^)(?=[A-Z])', '_', c).lower().strip('_')
+                                                       for c in candidate.columns), suffix)
+
+
+def migration(found_candidates, header):
+    """The text of a migration creating the candidates."""
+    lines = ['-- %s' % line for line in header]
+    lines.append('')
+    trigram = [c for c in found_candidates if c.method == 'trigram']
+    for candidate in found_candidates:
+        if candidate.method == 'trigram':
+            continue
+        sites = ', '.join('%s:%d' % (q.path, q.line) for q in candidate.queries[:4])
+        if len(candidate.queries) > 4:
+            sites += ', +%d more' % (len(candidate.queries) - 4)
+        lines.append('-- %s; %d quer%s: %s' % (candidate.reason, len(candidate.queries),
+                                               'y' if len(candidate.queries) == 1 else 'ies', sites))
+        using = ' USING gin' if candidate.method == 'gin' else ''
+        lines.append('CREATE INDEX IF NOT EXISTS %s ON %s%s (%s);' % (
+            _index_name(candidate), candidate.table, using, ', '.join(_quote(c) for c in candidate.columns)))
+        lines.append('')
+    if trigram:
+        lines.append('-- Substring searches (ilike \'%...%\') need trigram indexes; they are larger and slower')
+        lines.append('-- to write, so enable them only if these searches are slow:')
+        lines.append('-- CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+        for candidate in trigram:
+            lines.append('-- CREATE INDEX IF NOT EXISTS %s ON %s USING gin (%s gin_trgm_ops);' % (
+                _index_name(candidate), candidate.table, _quote(candidate.columns[0])))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def next_migration(root=ROOT, name='add_query_indexes'):
+    """Path of the next numbered migration in root/migrations."""
+    numbers = [int(m.group(1)) for m in (re.match(r'(\d+)_', os.path.basename(p))
+                                         for p in glob.glob(os.path.join(root, 'migrations', '*.sql'))) if m]
+    return os.path.join(root, 'migrations', '%03d_%s.sql' % (max(numbers, default=0) + 1, name))
+
+
+def report(found, tables, indexes, found_candidates, out=sys.stdout):
+    print('%d queries on %d tables; %d indexes and keys declared' % (
+        len(found), len({q.table for q in found}), len(indexes)), file=out)
+    # Columns used with no supporting index, by number of queries.
+    counts = {}
+    for query in found:
+        for use in query.uses:
+            method = 'gin' if use.op in ARRAY else 'btree'
+            if use.op in ('neq', 'textSearch', 'filter'):
+                continue
+            if supported(query.table, [use.column], indexes, tables, method):
+                continue
+            entry = counts.setdefault((query.table, use.column), [0, set(), []])
+            entry[1].add(use.op)
+            site = '%s:%d' % (query.path, query.line)
+            if site not in entry[2]:
+                entry[0] += 1
+                entry[2].append(site)
+    print('\nunindexed filter and sort columns:', file=out)
+    for (table, column), (n, ops, sites) in sorted(counts.items(), key=lambda item: (-item[1][0], item[0])):
+        print('  %3d  %-36s %-18s %s%s' % (n, '%s.%s' % (table, column), ','.join(sorted(ops)),
+                                          ', '.join(sites[:3]), ', ...' if len(sites) > 3 else ''), file=out)
+    unknown = sorted({q.table for q in found} - set(tables))
+    if unknown:
+        print('\nnot created by any migration, primary key assumed on %s: %s' % (
+            ' or '.join(ASSUMED_KEYS), ', '.join(unknown)), file=out)
+    print('\ncandidate indexes:', file=out)
+    for candidate in found_candidates:
+        print('  %3d  %-8s %s (%s)  %s' % (len(candidate.queries), candidate.method, candidate.table,
+                                          ', '.join(candidate.columns), candidate.reason), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report API filter and sort columns with no supporting index.')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('--sql', action='store_true', help='print the candidate migration instead of the report')
+    parser.add_argument('--write', action='store_true', help='write the candidate migration into migrations/')
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    found, tables, indexes = load(root)
+    found_candidates = candidates(found, tables, indexes)
+    if not args.sql and not args.write:
+        report(found, tables, indexes, found_candidates)
+        return 0
+    if not found_candidates:
+        print('every filter and sort column has an index', file=sys.stderr)
+        return 0
+    header = ['Indexes for the filters and sorts of the API handlers (api/*.ts) that no',
+              'migration indexes yet.  Proposed by index_advisor.py; review before running.']
+    text = migration(found_candidates, header)
+    if args.sql:
+        sys.stdout.write(text)
+    if args.write:
+        path = next_migration(root)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(text)
+        print('wrote %s' % _relative(root, path), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""Move the tree from framer-motion's motion.* to m.* under a LazyMotion.
+
+    python lazy_motion.py --dry-run      # diffs and findings, nothing written
+    python lazy_motion.py                # migrate src/
+    python codemod_runner.py lazy_motion 'src/components/*.tsx'    # just the m.* rewrite
+
+motion.div carries every animation feature (gestures, drag, layout
+animations) into each chunk that imports it.  m.div is the same component
+without them; a LazyMotion above it supplies the features, and with
+features={() => import(...)} they are fetched after the first render
+instead of being parsed before it.
+
+In every file that imports motion from framer-motion this rewrites the
+import to m and <motion.div>, </motion.div> and motion.div to m.div; the
+props (animate, transition, layoutId, ...) are left exactly as they are.
+Where a local m (messages.filter(m => ...)) would shadow the import
+around a tag, the import becomes m as motion and the tags stay.  That is all transform() does,
+so the runner can apply it file by file.
+
+Run on its own it also:
+
+- writes src/lib/motionFeatures.ts, which exports domAnimation or, when a
+  migrated element uses layout, layoutId, drag or pan props, domMax;
+- wraps <App /> in src/main.tsx in <LazyMotion features={...}> loading that
+  module, strict (any motion.* left throws) unless something still needs
+  the full component;
+- flags what needs the heavier set: props that need domMax, and Reorder,
+  motion() and motion.create(), which render the full motion component
+  and keep it in their chunk whatever LazyMotion provides.
+
+All files are validated, then replaced together or not at all.
+"""
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+import codemod_io
+import span_diff
+import tsx_index
+import tsx_validate
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY = 'src/main.tsx'
+FEATURES = 'src/lib/motionFeatures.ts'
+SUFFIXES = ('.ts', '.tsx', '.jsx')
+
+# Props of an m.* element that domAnimation does not support.
+DOM_MAX_PROPS = re.compile(r'(?:layout(?:Id|Dependency|Scroll|Root)?|drag\w*|whileDrag|onDrag\w*|onPan\w*)$')
+# Imports that render or need the full feature set.
+FULL_IMPORTS = {'Reorder': 'motion', 'LayoutGroup': 'domMax', 'AnimateSharedLayout': 'domMax',
+                'useDragControls': 'domMax'}
+
+# Something that needs more than m.* with domAnimation.  needs is domMax
+# (the bigger feature bundle) or motion (the full component stays).
+Finding = namedtuple('Finding', 'path line what needs')
+
+_FRAMER_IMPORT = re.compile(r'^import[ \t]*\{([^}]*)\}[ \t]*from[ \t]*([\'"])framer-motion\2', re.M)
+_TAG = re.compile(r'(</?)motion\.(?=\w)')
+_ATTRIBUTE = re.compile(r'[\w-]+')
+
+
+def _imports(text):
+    """(match, [specifier text]) of the named import from framer-motion, or (None, [])."""
+    m = _FRAMER_IMPORT.search(text)
+    if m is None:
+        return None, []
+    return m, [s.strip() for s in m.group(1).split(',') if s.strip()]
+
+
+def _attributes(text, pos):
+    """(name, offset) of each attribute of the opening tag whose name ends at pos."""
+    found = []
+    n = len(text)
+    while pos < n:
+        c = text[pos]
+        if c == '>' or text.startswith('/>', pos):
+            break
+        if c == '{':
+            pos = tsx_index.scan_expression(text, pos + 1)[1]
+        elif c in '"\'':
+            pos = text.index(c, pos + 1) + 1
+        elif c.isalpha() or c == '_':
+            m = _ATTRIBUTE.match(text, pos)
+            found.append((m.group(), pos))
+            pos = m.end()
+        else:
+            pos += 1
+    return found
+
+
+def _scope_end(text, tokens, i):
+    """Where a name bound at tokens[i] stops being visible, or None if it is not bound there.
+
+    Parameters (of arrow functions, functions, methods and catch clauses)
+    and const/let/var are understood, also where they are destructured; the
+    scope is never shorter than the real one.
+    """
+    value = lambda k: text[tokens[k].start:tokens[k].end] if 0 <= k < len(tokens) else ''
+
+    def opener(k):
+        j = k - 1
+        while j >= 0 and tokens[j].depth >= tokens[k].depth:
+            j -= 1
+        return j
+
+    def closer(k):
+        j = k + 1
+        while j < len(tokens) and tokens[j].depth > tokens[k].depth:
+            j += 1
+        return j
+
+    # Climb out of destructuring patterns ({ m }, { a: m = 1 }, [a, m]) to
+    # the parameter list or declaration they are in.
+    k = i
+    bracket = None
+    while value(k - 1) in ('(', '{', '[', ',', ':', '...'):
+        bracket = opener(k)
+        if value(bracket) == '{' and value(k + 1) == ':':
+            # A key ({ m: value }), not a binding.
+            return None
+        if value(bracket) not in ('{', '['):
+            break
+        k = bracket
+    if value(k - 1) in ('const', 'let', 'var'):
+        bracket = opener(k)
+        if value(bracket) == '(' and value(bracket - 1) == 'for':
+            # for (const m of ...): visible in the loop body as well.
+            k = bracket - 1
+        return next((t.start for t in tokens[k + 1:] if t.depth < tokens[k].depth), len(text))
+    if value(k + 1) == '=>':
+        return _arrow_end(text, tokens, k + 1, tokens[k].depth)
+    if bracket is None or value(bracket) != '(':
+        return None
+    k = closer(bracket) + 1
+    if value(k) == ':':
+        # (m): ReturnType => ... or function f(m): ReturnType { ... }
+        while k < len(tokens) and not (tokens[k].depth == tokens[bracket].depth and value(k) in ('=>', '{')):
+            k += 1
+    if value(k) == '=>':
+        return _arrow_end(text, tokens, k, tokens[bracket].depth)
+    if value(k) == '{' and value(bracket - 1) not in ('if', 'for', 'while', 'switch', 'with'):
+        # function f(m) { ... }, a method f(m) { ... } or catch (m) { ... }.
+        k = closer(k)
+        return tokens[k].end if k < len(tokens) else len(text)
+    return None
+
+
+def _arrow_end(text, tokens, k, depth):
+    """Where the body of the arrow function whose => is tokens[k] ends; depth is the arrow's level."""
+    value = lambda k: text[tokens[k].start:tokens[k].end] if k < len(tokens) else ''
+    body = k + 1
+    if body >= len(tokens):
+        return len(text)
+    if value(body) == '{':
+        # The block body ends with its closing brace.
+        k = body + 1
+        while k < len(tokens) and tokens[k].depth > tokens[body].depth:
+            k += 1
+        return tokens[k].end if k < len(tokens) else len(text)
+    # An expression body ends at a , ; or closing bracket of its level.
+    k = body
+    while k < len(tokens) and tokens[k].depth >= depth and not (
+            tokens[k].depth == depth and value(k) in (',', ';')):
+        k += 1
+    return tokens[k].start if k < len(tokens) else len(text)
+
+
+def migrate(text, path='<text>'):
+    """(edits, findings) that move text from motion.* to m.*."""
+    m, specifiers = _imports(text)
+    names = {s.split()[0] for s in specifiers}
+    if m is None or not names & {'motion', 'm'}:
+        return [], []
+    # Migrated already: only the findings are wanted.
+    done = 'm' in names
+    tokens = tsx_index.scan(text)
+    findings = []
+
+    def find(offset, what, needs):
+        finding = Finding(path, tsx_index.position(text, offset)[0], what, needs)
+        # One per feature and line is enough.
+        if finding not in findings:
+            findings.append(finding)
+
+    scopes = []
+    factory = False
+    renames = []
+    # Tags are inside jsx tokens; the outermost ones cover the nested ones.
+    outer = []
+    for token in tokens:
+        if token.kind == 'jsx' and (not outer or token.start >= outer[-1][1]):
+            outer.append((token.start, token.end))
+    for start, end in outer:
+        renames += [t.end(1) for t in _TAG.finditer(text, start, end)]
+    for i, token in enumerate(tokens):
+        if token.kind == 'jsx':
+            tag = re.match(r'<(?:motion|m)\.(\w+)', text[token.start:token.start + 40])
+            full = re.match(r'<((%s)(?:\.\w+)?)\b' % '|'.join(FULL_IMPORTS), text[token.start:token.start + 40])
+            if full is not None:
+                find(token.start, '<%s>' % full.group(1), FULL_IMPORTS[full.group(2)])
+            if tag is not None:
+                for name, offset in _attributes(text, token.start + tag.end()):
+                    if DOM_MAX_PROPS.match(name):
+                        find(offset, '%s on m.%s' % (name, tag.group(1)), 'domMax')
+            continue
+        if token.kind != 'name' or (i and text[tokens[i - 1].start:tokens[i - 1].end] in ('.', '?.')):
+            continue
+        value = text[token.start:token.end]
+        if value == 'm':
+            # A local m (messages.map(m => ...)) shadows the import until its
+            # arrow function or block closes.
+            end = _scope_end(text, tokens, i)
+            if end is not None:
+                scopes.append((token.start, end))
+        elif value == 'motion' and not m.start() <= token.start < m.end():
+            after = text[tokens[i + 1].start:tokens[i + 1].end] if i + 1 < len(tokens) else ''
+            following = text[tokens[i + 2].start:tokens[i + 2].end] if i + 2 < len(tokens) else ''
+            if after == '(' or (after == '.' and following == 'create'):
+                factory = True
+                find(token.start, 'motion() factory', 'motion')
+            elif after == '.':
+                renames.append(token.start)
+        elif value in FULL_IMPORTS and not m.start() <= token.start < m.end():
+            find(token.start, value, FULL_IMPORTS[value])
+
+    if done:
+        return [], findings
+    own_m = any(start <= pos < end for pos in renames for start, end in scopes)
+    if own_m:
+        replacement = ['m as motion' if s == 'motion' else s for s in specifiers]
+        renames = []
+    else:
+        replacement = ['m' if s == 'motion' else s for s in specifiers]
+    if factory:
+        # motion() stays, and so does the import it needs.
+        replacement.append('motion')
+    old = m.group(1)
+    edits = [(m.start(1), m.end(1), '%s%s%s' % (old[:len(old) - len(old.lstrip())], ', '.join(replacement),
+                                                old[len(old.rstrip()):]))]
+    edits += [(pos, pos + len('motion'), 'm') for pos in sorted(set(renames))]
+    return sorted(edits), findings
+
+
+def transform(content):
+    return span_diff.apply_edits(content, migrate(content)[0])
+
+
+def provider_edits(text, strict):
+    """Edits to text (main.tsx) wrapping <App /> in a LazyMotion, or [] if it has one."""
+    if 'LazyMotion' in text:
+        return []
+    tokens = tsx_index.scan(text)
+    app = next((t for t in tokens if t.kind == 'jsx' and re.match(r'<App\b', text[t.start:t.end])), None)
+    if app is None:
+        return []
+    imports = list(re.finditer(r'^import\b[^\n]*\n', text, re.M))
+    head = imports[0].end() if imports else 0
+    statement = text[app.start:app.end]
+    line_start = text.rfind('\n', 0, app.start) + 1
+    indent = text[line_start:app.start]
+    loader = "\nconst loadMotionFeatures = () => import('./%s').then(res => res.default)\n" % (
+        os.path.splitext(os.path.relpath(FEATURES, os.path.dirname(ENTRY)))[0].replace(os.sep, '/'))
+    return [
+        (head, head, "import { LazyMotion } from 'framer-motion'\n"),
+        (imports[-1].end() if imports else 0, imports[-1].end() if imports else 0, loader),
+        (app.start, app.end, '<LazyMotion features={loadMotionFeatures}%s>\n%s  %s\n%s</LazyMotion>' % (
+            ' strict' if strict else '', indent, statement, indent)),
+    ]
+
+
+def features_module(bundle):
+    return ('// Animation features for the LazyMotion in main.tsx, loaded after the first render.\n'
+            '// Written by lazy_motion.py: %s, since %s.\n'
+            "import { %s } from 'framer-motion'\n\nexport default %s\n" % (
+                bundle, 'layout or drag props are in use' if bundle == 'domMax' else 'no m.* element needs more',
+                bundle, bundle))
+
+
+def files(root=ROOT, directory='src'):
+    found = []
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        found += [os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith(SUFFIXES)]
+    return [os.path.relpath(p, root).replace(os.sep, '/') for p in found]
+
+
+def run(root=ROOT, dry_run=False, out=sys.stdout, diff_out=None):
+    """Migrate every file under root/src; returns the exit status."""
+    diff_out = diff_out or out
+    changes = {}            # path -> (old content, edits)
+    findings = []
+    failed = 0
+    for path in files(root):
+        content = codemod_io.read_text(os.path.join(root, path))
+        try:
+            edits, found = migrate(content, path)
+        except tsx_index.TsxSyntaxError as e:
+            print('%-9s  %s  (%s)' % ('failed', path, e), file=out)
+            failed += 1
+            continue
+        findings += found
+        if edits:
+            changes[path] = (content, edits)
+
+    bundle = 'domMax' if any(f.needs == 'domMax' for f in findings) else 'domAnimation'
+    strict = not any(f.needs == 'motion' for f in findings)
+    if changes or os.path.exists(os.path.join(root, FEATURES)):
+        features = os.path.join(root, FEATURES)
+        old = codemod_io.read_text(features) if os.path.exists(features) else ''
+        new = features_module(bundle)
+        if old != new:
+            changes[FEATURES] = (old, [(0, len(old), new)])
+        entry = codemod_io.read_text(os.path.join(root, ENTRY))
+        edits = provider_edits(entry, strict)
+        if edits:
+            changes[ENTRY] = (entry, edits)
+
+    written = []
+    for path, (content, edits) in sorted(changes.items()):
+        new_content = span_diff.apply_edits(content, edits)
+        error = tsx_validate.validate(new_content)
+        if error is not None and tsx_validate.validate(content) is None:
+            print('%-9s  %s  (output does not parse: %s)' % ('failed', path, error), file=out)
+            failed += 1
+            continue
+        renamed = sum(1 for e in edits if e[2] == 'm')
+        print('%-9s  %s%s' % ('changed', path, '  (%d renamed)' % renamed if renamed else ''), file=out)
+        if dry_run:
+            diff_out.write(span_diff.unified_diff(content, edits, path))
+        written.append((os.path.join(root, path), new_content))
+
+    if findings:
+        print('\nneeds more than m.* with domAnimation:', file=out)
+        for f in findings:
+            print('  %s:%d  %s -> %s' % (f.path, f.line, f.what,
+                                         'domMax' if f.needs == 'domMax' else 'keeps the full motion component'),
+                  file=out)
+    print('\nfeatures: %s, loaded on demand; LazyMotion %s' % (
+        bundle, 'strict' if strict else 'not strict (the full motion component is still used)'), file=out)
+    if failed:
+        print('%d failed, nothing written' % failed, file=out)
+        return 1
+    if dry_run:
+        print('%d files to change (dry run, nothing written)' % len(written), file=out)
+        return 0
+    os.makedirs(os.path.dirname(os.path.join(root, FEATURES)), exist_ok=True)
+    codemod_io.write_all(written)
+    print('%d files changed' % len(written), file=out)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Migrate framer-motion motion.* to m.* under a LazyMotion.')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='write nothing; print a unified diff per file to stdout, the rest to stderr')
+    args = parser.parse_args(argv)
+    if args.dry_run:
+        return run(os.path.abspath(args.root), True, out=sys.stderr, diff_out=sys.stdout)
+    return run(os.path.abspath(args.root))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
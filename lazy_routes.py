@@ -0,0 +1,248 @@
+"""Load the pages of src/App.tsx on demand instead of in the first bundle.
+
+    python lazy_routes.py                # rewrite src/App.tsx
+    python codemod_runner.py lazy_routes src/App.tsx --dry-run
+    python lazy_routes.py --estimate     # what leaves the initial bundle, without rewriting
+
+A component imported by default from a relative module and used only in
+the element={...} of <Route>s becomes
+
+    const AdminPanel = lazy(() => import('./components/AdminPanel'))
+
+after the last import, in place of its import.  The element of each route
+that renders one gets wrapped in a <Suspense> showing a spinner (defined
+once, next to the consts) and the rest of <Routes> is left as it is; lazy
+and Suspense are added to the react import.  Components
+used anywhere else (Sidebar, Header, Footer in the layout, the modals) stay
+as they are.  So do two kinds of route components that would only cost a
+second request: those of the landing route (EAGER_PATHS), which nearly
+every visitor renders first, and those used in more than SHARED routes
+(SEO), which are needed whichever page loads.
+
+Running it again changes nothing.  --estimate sums the size of the source
+modules that only the lazy pages import (with import_graph), i.e. what
+stops being part of the initial bundle, and lists the packages that go
+with them; sizes are of the unminified sources, so read them as relative.
+"""
+import os
+import re
+import sys
+
+import tsx_index
+
+APP = 'src/App.tsx'
+# Routes whose components stay in the initial bundle.
+EAGER_PATHS = ('/',)
+# Components used in more routes than this stay in the initial bundle.
+SHARED = 3
+
+# The spinner a lazy page shows while it loads, defined once after the imports.
+FALLBACK_NAME = 'routeFallback'
+FALLBACK = ('<div className="flex min-h-[50vh] items-center justify-center">'
+            '<div className="animate-spin rounded-full h-8 w-8 border-b-2 border-gray-900 dark:border-white"></div>'
+            '</div>')
+
+_DEFAULT_IMPORT = re.compile(r'^import[ \t]+(\w+)[ \t]+from[ \t]+([\'"])(\.{1,2}/[^\'"]+)\2([ \t]*;?)[ \t]*$', re.M)
+_REACT_IMPORT = re.compile(r'^import[ \t]+(?:(\w+)[ \t]*,[ \t]*)?\{([^}]*)\}[ \t]+from[ \t]+([\'"])react\3', re.M)
+_TAG = re.compile(r'<([\w.]+)')
+_ELEMENT = re.compile(r'\selement\s*=\s*\{')
+_PATH = re.compile(r'\spath\s*=\s*["\']([^"\']*)["\']')
+
+
+def _tag(text, token):
+    m = _TAG.match(text, token.start)
+    return m.group(1) if m else None
+
+
+def route_elements(text, tokens):
+    """[(path, start, end)] of the element={...} value of every <Route>."""
+    elements = []
+    jsx = [t for t in tokens if t.kind == 'jsx']
+    for i, token in enumerate(jsx):
+        if _tag(text, token) != 'Route':
+            continue
+        m = _ELEMENT.search(text, token.start, token.end)
+        if m is None:
+            continue
+        # Attributes come before children: nothing nested may start before element=.
+        if i + 1 < len(jsx) and token.start < jsx[i + 1].start < m.start() and jsx[i + 1].end <= token.end:
+            continue
+        path = _PATH.search(text, token.start, m.start())
+        end = tsx_index.scan_expression(text, m.end())[1]
+        elements.append((path.group(1) if path else None, m.end(), end))
+    return elements
+
+
+def candidates(text, tokens=None):
+    """{name: (import match, routes)} of the imports this codemod makes lazy."""
+    tokens = tsx_index.scan(text) if tokens is None else tokens
+    imports = {m.group(1): m for m in _DEFAULT_IMPORT.finditer(text)}
+    if not imports:
+        return {}
+    elements = route_elements(text, tokens)
+    routes = {name: set() for name in imports}
+    eager = set()
+    for token in tokens:
+        if token.kind == 'jsx':
+            name = _tag(text, token)
+        elif token.kind == 'name':
+            name = text[token.start:token.end]
+        else:
+            continue
+        if name not in imports:
+            continue
+        statement = imports[name]
+        if statement.start() <= token.start < statement.end():
+            continue
+        inside = [(path, start) for path, start, end in elements if start <= token.start < end]
+        if token.kind == 'name' or not inside:
+            eager.add(name)
+        else:
+            path, start = inside[-1]
+            if path in EAGER_PATHS:
+                eager.add(name)
+            routes[name].add(start)
+    return {name: (imports[name], routes[name]) for name in imports
+            if routes[name] and name not in eager and len(routes[name]) <= SHARED}
+
+
+def _last_import_end(text, tokens):
+    """Offset after the line of the last top-level import declaration, or 0."""
+    end = 0
+    for i, token in enumerate(tokens):
+        if not (token.kind == 'name' and token.depth == 0 and text[token.start:token.end] == 'import'):
+            continue
+        if i + 1 < len(tokens) and text[tokens[i + 1].start:tokens[i + 1].end] in ('(', '.'):
+            continue
+        source = next((t for t in tokens[i + 1:] if t.kind == 'string' and t.depth == 0), None)
+        if source is not None:
+            end = max(end, source.end)
+    if end == 0:
+        return 0
+    newline = text.find('\n', end)
+    return len(text) if newline < 0 else newline + 1
+
+
+def _wrap_elements(text, elements):
+    """Edits wrapping each of elements (start, end of a route's element={...}) in a <Suspense>."""
+    edits = []
+    for start, end in elements:
+        # end is past the closing brace; wrap the expression without its padding.
+        body = text[start:end - 1]
+        first = start + len(body) - len(body.lstrip())
+        last = start + len(body.rstrip())
+        if text.startswith('<Suspense', first):
+            continue
+        edits.append((first, first, '<Suspense fallback={%s}>' % FALLBACK_NAME))
+        edits.append((last, last, '</Suspense>'))
+    return edits
+
+
+def _react_import(text):
+    """Edit adding lazy and Suspense to the react import, or None if it has them."""
+    m = _REACT_IMPORT.search(text)
+    if m is None:
+        return (0, 0, "import { lazy, Suspense } from 'react'\n")
+    names = [n.strip() for n in m.group(2).split(',') if n.strip()]
+    missing = [n for n in ('lazy', 'Suspense') if n not in names]
+    if not missing:
+        return None
+    return m.start(2), m.end(2), ' %s ' % ', '.join(names + missing)
+
+
+def transform(content):
+    tokens = tsx_index.scan(content)
+    found = candidates(content, tokens)
+    if not found:
+        return content
+    # The imports go; their lazy consts follow the last import that stays.
+    edits = []
+    lines = []
+    for name, (m, _) in sorted(found.items(), key=lambda item: item[1][0].start()):
+        edits.append((m.start(), min(m.end() + 1, len(content)), ''))
+        lines.append('const %s = lazy(() => import(%s%s%s))%s\n' % (
+            name, m.group(2), m.group(3), m.group(2), m.group(4)))
+    if not re.search(r'\bconst\s+%s\b' % FALLBACK_NAME, content):
+        lines.append('const %s = %s\n' % (FALLBACK_NAME, FALLBACK))
+    at = _last_import_end(content, tokens)
+    edits.append((at, at, '\n' + ''.join(lines)))
+    starts = set().union(*(routes for _, routes in found.values()))
+    edits += _wrap_elements(content, [(start, end) for _, start, end in route_elements(content, tokens)
+                                      if start in starts])
+    react = _react_import(content)
+    if react is not None:
+        edits.append(react)
+    out = []
+    last = 0
+    for start, end, replacement in sorted(edits):
+        out.append(content[last:start])
+        out.append(replacement)
+        last = end
+    out.append(content[last:])
+    return ''.join(out)
+
+
+def _package(specifier):
+    """The package a bare specifier is in: react-dom/client -> react-dom."""
+    parts = specifier.split('/')
+    return '/'.join(parts[:2] if specifier.startswith('@') else parts[:1])
+
+
+def estimate(root=None, app=APP, out=sys.stdout):
+    """Print what making the route imports of app lazy takes out of the initial bundle."""
+    import import_graph
+    root = root or import_graph.ROOT
+    with open(os.path.join(root, app), encoding='utf-8') as f:
+        text = f.read()
+    found = candidates(text)
+    graph = import_graph.build(root)
+    lazy = {}
+    for name, (m, routes) in sorted(found.items()):
+        target = graph.resolve(app, m.group(3))
+        if target is not None:
+            lazy[target] = name
+    entries = [e for e in import_graph.entries(root) if e.startswith('src/')] or ['src/main.tsx']
+    # What is in the initial bundle: static imports, type-only ones are erased.
+    static = {'import', 'reexport', 'require'}
+    before = graph.reachable(entries, static)
+    after = graph.reachable(entries, static, {(app, target) for target in lazy})
+    moved = before - after
+
+    def size(paths):
+        return sum(os.path.getsize(os.path.join(root, p)) for p in paths)
+
+    print('%d route components can load on demand' % len(lazy), file=out)
+    # What each page pulls in that no other lazy page or the shell needs.
+    owners = {}
+    for target in lazy:
+        for path in graph.reachable([target], static):
+            if path in moved:
+                owners.setdefault(path, set()).add(target)
+    for target, name in sorted(lazy.items(), key=lambda item: -size(p for p, o in owners.items() if o == {item[0]})):
+        if target in after:
+            importer = min(p for p, _ in graph.importers[target] if p in after and p != app)
+            print('  %-24s stays in the initial bundle: %s imports it' % (name, importer), file=out)
+            continue
+        own = [p for p, o in owners.items() if o == {target}]
+        if not own:
+            print('  %-24s also imported by other pages, counted as shared' % name, file=out)
+            continue
+        print('  %-24s %8.1f KB in %d module%s' % (name, size(own) / 1024, len(own), '' if len(own) == 1 else 's'),
+              file=out)
+    shared = [p for p, o in owners.items() if len(o) > 1]
+    if shared:
+        print('  %-24s %8.1f KB in %d modules' % ('(shared by pages)', size(shared) / 1024, len(shared)), file=out)
+    print('initial bundle sources: %.1f KB -> %.1f KB (-%.0f%%)' % (
+        size(before) / 1024, size(after) / 1024, 100.0 * size(moved) / max(size(before), 1)), file=out)
+    packages = {_package(p) for path in moved for p in graph.packages(path)}
+    packages -= {_package(p) for path in after for p in graph.packages(path)}
+    if packages:
+        print('packages no longer in the initial bundle: %s' % ', '.join(sorted(packages)), file=out)
+    return 0
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--estimate']:
+        sys.exit(estimate(*sys.argv[2:3]))
+    from codemod_runner import script_main
+    script_main('lazy_routes', APP)
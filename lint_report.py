@@ -0,0 +1,349 @@
+"""Index ESLint output and query it.
+
+    python lint_report.py ingest lint_output.json lint_log*.txt
+    python lint_report.py query --rule @typescript-eslint/no-unused-vars --path src/components
+    python lint_report.py summary --by rule
+    python lint_report.py runs
+
+Reports are either ESLint's JSON formatter output or the default "stylish"
+text, in UTF-8 or UTF-16 (with or without BOM), as PowerShell redirects
+leave them.  They are decoded and parsed incrementally: JSON reports one
+file entry at a time, so the embedded sources never sit in memory all at
+once, and text reports line by line.
+
+Every ingested report is a run in .codemod_cache/lint.sqlite, indexed by
+file, rule and severity.  Paths are stored relative to the project with
+forward slashes, so Windows reports and local files line up.  Re-ingesting
+a report that has not changed since (same size and mtime) is a no-op, and
+queries look at the latest run unless told otherwise.
+"""
+import argparse
+import codecs
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from codemod_cache import CACHE_DIR
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(CACHE_DIR, 'lint.sqlite')
+
+SEVERITIES = {1: 'warning', 2: 'error'}
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Strings (possibly cut off at the end of the buffer) and brackets.
+_RULE_ID = r'@?[A-Za-z0-9_-]+(?:/[A-Za-z0-9_-]+)*'
+
+_JSON_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(")?|[{}\[\]]', re.S)
+
+# "  12:5  error  Message text  rule-id" in stylish output.  The rule is
+# missing for parsing errors, and for multi-line messages (React compiler
+# diagnostics with a code frame) it ends the last line of the message.
+_STYLISH_MESSAGE = re.compile(r'^\s+(\d+):(\d+)\s+(error|warning)\s+(.*?)(?:\s{2,}(%s))?\s*$' % _RULE_ID)
+_STYLISH_RULE_END = re.compile(r'\s{2,}(%s)\s*$' % _RULE_ID)
+# A file heading: an absolute or plain path, not "path:line:col" inside a message.
+_STYLISH_FILE = re.compile(r'^(?:[A-Za-z]:)?[\\/]\S.*$|^\S+\.\w+$')
+_LOCATION = re.compile(r':\d+:\d+$')
+
+
+def open_report(path):
+    """Open a report as text, picking the encoding from its BOM."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    encoding = 'utf-8'
+    for bom, name in _BOMS:
+        if head.startswith(bom):
+            encoding = name
+            break
+    else:
+        if len(head) >= 2 and head[1:2] == b'\0' and head[0:1] != b'\0':
+            encoding = 'utf-16-le'
+    return open(path, 'r', encoding=encoding, errors='replace', newline='')
+
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """Yield the objects of a top-level JSON array, reading f a chunk at a time.
+
+    Only the object being parsed is kept in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    depth = 0
+    start = None
+    while True:
+        chunk = f.read(chunk_size)
+        buf += chunk
+        while True:
+            m = _JSON_TOKEN.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            token = m.group()
+            if token[0] == '"':
+                if m.group(1) is None:
+                    # The string continues in the next chunk.
+                    pos = m.start()
+                    break
+            elif token in '[{':
+                if depth == 0 and token != '[':
+                    raise ValueError('not a JSON array')
+                depth += 1
+                if depth == 2:
+                    start = m.start()
+            else:
+                depth -= 1
+                if depth == 1:
+                    yield decoder.decode(buf[start:m.end()])
+                    start = None
+                elif depth == 0:
+                    return
+            pos = m.end()
+        # Drop everything before the object being parsed (or before pos).
+        keep = pos if start is None else start
+        if keep:
+            buf = buf[keep:]
+            pos -= keep
+            if start is not None:
+                start = 0
+        if not chunk:
+            raise ValueError('truncated JSON report')
+
+
+def iter_stylish(f):
+    """Yield (file path, message dict) from stylish text output."""
+    path = None
+    pending = None
+    for line in f:
+        line = line.rstrip('\r\n')
+        m = _STYLISH_MESSAGE.match(line)
+        if m is not None and path is not None:
+            if pending is not None:
+                yield path, pending
+            pending = {
+                'line': int(m.group(1)), 'column': int(m.group(2)),
+                'severity': 2 if m.group(3) == 'error' else 1,
+                'message': m.group(4).strip(), 'ruleId': m.group(5),
+            }
+            if pending['ruleId'] is not None:
+                yield path, pending
+                pending = None
+        elif not line.strip():
+            continue
+        elif not line[0].isspace() and _STYLISH_FILE.match(line) and not _LOCATION.search(line):
+            if pending is not None:
+                yield path, pending
+                pending = None
+            path = line.strip()
+        elif pending is not None:
+            # Continuation of a multi-line message; its last line names the rule.
+            end = _STYLISH_RULE_END.search(line)
+            if end is not None:
+                pending['ruleId'] = end.group(1)
+                yield path, pending
+                pending = None
+    if pending is not None:
+        yield path, pending
+
+
+def iter_messages(path):
+    """Yield (file path, message dict) from a JSON or stylish report."""
+    with open_report(path) as f:
+        head = f.read(64)
+        f.seek(0)
+        if head.lstrip('\ufeff \t\r\n').startswith('['):
+            for entry in iter_json_array(f):
+                for message in entry.get('messages', ()):
+                    yield entry['filePath'], message
+        else:
+            yield from iter_stylish(f)
+
+
+class PathNormalizer:
+    """Map absolute (possibly Windows) paths to project-relative POSIX paths.
+
+    The project directory is the one named like the package in
+    package.json, or else the parent of the first path component that
+    exists at the top of this repository (src, api, ...).  Later paths under
+    the same directory reuse it, so files that have since been deleted
+    still come out relative.
+    """
+
+    def __init__(self, root=ROOT, prefix=None):
+        self.entries = set(os.listdir(root))
+        self.prefixes = [prefix.replace('\\', '/').rstrip('/') + '/'] if prefix else []
+        self.project = None
+        try:
+            with open(os.path.join(root, 'package.json'), encoding='utf-8') as f:
+                self.project = json.load(f).get('name')
+        except (OSError, ValueError):
+            pass
+
+    def __call__(self, path):
+        path = path.replace('\\', '/')
+        for prefix in self.prefixes:
+            if path.startswith(prefix):
+                return path[len(prefix):]
+        parts = path.split('/')
+        if self.project in parts[:-1]:
+            i = len(parts) - 2 - parts[-2::-1].index(self.project)
+            prefix = '/'.join(parts[:i + 1]) + '/'
+            self.prefixes.append(prefix)
+            return path[len(prefix):]
+        for i in range(1, len(parts)):
+            if parts[i] in self.entries:
+                prefix = '/'.join(parts[:i]) + '/'
+                self.prefixes.append(prefix)
+                return path[len(prefix):]
+        return path
+
+
+class LintIndex:
+    """SQLite index of lint messages, one run per ingested report."""
+
+    def __init__(self, path=DEFAULT_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY, report TEXT NOT NULL, size INTEGER NOT NULL,
+                mtime REAL NOT NULL, ingested REAL NOT NULL, messages INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS messages (
+                run INTEGER NOT NULL, path TEXT NOT NULL, rule TEXT, severity TEXT NOT NULL,
+                line INTEGER, col INTEGER, message TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS messages_rule ON messages (run, rule, path);
+            CREATE INDEX IF NOT EXISTS messages_path ON messages (run, path);
+            CREATE INDEX IF NOT EXISTS messages_severity ON messages (run, severity);
+        ''')
+
+    def ingest(self, report, prefix=None):
+        """Index report as a new run; returns the run id, or None if already indexed."""
+        report = os.path.abspath(report)
+        st = os.stat(report)
+        seen = self._db.execute('SELECT id FROM runs WHERE report = ? AND size = ? AND mtime = ?',
+                                (report, st.st_size, st.st_mtime)).fetchone()
+        if seen is not None:
+            return None
+        normalize = PathNormalizer(prefix=prefix)
+        with self._db:
+            run = self._db.execute('INSERT INTO runs (report, size, mtime, ingested, messages) '
+                                   'VALUES (?, ?, ?, ?, 0)',
+                                   (report, st.st_size, st.st_mtime, time.time())).lastrowid
+            rows = ((run, normalize(path), m.get('ruleId'), SEVERITIES.get(m.get('severity'), 'error'),
+                     m.get('line'), m.get('column'), m.get('message', ''))
+                    for path, m in iter_messages(report))
+            count = self._db.executemany('INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)', rows).rowcount
+            self._db.execute('UPDATE runs SET messages = ? WHERE id = ?', (count, run))
+        return run
+
+    def runs(self):
+        return self._db.execute('SELECT id, report, ingested, messages FROM runs ORDER BY id').fetchall()
+
+    def latest(self):
+        row = self._db.execute('SELECT MAX(id) FROM runs').fetchone()
+        return row[0]
+
+    def _where(self, run, rule=None, path=None, severity=None):
+        clauses = []
+        args = []
+        if run is not None:
+            clauses.append('run = ?')
+            args.append(run)
+        if rule is not None:
+            clauses.append('rule = ?')
+            args.append(rule)
+        if path:
+            path = path.replace('\\', '/').strip('/')
+            # A directory prefix as an index range, or one file.
+            clauses.append('(path = ? OR (path >= ? AND path < ?))')
+            args += [path, path + '/', path + '0']
+        if severity is not None:
+            clauses.append('severity = ?')
+            args.append(severity)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def query(self, run=None, rule=None, path=None, severity=None):
+        """Messages matching every given filter, ordered by file and position."""
+        where, args = self._where(run, rule, path, severity)
+        return self._db.execute('SELECT run, path, line, col, severity, rule, message FROM messages'
+                                + where + ' ORDER BY path, line, col', args).fetchall()
+
+    def summary(self, by='rule', run=None, rule=None, path=None, severity=None):
+        """(key, errors, warnings) grouped by rule or path, most messages first."""
+        column = {'rule': 'rule', 'file': 'path'}[by]
+        where, args = self._where(run, rule, path, severity)
+        return self._db.execute(
+            'SELECT %s, SUM(severity = \'error\'), SUM(severity = \'warning\') FROM messages%s '
+            'GROUP BY %s ORDER BY COUNT(*) DESC, %s' % (column, where, column, column), args).fetchall()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index ESLint reports and query them.')
+    parser.add_argument('--db', default=DEFAULT_DB, help='index file (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='index one or more reports')
+    ingest.add_argument('reports', nargs='+')
+    ingest.add_argument('--prefix', help='project directory as it appears in the report paths')
+
+    commands.add_parser('runs', help='list indexed runs')
+
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument('--rule', help='rule id, e.g. @typescript-eslint/no-unused-vars')
+    filters.add_argument('--path', help='file or directory, relative to the project')
+    filters.add_argument('--severity', choices=sorted(SEVERITIES.values()))
+    which = filters.add_mutually_exclusive_group()
+    which.add_argument('--run', type=int, help='run id (default: the latest run)')
+    which.add_argument('--all-runs', action='store_true', help='search every run')
+
+    commands.add_parser('query', parents=[filters], help='list matching messages')
+    summary = commands.add_parser('summary', parents=[filters], help='count messages per rule or file')
+    summary.add_argument('--by', choices=('rule', 'file'), default='rule')
+    args = parser.parse_args(argv)
+
+    with LintIndex(args.db) as index:
+        if args.command == 'ingest':
+            for report in args.reports:
+                run = index.ingest(report, args.prefix)
+                print('%s: %s' % (report, 'unchanged, skipped' if run is None else 'run %d' % run))
+            return 0
+        if args.command == 'runs':
+            for run, report, ingested, messages in index.runs():
+                print('%4d  %s  %6d messages  %s' % (
+                    run, time.strftime('%Y-%m-%d %H:%M', time.localtime(ingested)), messages, report))
+            return 0
+
+        run = None if args.all_runs else args.run or index.latest()
+        if run is None and not args.all_runs:
+            parser.error('nothing indexed yet; run "lint_report.py ingest REPORT" first')
+        if args.command == 'query':
+            rows = index.query(run, args.rule, args.path, args.severity)
+            for row_run, path, line, col, severity, rule, message in rows:
+                prefix = '[%d] ' % row_run if args.all_runs else ''
+                print('%s%s:%s:%s  %-7s  %s  %s' % (prefix, path, line, col, severity, message, rule or ''))
+            print('%d messages' % len(rows), file=sys.stderr)
+        else:
+            for key, errors, warnings in index.summary(args.by, run, args.rule, args.path, args.severity):
+                print('%6d errors  %6d warnings  %s' % (errors, warnings, key or '(no rule)'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
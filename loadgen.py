@@ -0,0 +1,537 @@
+"""Load the dev server's API and see which handler slows down as clients are added.
+
+    python loadgen.py                                       # default mix at 1, 4, 16 and 64 clients
+    python loadgen.py --concurrency 8 --duration 30 --mix browse=3,events=1
+    python loadgen.py --slug 3f9a1c2e --user-id <users._id>   # also the shared list and attendance
+    python loadgen.py --save                                # record the run as the baseline
+
+Start the API first (npx tsx dev-server.ts) against the database you want
+to measure; for numbers that mean something offline, point SUPABASE_URL
+at a local Supabase (supabase start) loaded with the sample data.  The
+browse requests filter on the course, branch, year, subject and type of
+the sample resources in scripts/seedDatabase.ts and search for words of
+their titles, so they hit rows that exist.
+
+Each concurrency level runs closed-loop: that many clients, each on its
+own keep-alive connection from a pool, send the next request as soon as
+the last one answered, choosing the route by the --mix weights.  Latency
+goes into a log-linear histogram per route (HDR style: 1 us resolution up
+to 128 us, then within 1/64 of the value), so percentiles cost nothing to
+record and runs can be merged and saved.  The report gives per route and
+level the requests/s and p50/p90/p99/p99.9/max, then each route's p99 at
+every level, worst growth first: that is the handler that degrades.
+
+Routes (ROUTES): browse, leaderboard and shared (api/resources.ts), events,
+stats, attendance (needs --user-id or --token) and progress, which only
+the Vercel deployment serves; shared needs --slug of a shared_lists row.
+
+Results are compared with the baseline (.codemod_cache/loadgen.json unless
+--baseline says otherwise) and --save records them.  A p99 more than
+--tolerance above the baseline, or throughput that much below it, at the
+same level is a regression and exits with status 1.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import platform
+import random
+import re
+import ssl
+import sys
+import time
+import urllib.parse
+
+import codemod_cache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+URL = 'http://localhost:3000'
+BASELINE = os.path.join(codemod_cache.CACHE_DIR, 'loadgen.json')
+SEED = 'scripts/seedDatabase.ts'
+CONCURRENCY = '1,4,16,64'
+MIX = 'browse=6,leaderboard=2,shared=1,events=2,stats=1,attendance=1'
+TOLERANCE = 0.25
+# Levels with fewer requests than this for a route are too noisy to compare.
+MIN_REQUESTS = 20
+
+# Filter values used when scripts/seedDatabase.ts cannot be read.
+_FALLBACK_SEED = [{'course': 'B.Tech', 'branch': 'CSE', 'year': '2nd Year', 'subject': 'Data Structures',
+                   'resourceType': 'notes', 'title': 'Data Structures Complete Notes'}]
+_SEED_FIELDS = ('course', 'branch', 'year', 'subject', 'resourceType', 'title')
+_SEED_PAIR = re.compile(r'^\s*(\w+):\s*([\'"])(.*?)\2\s*,?\s*$', re.M)
+
+
+class Histogram:
+    """Log-linear latency histogram in microseconds, HDR style.
+
+    Values below SUB are counted exactly; above, each power of two is split
+    into HALF buckets, so a bucket is within 1/HALF of the values in it.
+    """
+    SUB = 128
+    HALF = 64
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def index(cls, value):
+        if value < cls.SUB:
+            return value
+        shift = value.bit_length() - 7
+        return cls.SUB + (shift - 1) * cls.HALF + (value >> shift) - cls.HALF
+
+    @classmethod
+    def highest(cls, index):
+        """The largest value counted in the bucket."""
+        if index < cls.SUB:
+            return index
+        shift = (index - cls.SUB) // cls.HALF + 1
+        return (((index - cls.SUB) % cls.HALF + cls.HALF) << shift) + (1 << shift) - 1
+
+    def record(self, microseconds):
+        value = max(0, int(microseconds))
+        index = self.index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        if not self.total:
+            return None
+        rank = max(1, -(-self.total * p // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.highest(index), self.max)
+        return self.max
+
+    def to_dict(self):
+        return {'counts': {str(i): c for i, c in sorted(self.counts.items())}, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for index, count in data['counts'].items():
+            histogram.counts[int(index)] = count
+            histogram.total += count
+        histogram.max = data['max']
+        return histogram
+
+
+def seed_rows(root=ROOT, path=SEED):
+    """[{field: value}] of the sample resources in scripts/seedDatabase.ts."""
+    try:
+        with open(os.path.join(root, path), encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        return _FALLBACK_SEED
+    start = text.find('sampleResources')
+    end = text.find('];', start)
+    rows = []
+    for block in text[start:end].split('}')[:-1]:
+        row = {m.group(1): m.group(3) for m in _SEED_PAIR.finditer(block) if m.group(1) in _SEED_FIELDS}
+        if row:
+            rows.append(row)
+    return rows or _FALLBACK_SEED
+
+
+def _browse(rng, context):
+    row = rng.choice(context['seed'])
+    params = {}
+    fields = [f for f in ('course', 'branch', 'year', 'subject') if f in row]
+    for field in rng.sample(fields, rng.randint(1, len(fields))) if fields else ():
+        params[field] = row[field]
+    if 'resourceType' in row and rng.random() < 0.5:
+        params['type'] = row['resourceType']
+    if 'title' in row and rng.random() < 0.3:
+        params = {'search': rng.choice([w for w in row['title'].split() if len(w) > 3] or [row['title']])}
+    return '/api/resources?' + urllib.parse.urlencode(params)
+
+
+# name -> (path for a request, what it needs from the command line).
+ROUTES = {
+    'browse': (_browse, ()),
+    'leaderboard': (lambda rng, context: '/api/resources?action=leaderboard', ()),
+    'shared': (lambda rng, context: '/api/resources?action=share&slug=' + urllib.parse.quote(context['slug']),
+               ('slug',)),
+    'events': (lambda rng, context: '/api/events', ()),
+    'stats': (lambda rng, context: '/api/stats', ()),
+    'attendance': (lambda rng, context: '/api/attendance', ('token',)),
+    'progress': (lambda rng, context: '/api/progress', ('token',)),
+}
+
+
+def parse_mix(text):
+    """{route: weight} of browse=6,events=2 (a route alone weighs 1)."""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in ROUTES:
+            raise ValueError('unknown route %r (routes: %s)' % (name, ', '.join(ROUTES)))
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def token(user_id, secret, email='loadgen@localhost', role='user'):
+    """An HS256 JWT shaped like the ones api/auth.ts signs."""
+    header = _b64(json.dumps({'alg': 'HS256', 'typ': 'JWT'}, separators=(',', ':')).encode())
+    now = int(time.time())
+    payload = _b64(json.dumps({'userId': user_id, 'email': email, 'role': role, 'iat': now, 'exp': now + 86400},
+                              separators=(',', ':')).encode())
+    signature = hmac.new(secret.encode(), ('%s.%s' % (header, payload)).encode(), hashlib.sha256).digest()
+    return '%s.%s.%s' % (header, payload, _b64(signature))
+
+
+def jwt_secret(root=ROOT):
+    """JWT_SECRET from the environment or the project's .env, as the API reads it."""
+    if os.environ.get('JWT_SECRET'):
+        return os.environ['JWT_SECRET']
+    try:
+        with open(os.path.join(root, '.env'), encoding='utf-8') as f:
+            for line in f:
+                name, _, value = line.strip().partition('=')
+                if name.strip() == 'JWT_SECRET':
+                    return value.strip().strip('\'"')
+    except OSError:
+        pass
+    return None
+
+
+class HttpError(Exception):
+    pass
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port, tls):
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers):
+        """(status, body bytes) of a request, reconnecting when the server closed the connection."""
+        if self.writer is None:
+            context = ssl.create_default_context() if self.tls else None
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+        lines = ['%s %s HTTP/1.1' % (method, path), 'Host: %s:%d' % (self.host, self.port),
+                 'Connection: keep-alive', 'Accept: application/json']
+        lines += ['%s: %s' % item for item in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+        try:
+            head = await self.reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError:
+            raise HttpError('connection closed by the server')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        parts = status_line.split(' ', 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise HttpError('bad status line %r' % status_line)
+        fields = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            if name:
+                fields[name.strip().lower()] = value.strip()
+        size = 0
+        if fields.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                chunk = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                await self.reader.readexactly(chunk + 2)
+                size += chunk
+                if not chunk:
+                    break
+        elif 'content-length' in fields:
+            size = int(fields['content-length'])
+            await self.reader.readexactly(size)
+        elif method != 'HEAD' and parts[1] not in ('204', '304'):
+            size = len(await self.reader.read())
+            fields['connection'] = 'close'
+        if fields.get('connection', '').lower() == 'close':
+            self.close()
+        return int(parts[1]), size
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Pool:
+    """Keep-alive connections to one server, handed out one request at a time."""
+
+    def __init__(self, url, size):
+        parsed = urllib.parse.urlsplit(url)
+        tls = parsed.scheme == 'https'
+        self.idle = asyncio.Queue()
+        for _ in range(size):
+            self.idle.put_nowait(Connection(parsed.hostname, parsed.port or (443 if tls else 80), tls))
+        self.prefix = parsed.path.rstrip('/')
+
+    async def request(self, method, path, headers, timeout):
+        connection = await self.idle.get()
+        try:
+            return await asyncio.wait_for(connection.request(method, self.prefix + path, headers), timeout)
+        except BaseException:
+            connection.close()
+            raise
+        finally:
+            self.idle.put_nowait(connection)
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get_nowait().close()
+
+
+class RouteStats:
+    """Latencies, errors and bytes of one route at one level."""
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.errors = {}
+        self.bytes = 0
+
+    def error(self, what):
+        self.errors[what] = self.errors.get(what, 0) + 1
+
+
+async def run_level(url, mix, context, concurrency, duration, limit=None, warmup=1.0, timeout=30.0, seed=0):
+    """({route: RouteStats}, seconds measured) of concurrency clients for duration seconds."""
+    pool = Pool(url, concurrency)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    headers = {'Authorization': 'Bearer %s' % context['token']} if context.get('token') else {}
+    stats = {name: RouteStats() for name in names}
+    loop = asyncio.get_running_loop()
+    start = loop.time() + warmup
+    stop = start + duration
+    sent = [0]
+
+    async def client(number):
+        rng = random.Random(seed * 1000003 + number)
+        while True:
+            now = loop.time()
+            if now >= stop or (limit is not None and sent[0] >= limit):
+                return
+            name = rng.choices(names, weights)[0]
+            path = ROUTES[name][0](rng, context)
+            counted = now >= start
+            if counted:
+                sent[0] += 1
+            began = time.perf_counter_ns()
+            try:
+                status, size = await pool.request('GET', path, headers, timeout)
+            except asyncio.TimeoutError:
+                status, size = 'timeout', 0
+            except (OSError, HttpError, asyncio.IncompleteReadError, ValueError) as exc:
+                status, size = type(exc).__name__, 0
+            elapsed = (time.perf_counter_ns() - began) // 1000
+            if not counted:
+                continue
+            route = stats[name]
+            route.histogram.record(elapsed)
+            route.bytes += size
+            if status != 200:
+                route.error(str(status))
+            if isinstance(status, str) and status != 'timeout':
+                # Refused or reset: do not spin on a server that is down.
+                await asyncio.sleep(0.05)
+
+    try:
+        await asyncio.gather(*(client(n) for n in range(concurrency)))
+    finally:
+        pool.close()
+    return stats, max(min(loop.time(), stop) - start, 1e-9)
+
+
+def _ms(microseconds):
+    return '%8s' % '-' if microseconds is None else '%8.1f' % (microseconds / 1000)
+
+
+def report_level(concurrency, stats, seconds, baseline, out=sys.stdout):
+    print('\n%d client%s, %.1f s' % (concurrency, '' if concurrency == 1 else 's', seconds), file=out)
+    print('  %-12s %7s %8s %8s %8s %8s %8s %8s %7s %9s' % ('route', 'reqs', 'req/s', 'p50 ms', 'p90 ms', 'p99 ms',
+                                                          'p99.9', 'max', 'errors', 'p99 base'), file=out)
+    for name, route in stats.items():
+        h = route.histogram
+        if not h.total:
+            continue
+        errors = sum(route.errors.values())
+        line = '  %-12s %7d %8.1f %s %s %s %s %s %6.1f%%' % (
+            name, h.total, h.total / seconds, _ms(h.percentile(50)), _ms(h.percentile(90)),
+            _ms(h.percentile(99)), _ms(h.percentile(99.9)), _ms(h.max), 100.0 * errors / h.total)
+        before = (baseline or {}).get(name)
+        if before:
+            was = Histogram.from_dict(before['histogram']).percentile(99)
+            if was:
+                line += ' %+8.0f%%' % ((h.percentile(99) / was - 1) * 100)
+        print(line, file=out)
+        if errors:
+            print('  %-12s %s' % ('', ', '.join('%s x%d' % item for item in sorted(route.errors.items()))),
+                  file=out)
+
+
+def report_growth(levels, out=sys.stdout):
+    """Each route's p99 across the levels, the one that grows the most first."""
+    routes = {}
+    for concurrency, (stats, _) in levels:
+        for name, route in stats.items():
+            if route.histogram.total:
+                routes.setdefault(name, []).append((concurrency, route.histogram.percentile(99),
+                                                    route.histogram.total))
+    if len(levels) < 2 or not routes:
+        return
+    print('\np99 ms as clients are added (growth = last level / first):', file=out)
+    print('  %-12s %s %8s' % ('route', ''.join('%9s' % ('%d cl' % c) for c, _ in levels), 'growth'), file=out)
+
+    def growth(points):
+        # Only levels with enough requests for a p99 worth comparing.
+        solid = [p99 for _, p99, total in points if total >= MIN_REQUESTS]
+        return solid[-1] / max(solid[0], 1) if len(solid) > 1 else None
+
+    for name, points in sorted(routes.items(), key=lambda item: -(growth(item[1]) or 0)):
+        by_level = {c: p99 for c, p99, _ in points}
+        cells = ''.join('%9s' % ('%.1f' % (by_level[c] / 1000) if c in by_level else '-') for c, _ in levels)
+        factor = growth(points)
+        print('  %-12s %s %8s' % (name, cells, '%.1fx' % factor if factor is not None else '-'), file=out)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, url, mix, levels):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = load_baseline(path) or {}
+    data['python'] = platform.python_version()
+    data['machine'] = platform.machine()
+    data['url'] = url
+    data['mix'] = mix
+    saved = data.setdefault('levels', {})
+    for concurrency, (stats, seconds) in levels:
+        entry = saved.setdefault(str(concurrency), {})
+        for name, route in stats.items():
+            if route.histogram.total:
+                entry[name] = {'histogram': route.histogram.to_dict(), 'rps': route.histogram.total / seconds,
+                               'errors': sum(route.errors.values())}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def regressions(concurrency, stats, seconds, baseline, tolerance=TOLERANCE, throughput=True):
+    """Messages for the routes of a level that are worse than the baseline.
+
+    Throughput per route depends on the mix, so pass throughput=False when
+    the baseline was recorded with another one.
+    """
+    problems = []
+    for name, route in stats.items():
+        before = (baseline or {}).get(name)
+        h = route.histogram
+        if not before or h.total < MIN_REQUESTS:
+            continue
+        was = Histogram.from_dict(before['histogram'])
+        if was.total < MIN_REQUESTS:
+            continue
+        p99, was_p99 = h.percentile(99), was.percentile(99)
+        if was_p99 and p99 > was_p99 * (1 + tolerance):
+            problems.append('%s at %d clients: p99 %.1f ms, baseline %.1f ms (%+.0f%%)' % (
+                name, concurrency, p99 / 1000, was_p99 / 1000, (p99 / was_p99 - 1) * 100))
+        rps = h.total / seconds
+        if throughput and before['rps'] and rps < before['rps'] * (1 - tolerance):
+            problems.append('%s at %d clients: %.1f req/s, baseline %.1f (%+.0f%%)' % (
+                name, concurrency, rps, before['rps'], (rps / before['rps'] - 1) * 100))
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load the dev server API and report latency per route.')
+    parser.add_argument('--url', default=URL, help='API base URL (default: %(default)s)')
+    parser.add_argument('--concurrency', default=CONCURRENCY,
+                        help='client counts to run, in order (default: %(default)s)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level (default: 10)')
+    parser.add_argument('--requests', type=int, help='stop a level after this many requests')
+    parser.add_argument('--warmup', type=float, default=1, help='unmeasured seconds per level (default: 1)')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds before a request fails (default: 30)')
+    parser.add_argument('--mix', default=MIX, help='route weights (default: %(default)s)')
+    parser.add_argument('--slug', help='shared_lists slug for the shared route')
+    parser.add_argument('--user-id', help='users._id to sign a token for with JWT_SECRET (from the env or .env)')
+    parser.add_argument('--token', help='bearer token for the routes that need a user')
+    parser.add_argument('--seed', type=int, default=0, help='request mix seed (default: 0)')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='record the results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='p99 rise or throughput drop that counts as a regression (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(c) for c in args.concurrency.split(',')]
+    except ValueError as exc:
+        parser.error(str(exc))
+    context = {'seed': seed_rows(args.root), 'slug': args.slug, 'token': args.token}
+    if args.user_id and not args.token:
+        secret = jwt_secret(args.root)
+        if not secret:
+            parser.error('--user-id needs JWT_SECRET in the environment or .env')
+        context['token'] = token(args.user_id, secret)
+    for name in list(mix):
+        missing = [need for need in ROUTES[name][1] if not context.get(need)]
+        if missing:
+            print('skipping %s: no --%s' % (name, 'user-id or --token' if missing[0] == 'token' else missing[0]),
+                  file=sys.stderr)
+            del mix[name]
+    if not mix:
+        parser.error('no route left to run')
+
+    saved = load_baseline(args.baseline) or {}
+    baseline = saved.get('levels', {})
+    same_mix = saved.get('mix', mix) == mix
+    if baseline and not same_mix:
+        print('the baseline was recorded with another mix; comparing latency only', file=sys.stderr)
+    print('%s, mix %s' % (args.url, ', '.join('%s=%g' % item for item in mix.items())))
+    results = []
+    problems = []
+    for concurrency in levels:
+        stats, seconds = asyncio.run(run_level(args.url, mix, context, concurrency, args.duration, args.requests,
+                                               args.warmup, args.timeout, args.seed))
+        report_level(concurrency, stats, seconds, baseline.get(str(concurrency)))
+        results.append((concurrency, (stats, seconds)))
+        problems += regressions(concurrency, stats, seconds, baseline.get(str(concurrency)), args.tolerance,
+                                same_mix)
+    report_growth(results)
+
+    if args.save:
+        save_baseline(args.baseline, args.url, mix, results)
+        print('\nbaseline saved to %s' % args.baseline)
+    if problems:
+        print('\nregressions:')
+        for problem in problems:
+            print('  ' + problem)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,4 @@
-import re
-
-with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'r', encoding='utf-8') as f:
-    content = f.read()
+import tsx_index
 
 new_pending_view = '''function PendingView({ resources, processingId, onAction }: any) {
     const [expandedRequestId, setExpandedRequestId] = useState<string | null>(null)
@@ -173,35 +170,11 @@ new_pending_view = '''function PendingView({ resources, processingId, onAction }
     )
 }'''
 
-# Find and replace the PendingView function
-pattern = r'function PendingView\(\{ resources, processingId, onAction \}: any\) \{[^}]*(?:\{[^}]*\}[^}]*)*\}'
-# Use a more specific pattern that matches the entire function
-pattern = r'function PendingView\(\{ resources, processingId, onAction \}: any\) \{[\s\S]*?^\}'
-
-# Find the function using line numbers
-lines = content.split('\n')
-start_idx = None
-end_idx = None
-brace_count = 0
-
-for i, line in enumerate(lines):
-    if 'function PendingView' in line:
-        start_idx = i
-        brace_count = 0
-    if start_idx is not None:
-        brace_count += line.count('{') - line.count('}')
-        if brace_count == 0 and i > start_idx:
-            end_idx = i
-            break
-
-if start_idx is not None and end_idx is not None:
-    # Replace the function
-    new_lines = lines[:start_idx] + new_pending_view.split('\n') + lines[end_idx+1:]
-    content = '\n'.join(new_lines)
-    
-    with open(r'c:\Users\abhig\.gemini\antigravity\scratch\uninotes-react\src\components\AdminPanel.tsx', 'w', encoding='utf-8') as f:
-        f.write(content)
-    
-    print(f'PendingView replaced successfully! (lines {start_idx+1} to {end_idx+1})')
-else:
-    print('Could not find PendingView function')
+def transform(content):
+    # Replace the whole PendingView function, located through the block index
+    return tsx_index.replace_block(content, 'PendingView', new_pending_view)
+
+
+if __name__ == '__main__':
+    from codemod_runner import script_main
+    script_main('refactor_pending')
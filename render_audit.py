@@ -0,0 +1,513 @@
+"""Find what makes React redo work on every render of the long lists in src/.
+
+    python render_audit.py                        # every component in src/, costliest first
+    python render_audit.py src/components/AdminPanel.tsx --top 20
+    python render_audit.py --kind inline --kind key
+
+Every .tsx file is tokenized with tsx_index and four things are flagged:
+
+- inline: a component defined inside another one (const NeutralAvatar =
+  ... inside PendingView).  Each render of the parent makes a new
+  component type, so React unmounts and remounts everything it rendered,
+  at every use.
+- prop: an element inside a .map() callback given a new object or array
+  (animate={{...}}, style={{...}}) or, for a component, a new function on
+  every render of every row.  New functions on DOM elements are cheap and
+  not flagged.
+- key: the element a .map() callback returns with no key, keyed by the
+  index or by Math.random(), or a <> fragment, which cannot take one.
+  Inserting, removing or reordering rows then re-renders or remounts the
+  rows after it.
+- memo: a top-level component with no hooks that renders only DOM
+  elements and components from packages, not wrapped in memo(), and used
+  at least MIN_USES times or in a list.  memo() would skip it when its
+  props are unchanged; the finding says how many uses pass a new function
+  or object (or children) every time, which has to be fixed first.
+
+A finding counts the elements it affects: the elements rendered by the
+component or row involved, times its uses.  Inside a .map() that is per
+row, and rows are counted as ROWS for the ranking.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from collections import namedtuple
+
+import tsx_index
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SOURCES = ('src/**/*.tsx',)
+KINDS = ('inline', 'prop', 'key', 'memo')
+# Rows a mapped list is taken to have when ranking per-row findings.
+ROWS = 100
+MIN_USES = 2
+
+# path:line, one of KINDS, the elements affected (per row if per_row) and what was found.
+Finding = namedtuple('Finding', 'path line kind elements per_row detail')
+
+# A function component: name, token indexes of its body, line, and
+# whether it is wrapped in memo().
+Component = namedtuple('Component', 'name first last line memo')
+
+# One <Tag ...> of a file: token index, tag, per-row map range or None,
+# and the props given a new function/object/array on every render.
+Site = namedtuple('Site', 'index tag row unstable children')
+
+_TAG = re.compile(r'<([\w.]*)')
+_IMPORT = re.compile(r'^import\s+(?:type\s+)?([\w\s{},*]+?)\s+from\s+[\'"]([^\'"]+)[\'"]', re.M)
+_ATTRIBUTE = re.compile(r'[\w-]+')
+_HOOK = re.compile(r'^use[A-Z]\w*$')
+_COMPONENT = re.compile(r'^[A-Z]\w*$')
+_MEMO = frozenset(('memo', 'forwardRef'))
+_LISTS = frozenset(('map', 'flatMap'))
+# Tokens after which a JSX element is what the callback returns.
+_RETURNED = frozenset(('return', '=>', '?', ':', '&&', '||'))
+# Prop values made anew on every render.
+_UNSTABLE = frozenset(('object', 'array', 'function', 'element'))
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _close(tokens, j):
+    """Index of the bracket closing the one at tokens[j]."""
+    depth = tokens[j].depth
+    k = j + 1
+    while k < len(tokens) and tokens[k].depth > depth:
+        k += 1
+    return k
+
+
+def props(text, token):
+    """(name, kind, offset) of the attributes of a JSX element's opening tag.
+
+    kind is object, array, function or element for a value made anew on
+    each render, value for any other {...} and literal for strings and flags.
+    """
+    return _opening(text, token)[0]
+
+
+def children(text, token):
+    """Whether a JSX element has children other than plain text."""
+    end = _opening(text, token)[1]
+    if text.startswith('/>', end):
+        return False
+    inner = text[end + 1:text.rfind('</', token.start, token.end)]
+    return '<' in inner or '{' in inner
+
+
+def _opening(text, token):
+    """(props, offset of the > or /> ending the opening tag) of a JSX element."""
+    m = _TAG.match(text, token.start)
+    pos = m.end()
+    found = []
+    while pos < token.end:
+        c = text[pos]
+        if c == '>' or text.startswith('/>', pos):
+            break
+        if c == '{':
+            # {...spread}
+            pos = tsx_index.scan_expression(text, pos + 1)[1]
+        elif c.isalpha() or c == '_':
+            m = _ATTRIBUTE.match(text, pos)
+            name, start = m.group(), pos
+            pos = m.end()
+            while pos < token.end and text[pos] in ' \t\r\n':
+                pos += 1
+            kind = 'literal'
+            if text.startswith('={', pos):
+                expression, end = tsx_index.scan_expression(text, pos + 2)
+                kind = _kind(text, expression)
+                pos = end
+            elif text.startswith('=', pos):
+                pos += 1
+                quote = text[pos]
+                pos = text.index(quote, pos + 1) + 1 if quote in '"\'' else pos
+            found.append((name, kind, start))
+        else:
+            pos += 1
+    return found, pos
+
+
+def _kind(text, expression):
+    if not expression:
+        return 'value'
+    first = _value(text, expression[0])
+    if expression[0].kind == 'jsx':
+        return 'element'
+    if first == '{':
+        return 'object'
+    if first == '[':
+        return 'array'
+    values = [_value(text, t) for t in expression if t.depth == expression[0].depth]
+    if '=>' in values or first in ('function', 'async'):
+        return 'function'
+    if len(values) >= 4 and values[-4:-1] == ['.', 'bind', '(']:
+        return 'function'
+    return 'value'
+
+
+class _File:
+    """Tokens of one .tsx file and what the checks share about it."""
+
+    def __init__(self, text, path):
+        self.text = text
+        self.path = path
+        self.tokens = tsx_index.scan(text)
+        self.values = [_value(text, t) for t in self.tokens]
+        self.jsx = [k for k, t in enumerate(self.tokens) if t.kind == 'jsx']
+        self.lists = self._lists()
+        self.components = self._components()
+        self.memoized = self._memoized()
+        self.imports = {}
+        for m in _IMPORT.finditer(text):
+            for name in re.findall(r'\w+', re.sub(r'\b\w+\s+as\s+', '', m.group(1))):
+                if name != 'type':
+                    self.imports[name] = m.group(2)
+
+    def at(self, k):
+        return self.values[k] if 0 <= k < len(self.values) else None
+
+    def line(self, k):
+        return tsx_index.position(self.text, self.tokens[k].start)[0]
+
+    def tag(self, k):
+        return _TAG.match(self.text, self.tokens[k].start).group(1)
+
+    def inside(self, k, first, last):
+        """Whether the token at k is within the tokens first..last (a jsx token counts its whole span)."""
+        start = self.tokens[k].start
+        return self.tokens[first].start <= start and start < self.tokens[last].end
+
+    def elements(self, first, last):
+        """Number of JSX elements in tokens[first..last]."""
+        return sum(1 for k in self.jsx if self.inside(k, first, last))
+
+    def _lists(self):
+        """[(open, close, index parameter)] of the .map(...) calls given a callback."""
+        found = []
+        for k, value in enumerate(self.values):
+            if value not in _LISTS or self.at(k - 1) not in ('.', '?.') or self.at(k + 1) != '(':
+                continue
+            close = _close(self.tokens, k + 1)
+            if not any(self.at(j) in ('=>', 'function') for j in range(k + 2, close)):
+                continue
+            index = None
+            j = k + 2
+            if self.at(j) == 'async':
+                j += 1
+            if self.at(j) == 'function':
+                j += 1 + (self.tokens[j + 1].kind == 'name')
+            if self.at(j) == '(':
+                params = [p for p in range(j + 1, _close(self.tokens, j))
+                          if self.tokens[p].depth == self.tokens[j].depth + 1 and self.tokens[p].kind == 'name'
+                          and self.at(p - 1) in ('(', ',')]
+                if len(params) > 1:
+                    index = self.at(params[1])
+            found.append((k + 1, close, index))
+        return found
+
+    def row(self, k):
+        """The innermost .map(...) range (open, close, index) the token at k is in, or None."""
+        found = None
+        for opening, close, index in self.lists:
+            if self.tokens[opening].start < self.tokens[k].start < self.tokens[close].start:
+                if found is None or opening > found[0]:
+                    found = (opening, close, index)
+        return found
+
+    def _body(self, arrow):
+        """(first, last) tokens of the body of the arrow function whose => is at arrow."""
+        k = arrow + 1
+        if self.at(k) in ('{', '('):
+            return k, _close(self.tokens, k)
+        if self.tokens[k].kind == 'jsx':
+            return k, k
+        depth = self.tokens[arrow].depth
+        last = k
+        while last + 1 < len(self.tokens):
+            token = self.tokens[last + 1]
+            if token.depth < depth or token.depth == depth and (
+                    self.at(last + 1) in (';', ',') or self.text[:token.start].rsplit('\n', 1)[-1].strip() == ''):
+                break
+            last += 1
+        return k, last
+
+    def _components(self):
+        found = []
+        tokens = self.tokens
+        for k, value in enumerate(self.values):
+            if tokens[k].kind != 'name' or not _COMPONENT.match(value):
+                continue
+            if self.at(k - 1) == 'function' and self.at(k + 1) in ('(', '<'):
+                depth = tokens[k].depth
+                j = k + 1
+                while j < len(tokens) and not (self.at(j) == '{' and tokens[j].depth == depth
+                                               and self.at(j - 1) not in (':', '|', '&', '<', ',')):
+                    j += 1
+                if j < len(tokens):
+                    found.append(Component(value, j, _close(tokens, j), self.line(k), False))
+            elif self.at(k - 1) in ('const', 'let', 'var') and self.at(k + 1) in ('=', ':'):
+                j = k + 1
+                while j < len(tokens) and self.at(j) != '=':
+                    j += 1
+                j += 1
+                memo = False
+                while self.at(j) in ('React', '.') or self.at(j) in _MEMO and self.at(j + 1) == '(':
+                    memo = memo or self.at(j) == 'memo'
+                    j += 2 if self.at(j) in _MEMO else 1
+                if self.at(j) == 'async':
+                    j += 1
+                if self.at(j) == 'function':
+                    j += 1 + (tokens[j + 1].kind == 'name')
+                    if self.at(j) == '(':
+                        body = _close(tokens, j) + 1
+                        while body < len(tokens) and self.at(body) != '{':
+                            body += 1
+                        if body < len(tokens):
+                            found.append(Component(value, body, _close(tokens, body), self.line(k), memo))
+                    continue
+                if tokens[j].kind == 'name' and self.at(j + 1) == '=>':
+                    arrow = j + 1
+                elif self.at(j) == '(':
+                    arrow = _close(tokens, j) + 1
+                    while self.at(arrow) not in ('=>', None) and tokens[arrow].depth >= tokens[j].depth \
+                            and self.at(arrow) not in (';', '{'):
+                        arrow += 1
+                    if self.at(arrow) != '=>':
+                        continue
+                else:
+                    continue
+                first, last = self._body(arrow)
+                found.append(Component(value, first, last, self.line(k), memo))
+        # Only functions that render something are components.
+        return [c for c in found if self.elements(c.first, c.last)]
+
+    def _memoized(self):
+        """Names wrapped in memo() after their declaration: export default memo(X), X = memo(X)."""
+        names = set()
+        for k, value in enumerate(self.values):
+            if value == 'memo' and self.at(k + 1) == '(' and self.tokens[k + 2].kind == 'name' \
+                    and self.at(k + 3) == ')':
+                names.add(self.at(k + 2))
+        return names
+
+    def parent(self, component):
+        """The innermost other component whose body contains this one, or None."""
+        found = None
+        for other in self.components:
+            if other is not component and other.first < component.first and component.last <= other.last:
+                if found is None or other.first > found.first:
+                    found = other
+        return found
+
+    def sites(self):
+        """Site of every <Tag> in the file."""
+        found = []
+        for k in self.jsx:
+            tag = self.tag(k)
+            unstable = [name for name, kind, _ in props(self.text, self.tokens[k])
+                        if kind in _UNSTABLE and name != 'key']
+            found.append(Site(k, tag, self.row(k), unstable, children(self.text, self.tokens[k])))
+        return found
+
+
+def _component_tag(tag):
+    return bool(tag) and (tag[0].isupper() or '.' in tag)
+
+
+def inline_findings(source, sites):
+    findings = []
+    for component in source.components:
+        parent = source.parent(component)
+        if parent is None:
+            continue
+        uses = [s for s in sites if s.tag == component.name and parent.first <= s.index <= parent.last]
+        if not uses:
+            continue
+        size = source.elements(component.first, component.last)
+        per_row = any(s.row is not None for s in uses)
+        findings.append(Finding(
+            source.path, component.line, 'inline', size * len(uses), per_row,
+            '%s is defined inside %s: a new component type on each render, so its %d element%s are remounted '
+            'at %d use%s; move it to the top level' % (
+                component.name, parent.name, size, '' if size == 1 else 's', len(uses),
+                '' if len(uses) == 1 else 's')))
+    return findings
+
+
+def prop_findings(source, sites):
+    findings = []
+    for site in sites:
+        if site.row is None:
+            continue
+        component = _component_tag(site.tag)
+        names = [name for name, kind, _ in props(source.text, source.tokens[site.index])
+                 if kind in ('object', 'array') or kind in _UNSTABLE and component]
+        names = [n for n in names if n != 'key']
+        if not names:
+            continue
+        size = source.elements(site.index, site.index) if component else 1
+        findings.append(Finding(
+            source.path, source.line(site.index), 'prop', size, True,
+            '<%s> in each row gets a new %s on every render' % (
+                site.tag, ', '.join(names) if len(names) < 5 else '%s and %d more' % (
+                    ', '.join(names[:4]), len(names) - 4))))
+    return findings
+
+
+def key_findings(source, sites):
+    findings = []
+    by_index = {s.index: s for s in sites}
+    for opening, close, index in source.lists:
+        inner = [k for k in source.jsx if source.tokens[opening].start < source.tokens[k].start
+                 < source.tokens[close].start]
+        roots = [k for k in inner if not any(j != k and source.inside(k, j, j) for j in inner)]
+        for k in roots:
+            before = source.at(k - 1)
+            if before == '(':
+                before = source.at(k - 2)
+            if before not in _RETURNED:
+                continue
+            tag = by_index[k].tag
+            attributes = {name: (kind, start) for name, kind, start in props(source.text, source.tokens[k])}
+            problem = None
+            if not tag:
+                problem = 'is a <> fragment, which cannot take a key: use <Fragment key={...}>'
+            elif 'key' not in attributes:
+                problem = 'has no key'
+            else:
+                kind, start = attributes['key']
+                value = source.text[start:].split('=', 1)[1].lstrip()
+                expression = value[1:tsx_index.scan_expression(value, 1)[1] - 1].strip() if value[:1] == '{' else ''
+                if index and expression == index:
+                    problem = 'is keyed by its index %s' % index
+                elif 'Math.random' in expression:
+                    problem = 'gets a random key, so every render remounts it'
+            if problem:
+                size = source.elements(k, k)
+                findings.append(Finding(source.path, source.line(k), 'key', size, True,
+                                        'the <%s> row of the map at line %d %s' % (
+                                            tag, source.line(opening), problem)))
+    return findings
+
+
+def memo_findings(files, all_sites):
+    """memo candidates across files, with their uses in every file that imports them."""
+    findings = []
+    for source in files:
+        for component in source.components:
+            if component.memo or component.name in source.memoized or source.parent(component) is not None:
+                continue
+            body = range(component.first, component.last + 1)
+            if any(_HOOK.match(source.at(k) or '') and source.at(k + 1) in ('(', '<') for k in body):
+                continue
+            tags = {source.tag(k) for k in source.jsx if source.inside(k, component.first, component.last)}
+            local = {c.name for c in source.components}
+            if any(_component_tag(t) and '.' not in t and (t in local or source.imports.get(t, '.')[:1] == '.')
+                   for t in tags):
+                continue            # renders components of the project: not a leaf
+            stem = os.path.splitext(os.path.basename(source.path))[0]
+            uses = []
+            for other, sites in zip(files, all_sites):
+                if other is not source:
+                    spec = other.imports.get(component.name)
+                    if spec is None or not spec.startswith('.') or os.path.basename(spec).split('.')[0] != stem:
+                        continue
+                uses += [s for s in sites if s.tag == component.name
+                         and not (other is source and component.first <= s.index <= component.last)]
+            per_row = any(s.row is not None for s in uses)
+            if len(uses) < MIN_USES and not per_row:
+                continue
+            size = source.elements(component.first, component.last)
+            unstable = [s for s in uses if s.unstable or s.children]
+            if unstable:
+                names = sorted({n for s in unstable for n in s.unstable} | ({'children'} if any(
+                    s.children for s in unstable) else set()))
+                blocker = '; %d of %d uses pass a new %s on every render, which memo() sees as a change: ' \
+                          'hoist or wrap %s in useCallback/useMemo first' % (
+                              len(unstable), len(uses), ', '.join(names), 'it' if len(names) == 1 else 'them')
+            else:
+                blocker = '; every use passes stable props'
+            findings.append(Finding(
+                source.path, component.line, 'memo', size * len(uses), per_row,
+                '%s has no hooks and renders only elements: memo() would skip its %d element%s at %d use%s%s' % (
+                    component.name, size, '' if size == 1 else 's', len(uses), '' if len(uses) == 1 else 's',
+                    blocker)))
+    return findings
+
+
+def audit(texts):
+    """Findings for {path: text}, with the paths that failed to tokenize as (path, error)."""
+    files = []
+    failed = []
+    for path, text in texts.items():
+        try:
+            files.append(_File(text, path))
+        except tsx_index.TsxSyntaxError as exc:
+            failed.append((path, exc))
+    all_sites = [source.sites() for source in files]
+    findings = []
+    for source, sites in zip(files, all_sites):
+        findings += inline_findings(source, sites) + prop_findings(source, sites) + key_findings(source, sites)
+    findings += memo_findings(files, all_sites)
+    return findings, failed
+
+
+def rank(findings):
+    """Most elements affected first, a per-row finding counting ROWS rows."""
+    return sorted(findings, key=lambda f: (-f.elements * (ROWS if f.per_row else 1), f.path, f.line))
+
+
+def _relative(root, path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report inline components, unstable props, missing keys and '
+                                                 'memo candidates in src/.')
+    parser.add_argument('paths', nargs='*', help='files to report on (default: src/**/*.tsx)')
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('--kind', action='append', choices=KINDS, help='only this kind of finding (repeatable)')
+    parser.add_argument('--top', type=int, help='show only the first N findings')
+    args = parser.parse_args(argv)
+
+    root = os.path.abspath(args.root)
+    # Every file is read so that memo candidates count their uses everywhere.
+    everything = [p for pattern in SOURCES for p in sorted(glob.glob(os.path.join(root, pattern), recursive=True))]
+    wanted = {_relative(root, os.path.abspath(p)) for p in args.paths}
+    texts = {}
+    for path in sorted(set(everything) | {os.path.abspath(p) for p in args.paths}):
+        with open(path, encoding='utf-8') as f:
+            texts[_relative(root, path)] = f.read()
+    findings, failed = audit(texts)
+    if wanted:
+        findings = [f for f in findings if f.path in wanted]
+    if args.kind:
+        findings = [f for f in findings if f.kind in args.kind]
+
+    shown = rank(findings)[:args.top] if args.top else rank(findings)
+    for finding in shown:
+        elements = '%d/row' % finding.elements if finding.per_row else str(finding.elements)
+        print('%-6s %-42s %7s  %s' % (finding.kind, '%s:%d' % (finding.path, finding.line), elements,
+                                      finding.detail))
+    counts = {}
+    for finding in findings:
+        counts.setdefault(finding.path, {}).setdefault(finding.kind, 0)
+        counts[finding.path][finding.kind] += 1
+    if counts and not args.top:
+        print('\nby file:')
+        for path, kinds in sorted(counts.items(), key=lambda item: -sum(item[1].values())):
+            print('  %-42s %s' % (path, ', '.join('%d %s' % (kinds[k], k) for k in KINDS if k in kinds)))
+    for path, exc in failed:
+        print('%-9s  %s  (%s)' % ('failed', path, exc), file=sys.stderr)
+    print('%d findings in %d files%s' % (len(findings), len(counts), ', %d failed' % len(failed) if failed else ''),
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
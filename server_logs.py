@@ -0,0 +1,370 @@
+"""Stream server logs and count recurring errors by signature.
+
+    python server_logs.py top server_log.txt server_log_2.txt
+    python server_logs.py follow server_log.txt --interval 2
+
+The logs are PowerShell captures of the dev server: UTF-16 (or UTF-8),
+every stderr record wrapped in "node.exe : ..." / "At line:1 char:1" /
+CategoryInfo / FullyQualifiedErrorId lines and hard-wrapped at the console
+width.  Reading goes through four streaming stages, each holding at most
+one record:
+
+- iter_lines decodes the bytes incrementally and yields physical lines
+  (and, when following a file, None whenever it is idle);
+- unwrap rejoins lines PowerShell wrapped and drops its wrapper blocks;
+- iter_errors finds each Node error (message, error class and the first
+  stack frame in our code, or the file:line Node printed above it);
+- signature turns an error into a message template plus file:line, with
+  numbers, addresses, quoted values and paths replaced by placeholders.
+
+Counts are kept in a Space-Saving summary (TopK): memory is bounded by its
+capacity however many distinct errors a log holds, and the counts of the
+most frequent signatures are exact or within the reported error bound.
+"""
+import argparse
+import codecs
+import heapq
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+
+import lint_report
+
+CHUNK_SIZE = 1 << 16
+DEFAULT_CAPACITY = 1000
+
+# A Node error: kind is the error class, message the whole line it was
+# reported on, location 'path:line' or None.
+NodeError = namedtuple('NodeError', 'kind message location')
+
+# PowerShell's rendering of a native command's stderr.
+_EXE_PREFIX = re.compile(r'^[\w.-]+\.exe : ')
+_WRAPPER_START = re.compile(r'^At line:\d+ char:\d+$')
+
+# "TypeError: msg", "Error [ERR_X]: msg", possibly after a console.error
+# prefix ("MongoDB connection error: MongoServerSelectionError: ...").
+_ERROR = re.compile(r'(?:^|: )((?:[A-Z][\w$]*)?(?:Error|Exception))(?: \[[^\]]*\])?: (.*)$')
+_FRAME = re.compile(r'^\s+at (?:.*? \()?(.+?):(\d+)(?::\d+)?\)?$')
+# "C:\...\lib\mongodb.ts:6" printed above the source line of an uncaught throw.
+_THROW_SITE = re.compile(r'^((?:[A-Za-z]:)?[\\/].+?|node:[\w/]+):(\d+)$')
+
+# Placeholders for the variable parts of a message, in order.
+_TEMPLATE = [
+    (re.compile(r'\bhttps?://\S+'), '<url>'),
+    (re.compile(r'(?<![\w.])(?:[A-Za-z]:)?(?:[\\/][\w.@-]+)+[\\/]?'), '<path>'),
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b', re.I), '<uuid>'),
+    # IPv4 with an optional port; IPv6 (::1:27017 is ::1 port 27017).
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b|(?<![\w:])(?:[0-9a-f]{0,4}:){2,7}\d+\b', re.I), '<addr>'),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), '<str>'),
+    (re.compile(r'\b0x[0-9a-f]+\b|\b[0-9a-f]{16,}\b', re.I), '<hex>'),
+    (re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])'), '<n>'),
+]
+
+
+def _encoding(head):
+    """(codec, BOM length) for a file starting with head; see lint_report.open_report."""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8', 3
+    if head.startswith(codecs.BOM_UTF16_LE):
+        return 'utf-16-le', 2
+    if head.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16-be', 2
+    if len(head) >= 2 and head[1:2] == b'\0' and head[0:1] != b'\0':
+        return 'utf-16-le', 0
+    return 'utf-8', 0
+
+
+def iter_lines(path, follow=False, interval=1.0, from_end=False):
+    """Yield the lines of path without their line endings, decoding as it reads.
+
+    With follow, keep reading as the file grows and yield None after every
+    poll that found nothing new; a file that shrinks (truncated or rotated)
+    is read again from the start.  from_end skips what is already there.
+    """
+    while True:
+        f = open(path, 'rb')
+        with f:
+            encoding, bom = _encoding(f.read(4))
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+            position = os.fstat(f.fileno()).st_size if from_end else bom
+            if encoding.startswith('utf-16') and (position - bom) % 2:
+                position -= 1
+            f.seek(position)
+            pending = ''
+            while True:
+                data = f.read(CHUNK_SIZE)
+                if data:
+                    position += len(data)
+                    lines = (pending + decoder.decode(data)).split('\n')
+                    pending = lines.pop()
+                    for line in lines:
+                        yield line[:-1] if line.endswith('\r') else line
+                    continue
+                if not follow:
+                    pending += decoder.decode(b'', final=True)
+                    if pending:
+                        yield pending.rstrip('\r')
+                    return
+                yield None
+                time.sleep(interval)
+                try:
+                    if os.path.getsize(path) < position:
+                        break
+                except OSError:
+                    pass
+        from_end = False
+
+
+def console_width(lines):
+    """Guess the width PowerShell wrapped at: the longest line in a sample."""
+    return max((len(line) for line in lines if line is not None), default=0)
+
+
+def _wrapped(previous, line, width):
+    """Did PowerShell break previous where line starts?"""
+    if not width or not line or line[0].isspace():
+        return False
+    if previous.endswith(' '):
+        # Broken at a space: the next word did not fit.
+        return len(previous) + len(line.split(' ', 1)[0]) > width
+    # Broken inside a word: the line is full (the first record line is one short).
+    return len(previous) >= width - 1
+
+
+def unwrap(lines, width):
+    """Rejoin wrapped lines and drop PowerShell's wrapper blocks.
+
+    Yields logical lines, and passes None (idle) through after flushing.
+    width 0 leaves lines as they are.
+    """
+    current = None
+    last = ''           # the physical line current ends with
+    in_wrapper = False
+    for line in lines:
+        if line is None:
+            if current is not None:
+                yield current
+                current = None
+            yield None
+            continue
+        if in_wrapper:
+            # At line:.. / + & "..." / + ~~~ / + CategoryInfo / + FullyQualifiedErrorId,
+            # ended by a line holding a single space.
+            in_wrapper = bool(line.strip())
+            continue
+        if current is not None and _wrapped(last, line, width) and not _WRAPPER_START.match(line):
+            current += line
+            last = line
+            continue
+        if current is not None:
+            yield current
+        if _WRAPPER_START.match(line):
+            current = None
+            in_wrapper = True
+            continue
+        current = _EXE_PREFIX.sub('', line)
+        last = line
+    if current is not None:
+        yield current
+
+
+def _location(path, line, normalize):
+    return '%s:%s' % (normalize(path), line)
+
+
+def _ours(path):
+    """Is a stack frame's file part of the project (not Node or a dependency)?"""
+    return not path.startswith('node:') and 'node_modules' not in path
+
+
+def iter_errors(lines, normalize=None, max_frames=50):
+    """Yield a NodeError for every error record in logical lines.
+
+    A record is the "...Error: message" line and the indented lines below
+    it (stack frames, inspected properties, causes).  Only its first
+    max_frames frames are looked at, so a huge dump costs no memory.  None
+    in lines (idle) ends the current record and is passed on.
+    """
+    normalize = normalize or lint_report.PathNormalizer()
+    record = None          # [kind, message, first frame, first frame in our code, frames seen]
+    throw_site = None
+
+    def finish():
+        kind, message, first, ours, _ = record
+        location = ours or first or throw_site
+        return NodeError(kind, message, location)
+
+    for line in lines:
+        if record is not None and line and (line[0].isspace() or line[0] in '}])'):
+            if record[4] < max_frames:
+                m = _FRAME.match(line)
+                if m:
+                    record[4] += 1
+                    path = m.group(1)
+                    if record[2] is None:
+                        record[2] = _location(path, m.group(2), normalize)
+                    if record[3] is None and _ours(path):
+                        record[3] = _location(path, m.group(2), normalize)
+            continue
+        if record is not None:
+            yield finish()
+            record = None
+            throw_site = None
+        if line is None:
+            yield None
+            continue
+        m = _ERROR.search(line)
+        if m and not line[0].isspace():
+            record = [m.group(1), line.strip(), None, None, 0]
+            continue
+        m = _THROW_SITE.match(line)
+        if m and not m.group(1).startswith('node:'):
+            throw_site = _location(m.group(1), m.group(2), normalize)
+    if record is not None:
+        yield finish()
+
+
+def template(message):
+    """message with its variable parts replaced by placeholders."""
+    for pattern, placeholder in _TEMPLATE:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def signature(error):
+    """(kind, message template, location) identifying an error."""
+    return error.kind, template(error.message), error.location
+
+
+class TopK:
+    """Space-Saving summary of the most frequent keys in a stream.
+
+    At most capacity keys are tracked.  A new key arriving when full takes
+    over the slot of the least counted one and inherits its count, which
+    becomes the new key's error bound: a reported count is at most error
+    too high, and every key seen more than total/capacity times is kept.
+
+    The least counted key is found with a min-heap holding one entry per
+    key.  Counts only grow, so an entry can only be too low; it is brought
+    up to date when it reaches the top, which keeps adding O(log capacity)
+    amortized.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = {}        # key -> [count, error, first seen, last seen]
+        self.total = 0
+        self._heap = []         # (count when pushed, arrival, key)
+        self._arrivals = 0
+
+    def add(self, key, when=None):
+        self.total += 1
+        entry = self.counts.get(key)
+        if entry is None:
+            floor = self._evict() if len(self.counts) >= self.capacity else 0
+            entry = self.counts[key] = [floor, floor, when, when]
+            self._arrivals += 1
+            heapq.heappush(self._heap, (floor + 1, self._arrivals, key))
+        entry[0] += 1
+        entry[3] = when
+
+    def _evict(self):
+        """Drop the least counted key (the earliest arrival on a tie); returns its count."""
+        heap = self._heap
+        while True:
+            count, arrival, key = heap[0]
+            current = self.counts[key][0]
+            if count == current:
+                heapq.heappop(heap)
+                del self.counts[key]
+                return count
+            heapq.heapreplace(heap, (current, arrival, key))
+
+    def top(self, n=None):
+        """[(key, count, error, first, last)], most frequent first."""
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1][0])
+        return [(key,) + tuple(entry) for key, entry in ranked[:n]]
+
+
+def count(lines, width, topk, normalize=None):
+    """Feed the errors in physical lines into topk.
+
+    Yields whenever the input is idle (see iter_lines), so a caller
+    following a log can report in between; drain it otherwise.
+    """
+    for error in iter_errors(unwrap(lines, width), normalize):
+        if error is None:
+            yield
+        else:
+            topk.add(signature(error), topk.total + 1)
+
+
+def print_top(topk, n=10, out=sys.stdout):
+    rows = topk.top(n)
+    if not rows:
+        print('no errors', file=out)
+        return
+    width = max(len(location or '?') for (_, _, location), *_ in rows)
+    print('%7s  %-*s  %s' % ('count', width, 'location', 'error'), file=out)
+    for (kind, message, location), total, error, _, _ in rows:
+        bound = '  (at most %d too high)' % error if error else ''
+        print('%7d  %-*s  %s%s' % (total, width, location or '?', message, bound), file=out)
+    print('%d errors, %d signatures tracked' % (topk.total, len(topk.counts)), file=out)
+
+
+def _sample_width(path, width):
+    if width is not None:
+        return width
+    sample = []
+    for line in iter_lines(path):
+        sample.append(line)
+        if len(sample) >= 2000:
+            break
+    return console_width(sample)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Count recurring errors in dev server logs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-n', '--top', type=int, default=10, help='signatures to show (default: %(default)s)')
+    common.add_argument('--width', type=int, default=None,
+                        help='console width the log was wrapped at (default: guessed; 0: not wrapped)')
+    common.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help='signatures to keep counts for (default: %(default)s)')
+    top = commands.add_parser('top', parents=[common], help='most frequent errors in one or more logs')
+    top.add_argument('logs', nargs='+')
+    follow = commands.add_parser('follow', parents=[common], help='keep counting as a log grows')
+    follow.add_argument('log')
+    follow.add_argument('--interval', type=float, default=1.0, help='seconds between polls (default: %(default)s)')
+    follow.add_argument('--from-start', action='store_true', help='count what is already in the log too')
+    args = parser.parse_args(argv)
+
+    topk = TopK(args.capacity)
+    normalize = lint_report.PathNormalizer()
+    if args.command == 'top':
+        for log in args.logs:
+            for _ in count(iter_lines(log), _sample_width(log, args.width), topk, normalize):
+                pass
+        print_top(topk, args.top)
+        return 0
+
+    width = _sample_width(args.log, args.width)
+    lines = iter_lines(args.log, follow=True, interval=args.interval, from_end=not args.from_start)
+    shown = 0
+    try:
+        for _ in count(lines, width, topk, normalize):
+            if topk.total != shown:
+                shown = topk.total
+                print('\n%s' % time.strftime('%H:%M:%S'))
+                print_top(topk, args.top)
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
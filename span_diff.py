@@ -0,0 +1,249 @@
+"""Unified diffs built from edit spans.
+
+The engines report every change as an edit (start, end, replacement, rule)
+against the original text, so the diff only has to look at the lines those
+spans touch.  Nothing is compared line by line and the new file is never
+materialized.
+
+    edits = list(ruleset.scan(content))
+    sys.stdout.write(unified_diff(content, edits, 'src/components/AdminPanel.tsx'))
+"""
+import bisect
+import difflib
+from collections import Counter
+
+
+def _line_start(text, offset):
+    return text.rfind('\n', 0, offset) + 1
+
+
+def _line_end(text, offset):
+    """Offset just past the line containing offset (past its newline)."""
+    end = text.find('\n', offset)
+    return len(text) if end < 0 else end + 1
+
+
+def _regions(text, edits):
+    """Merge edits into whole-line regions: (old_start, old_end, new_text)."""
+    regions = []
+    for start, end, replacement, *_ in edits:
+        a = _line_start(text, start)
+        b = _line_end(text, end - 1 if end > start else start)
+        if regions and a < regions[-1][1]:
+            # Shares a line with the previous region: extend it.
+            old_a, old_b, pieces, last = regions[-1]
+            pieces.append(text[last:start])
+            pieces.append(replacement)
+            regions[-1] = [old_a, max(old_b, b), pieces, end]
+        else:
+            regions.append([a, b, [text[a:start], replacement], end])
+        region = regions[-1]
+        if end == region[1] < len(text):
+            # The edit took the newline ending the region: unless what
+            # replaces it ends a line too, the next line joins the region.
+            head = next((piece for piece in reversed(region[2]) if piece), '')
+            if head and not head.endswith('\n'):
+                region[1] = _line_end(text, end)
+    for region in regions:
+        a, b, pieces, last = region
+        pieces.append(text[last:b])
+        region[2] = ''.join(pieces)
+    return [(a, b, new) for a, b, new, _ in regions]
+
+
+def apply_edits(text, edits):
+    """Return text (str or bytes) with edits applied."""
+    out = []
+    last = 0
+    for start, end, replacement, *_ in edits:
+        out.append(text[last:start])
+        out.append(replacement)
+        last = end
+    if not out:
+        return text
+    out.append(text[last:])
+    return text[:0].join(out)
+
+
+def _lines(text):
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith(('\n', '\r')):
+        lines[-1] += '\n\\ No newline at end of file\n'
+    return lines
+
+
+def _range(start, length):
+    # Same convention as difflib: a 1-based start, or the line before an empty range.
+    if length == 1:
+        return '%d' % (start + 1)
+    return '%d,%d' % (start if length == 0 else start + 1, length)
+
+
+def unified_diff(text, edits, path, context=3):
+    """Return a unified diff (as a string) for edits applied to text."""
+    regions = _regions(text, edits)
+    if not regions:
+        return ''
+    out = ['--- a/%s\n' % path, '+++ b/%s\n' % path]
+
+    # Line numbers of each region, counted incrementally.
+    numbered = []
+    line = 0
+    last = 0
+    for a, b, new in regions:
+        line += text.count('\n', last, a)
+        old_lines = text.count('\n', a, b) + (0 if text.endswith('\n') or b < len(text) else 1)
+        numbered.append((line, line + old_lines, a, b, new))
+        line += old_lines
+        last = b
+
+    delta = 0
+    i = 0
+    while i < len(numbered):
+        # Regions whose context windows touch share one hunk.
+        j = i
+        while j + 1 < len(numbered) and numbered[j + 1][0] - numbered[j][1] <= 2 * context:
+            j += 1
+        first, final = numbered[i], numbered[j]
+
+        lead_start = first[2]
+        lead = 0
+        while lead < context and lead_start > 0:
+            lead_start = _line_start(text, lead_start - 1)
+            lead += 1
+        tail_end = final[3]
+        tail = 0
+        while tail < context and tail_end < len(text):
+            tail_end = _line_end(text, tail_end)
+            tail += 1
+
+        body = [' ' + l for l in _lines(text[lead_start:first[2]])]
+        old_count = lead
+        new_count = lead
+        for k in range(i, j + 1):
+            old_line, old_stop, a, b, new = numbered[k]
+            if k > i:
+                gap = _lines(text[numbered[k - 1][3]:a])
+                body += [' ' + l for l in gap]
+                old_count += len(gap)
+                new_count += len(gap)
+            removed = _lines(text[a:b])
+            added = _lines(new)
+            body += ['-' + l for l in removed]
+            body += ['+' + l for l in added]
+            old_count += len(removed)
+            new_count += len(added)
+        body += [' ' + l for l in _lines(text[final[3]:tail_end])]
+        old_count += tail
+        new_count += tail
+
+        old_start = first[0] - lead
+        out.append('@@ -%s +%s @@\n' % (_range(old_start, old_count), _range(old_start + delta, new_count)))
+        out.extend(body)
+        delta += new_count - old_count
+        i = j + 1
+    return ''.join(out)
+
+
+def _common_length(a, b, limit, backwards=False):
+    """Length of the common prefix (or suffix) of a and b, up to limit."""
+    length = 0
+    step = 1 << 12
+    while length < limit:
+        size = min(step, limit - length)
+        if backwards:
+            same = a[len(a) - length - size:len(a) - length] == b[len(b) - length - size:len(b) - length]
+        else:
+            same = a[length:length + size] == b[length:length + size]
+        if same:
+            length += size
+        elif size == 1:
+            break
+        else:
+            step = size // 2
+    return length
+
+
+def edits_between(old, new):
+    """Edits turning old into new, for codemods that only return text.
+
+    The common prefix and suffix are skipped before lines are compared, so
+    a change confined to one component costs about one pass over the file.
+    """
+    if old == new:
+        return []
+    prefix = _line_start(old, _common_length(old, new, min(len(old), len(new))))
+    suffix = _common_length(old, new, min(len(old), len(new)) - prefix, backwards=True)
+    cut = len(old) - suffix
+    if cut > prefix and old[cut - 1] != '\n':
+        # Keep whole lines at the end as well.
+        suffix = len(old) - _line_end(old, cut)
+    old_mid = old[prefix:len(old) - suffix].splitlines(keepends=True)
+    new_mid = new[prefix:len(new) - suffix].splitlines(keepends=True)
+
+    edits = []
+    offsets = [prefix]
+    for line in old_mid:
+        offsets.append(offsets[-1] + len(line))
+    for tag, i1, i2, j1, j2 in _opcodes(old_mid, new_mid):
+        if tag != 'equal':
+            edits.append((offsets[i1], offsets[i2], ''.join(new_mid[j1:j2]), None))
+    return edits
+
+
+def _anchors(a, b):
+    """Pairs (i, j) of lines that occur once in a and once in b, in order.
+
+    Of the unique lines both sides share, the longest run that is in the
+    same order on both sides is kept (patience diff).
+    """
+    count_a = Counter(a)
+    count_b = Counter(b)
+    where = {line: j for j, line in enumerate(b) if count_b[line] == 1}
+    pairs = [(i, where[line]) for i, line in enumerate(a) if count_a[line] == 1 and line in where]
+    # Longest increasing subsequence of the j's.
+    tails = []              # tails[n]: j ending the best run of length n + 1
+    ends = []               # index into pairs of that run's last pair
+    back = []
+    for k, (_, j) in enumerate(pairs):
+        n = bisect.bisect_left(tails, j)
+        back.append(ends[n - 1] if n else -1)
+        if n == len(tails):
+            tails.append(j)
+            ends.append(k)
+        else:
+            tails[n] = j
+            ends[n] = k
+    chain = []
+    k = ends[-1] if ends else -1
+    while k >= 0:
+        chain.append(pairs[k])
+        k = back[k]
+    return chain[::-1]
+
+
+def _opcodes(a, b):
+    """difflib opcodes for lines a -> b, with difflib run between anchors.
+
+    SequenceMatcher is quadratic in the number of repeated lines (every
+    </div> matches every other), which a codemod touching lines all over a
+    long file runs straight into.  Lines unique to both sides cut the
+    problem into small gaps first.
+    """
+    i = j = 0
+    for anchor_i, anchor_j in _anchors(a, b) + [(len(a), len(b))]:
+        matcher = difflib.SequenceMatcher(None, a[i:anchor_i], b[j:anchor_j], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            yield tag, i + i1, i + i2, j + j1, j + j2
+        i, j = anchor_i, anchor_j
+
+
+def stats(text, edits, names):
+    """Per-rule hit counts and (bytes removed, bytes added) for edits to text."""
+    hits = Counter()
+    removed = added = 0
+    for start, end, replacement, rule in edits:
+        hits[names[rule] if rule is not None else 'transform'] += 1
+        removed += len(text[start:end].encode('utf-8'))
+        added += len(replacement.encode('utf-8'))
+    return hits, removed, added
@@ -0,0 +1,171 @@
+import { useCallback, useEffect, useLayoutEffect, useRef, useState, type ReactNode } from 'react'
+
+// Windowed list: only the rows in (or near) the viewport are mounted, the rest
+// of the list is padding of their measured (or estimated) height.  Rows are
+// measured as they render, so cards that expand keep the offsets right.
+// virtualize_lists.py rewrites the long .map() card lists to it.
+
+interface VirtualListProps<T> {
+    items: T[]
+    // Stable identity of an item (its _id): measured heights follow it when
+    // the list is filtered or reordered.
+    itemKey: (item: T) => string | number
+    renderItem: (item: T, index: number) => ReactNode
+    // Height of a row that has not been measured yet, in px.
+    estimateHeight?: number
+    // Space between rows, in px (what space-y-* or gap-* gave the mapped list).
+    gap?: number
+    // Items per row for a viewport width; grid rows are windowed as a whole.
+    columns?: (viewportWidth: number) => number
+    // Rows kept mounted above and below the visible ones.
+    overscan?: number
+    className?: string
+    rowClassName?: string
+}
+
+// Nearest ancestor that scrolls, or the window.
+function scrollParent(node: HTMLElement): HTMLElement | Window {
+    for (let el = node.parentElement; el; el = el.parentElement) {
+        const { overflowY } = window.getComputedStyle(el)
+        if (overflowY === 'auto' || overflowY === 'scroll') return el
+    }
+    return window
+}
+
+// Index of the last row starting at or above offset.
+function rowAt(tops: number[], offset: number) {
+    let low = 0
+    let high = tops.length - 1
+    while (low < high) {
+        const mid = (low + high + 1) >> 1
+        if (tops[mid] <= offset) low = mid
+        else high = mid - 1
+    }
+    return low
+}
+
+export default function VirtualList<T>({
+    items,
+    itemKey,
+    renderItem,
+    estimateHeight = 64,
+    gap = 0,
+    columns,
+    overscan = 4,
+    className,
+    rowClassName
+}: VirtualListProps<T>) {
+    const listRef = useRef<HTMLDivElement>(null)
+    const scroller = useRef<HTMLElement | Window | null>(null)
+    const observer = useRef<ResizeObserver | null>(null)
+    const observed = useRef(new Set<Element>())
+    const [heights, setHeights] = useState(() => new Map<string, number>())
+    const [viewportWidth, setViewportWidth] = useState(() => window.innerWidth)
+    const [range, setRange] = useState({ first: 0, end: 0 })
+
+    const perRow = columns ? Math.max(1, columns(viewportWidth)) : 1
+    const rows: T[][] = []
+    for (let i = 0; i < items.length; i += perRow) rows.push(items.slice(i, i + perRow))
+    const keys = rows.map(row => row.map(itemKey).join(' '))
+    // tops[i] is where row i starts; every row is followed by gap.
+    const tops = [0]
+    keys.forEach((key, i) => tops.push(tops[i] + (heights.get(key) ?? estimateHeight) + gap))
+
+    // The scroll handler outlives this render: it reads the latest offsets from here.
+    const layout = useRef(tops)
+
+    const updateRange = useCallback(() => {
+        const list = listRef.current
+        if (!list) return
+        const offsets = layout.current
+        const count = offsets.length - 1
+        const top = list.getBoundingClientRect().top
+        const view = scroller.current instanceof HTMLElement
+            ? scroller.current.getBoundingClientRect()
+            : { top: 0, bottom: window.innerHeight }
+        const first = Math.max(0, rowAt(offsets, view.top - top) - overscan)
+        const end = Math.min(count, rowAt(offsets, view.bottom - top) + 1 + overscan)
+        setRange(prev => prev.first === first && prev.end === end ? prev : { first, end })
+    }, [overscan])
+
+    useEffect(() => {
+        if (!listRef.current) return
+        const target = scrollParent(listRef.current)
+        scroller.current = target
+        let frame = 0
+        const onScroll = () => {
+            cancelAnimationFrame(frame)
+            frame = requestAnimationFrame(updateRange)
+        }
+        const onResize = () => {
+            setViewportWidth(window.innerWidth)
+            onScroll()
+        }
+        target.addEventListener('scroll', onScroll, { passive: true })
+        window.addEventListener('resize', onResize)
+        updateRange()
+        return () => {
+            cancelAnimationFrame(frame)
+            target.removeEventListener('scroll', onScroll)
+            window.removeEventListener('resize', onResize)
+        }
+    }, [updateRange])
+
+    useEffect(() => () => observer.current?.disconnect(), [])
+
+    // After every render: publish the offsets, re-window, and stop measuring
+    // rows that scrolled out.
+    useLayoutEffect(() => {
+        layout.current = tops
+        updateRange()
+        observed.current.forEach(el => {
+            if (!el.isConnected) {
+                observer.current?.unobserve(el)
+                observed.current.delete(el)
+            }
+        })
+    })
+
+    const measure = useCallback((node: HTMLDivElement | null) => {
+        if (!node) return
+        observer.current ??= new ResizeObserver(entries => {
+            setHeights(prev => {
+                let next = prev
+                for (const entry of entries) {
+                    const key = (entry.target as HTMLElement).dataset.key ?? ''
+                    const height = entry.borderBoxSize?.[0]?.blockSize ?? entry.target.getBoundingClientRect().height
+                    if (prev.get(key) !== height) {
+                        if (next === prev) next = new Map(prev)
+                        next.set(key, height)
+                    }
+                }
+                return next
+            })
+        })
+        observer.current.observe(node)
+        observed.current.add(node)
+    }, [])
+
+    const first = Math.min(range.first, rows.length)
+    const end = Math.min(range.end, rows.length)
+
+    return (
+        <div
+            ref={listRef}
+            className={className}
+            style={{ paddingTop: tops[first], paddingBottom: Math.max(0, tops[rows.length] - tops[Math.max(first, end)]) }}
+        >
+            {rows.slice(first, end).map((row, i) => (
+                <div
+                    key={keys[first + i]}
+                    data-key={keys[first + i]}
+                    ref={measure}
+                    className={rowClassName}
+                    style={i ? { marginTop: gap } : undefined}
+                >
+                    {row.map((item, j) => renderItem(item, (first + i) * perRow + j))}
+                </div>
+            ))}
+        </div>
+    )
+}
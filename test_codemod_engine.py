@@ -0,0 +1,8 @@
+from codemod_engine import Rule, compile_rules
+
+
+def test_empty_matches_under_a_scope_terminate():
+    assert compile_rules([Rule('x?', 'Z', '<[^>]*>')]).apply('') == ''
+    assert compile_rules([Rule('x?', 'Z', 'a+b')]).apply('<>a<') == '<>a<'
+    assert compile_rules([Rule(r'\s*', '', 'foo')]).apply('bar') == 'bar'
+    assert compile_rules([Rule('x?', 'Z', '<[^>]*>')]).apply('a<b>c') == 'aZ<ZbZ>Zc'
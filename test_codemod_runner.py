@@ -0,0 +1,37 @@
+import codemod_engine
+import codemod_runner
+
+BOLD = r'''RULES = [(r'<b>(.)</b>', r'<i>\1</i>')]
+'''
+
+
+def test_mapped_run_matches_str_run_on_non_ascii(tmp_path):
+    codemod = tmp_path / 'bold.py'
+    codemod.write_text(BOLD, encoding='utf-8')
+    target = tmp_path / 'Label.txt'
+    text = '<b>é</b> <b>a</b>\n'
+    target.write_text(text, encoding='utf-8')
+
+    dry = codemod_runner.process_file(str(codemod), str(target), dry_run=True)
+    real = codemod_runner.process_file(str(codemod), str(target))
+
+    assert dry.status == real.status == codemod_runner.CHANGED
+    assert target.read_text(encoding='utf-8') == '<i>é</i> <i>a</i>\n'
+
+
+def test_encoded_table_agrees_on_ascii():
+    table = codemod_engine.compile_rules([(r'<b>(.)</b>', r'<i>\1</i>'), (r'\s+$', '')])
+    text = '<b>x</b> <b>yy</b>  '
+    assert table.encoded().apply(text.encode('ascii')).decode('ascii') == table.apply(text)
+
+
+def test_cache_key_follows_local_modules_and_validation(tmp_path):
+    (tmp_path / 'shout_words.py').write_text("WORD = 'hey'\n", encoding='utf-8')
+    (tmp_path / 'shout.py').write_text("import shout_words\n\nRULES = [(shout_words.WORD, 'HEY')]\n",
+                                       encoding='utf-8')
+    codemod = str(tmp_path / 'shout.py')
+
+    key = codemod_runner.cache_key(codemod)
+    assert codemod_runner.cache_key(codemod, validate=False) != key
+    (tmp_path / 'shout_words.py').write_text("WORD = 'hi'\n", encoding='utf-8')
+    assert codemod_runner.cache_key(codemod) != key
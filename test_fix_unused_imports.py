@@ -0,0 +1,34 @@
+import fix_unused_imports
+import span_diff
+
+SOURCE = '''import { Check, Search, Shield, Users } from 'lucide-react'
+
+// Search is done server side now
+const label = 'Shield'
+const icon = <Users.Icon size={16} />
+export const title = copy.Check
+'''
+
+
+def test_comments_strings_and_properties_are_not_uses():
+    imports = fix_unused_imports.parse_imports(SOURCE)
+    diagnostics = [(0, 0, name) for name in ('Check', 'Search', 'Shield', 'Users')]
+    names, skipped = fix_unused_imports.unused_bindings(SOURCE, imports, diagnostics)
+    assert names == {'Check', 'Search', 'Shield'}
+    assert skipped == [(0, 0, 'Users')]
+
+
+def _fixed(source, names):
+    imports = fix_unused_imports.parse_imports(source)
+    edits = sorted(e for imp in imports for e in fix_unused_imports.import_edits(source, imp, names))
+    return span_diff.apply_edits(source, edits)
+
+
+def test_unused_type_only_imports_are_deleted():
+    source = ("import type { Session } from '@supabase/supabase-js'\n"
+              "import { type User, type Role } from '@supabase/auth-js'\n"
+              "import { createClient, type Client } from 'jspdf-autotable'\n"
+              "const x = 1\n")
+    assert _fixed(source, {'Session', 'User', 'Role'}) == (
+        "import { createClient, type Client } from 'jspdf-autotable'\nconst x = 1\n")
+    assert _fixed(source, {'createClient', 'Client'}).splitlines()[2] == "import 'jspdf-autotable'"
@@ -0,0 +1,24 @@
+import lazy_motion
+
+HEADER = "import { motion } from 'framer-motion'\n"
+
+
+def test_function_parameter_keeps_motion():
+    text = HEADER + 'function Item(m: any) { return <motion.li animate={{ x: m.x }} /> }\n'
+    out = lazy_motion.transform(text)
+    assert out.startswith("import { m as motion } from 'framer-motion'")
+    assert '<motion.li' in out
+
+
+def test_destructured_parameter_keeps_motion():
+    text = HEADER + 'function Other({ m }) { return <motion.div>{m}</motion.div> }\n'
+    out = lazy_motion.transform(text)
+    assert out.startswith("import { m as motion } from 'framer-motion'")
+    assert '<motion.div>' in out
+
+
+def test_unshadowed_tags_are_renamed():
+    text = HEADER + 'const Card = () => <motion.div animate={{ opacity: 1 }} />\nconst options = { m: 1 }\n'
+    out = lazy_motion.transform(text)
+    assert out.startswith("import { m } from 'framer-motion'")
+    assert '<m.div' in out
@@ -0,0 +1,39 @@
+import lazy_routes
+
+APP = """import { useState } from 'react'
+import { Routes, Route } from 'react-router-dom'
+import Home from './pages/Home'
+import Admin from './pages/Admin'
+import Header from './components/Header'
+
+const title = 'x'
+
+import { useTheme } from './hooks/useTheme'
+
+export default function App() {
+  return (
+    <>
+      <Header />
+      <Routes>
+        <Route path="/" element={<Home />} />
+        <Route path="/admin" element={
+          <Admin />
+        } />
+      </Routes>
+    </>
+  )
+}
+"""
+
+
+def test_consts_follow_imports_and_only_route_elements_change():
+    out = lazy_routes.transform(APP)
+    lines = out.splitlines()
+    last_import = max(i for i, line in enumerate(lines) if line.startswith('import '))
+    lazy = lines.index("const Admin = lazy(() => import('./pages/Admin'))")
+    assert lazy > last_import
+    assert "import Admin from './pages/Admin'" not in out
+    assert '          <Suspense fallback={%s}><Admin /></Suspense>\n' % lazy_routes.FALLBACK_NAME in out
+    # Nothing else in <Routes> moves.
+    assert '      <Routes>\n        <Route path="/" element={<Home />} />\n' in out
+    assert lazy_routes.transform(out) == out
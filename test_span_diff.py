@@ -0,0 +1,34 @@
+import random
+import shutil
+import subprocess
+
+import pytest
+
+import codemod_engine
+import span_diff
+from codemod_engine import Rule
+
+
+def _patched(tmp_path, text, diff):
+    target = tmp_path / 'f'
+    target.write_bytes(text.encode('utf-8'))
+    subprocess.run(['patch', '-s', '-p1', '-d', str(tmp_path)], input=diff.encode('utf-8'), check=True)
+    return target.read_bytes().decode('utf-8')
+
+
+@pytest.mark.skipif(shutil.which('patch') is None, reason='needs GNU patch')
+def test_diff_applies_to_the_rewritten_text(tmp_path):
+    rng = random.Random(0)
+    cases = [('a\nfoo\nbaz\nq\n', r'foo\s*', 'bar ')]
+    for _ in range(200):
+        lines = [' '.join(rng.choice(('foo', 'bar', 'baz', '', ' ')) for _ in range(rng.randrange(3)))
+                 for _ in range(rng.randrange(1, 10))]
+        text = '\n'.join(lines) + ('\n' if rng.random() < 0.8 else '')
+        cases.append((text, rng.choice((r'foo\s*', r'\s*bar', r'baz\n', r'\n+', r'\s+')),
+                      rng.choice(('', 'X', 'X\n', ' ', '\n'))))
+    for text, pattern, replacement in cases:
+        edits = [e for e in codemod_engine.compile_rules([Rule(pattern, replacement)]).scan(text)
+                 if text[e[0]:e[1]] != e[2]]
+        if edits:
+            diff = span_diff.unified_diff(text, edits, 'f')
+            assert _patched(tmp_path, text, diff) == span_diff.apply_edits(text, edits), diff
@@ -0,0 +1,444 @@
+"""One-pass TSX tokenizer and top-level block index.
+
+scan() walks a .ts/.tsx source once and understands comments, strings,
+template literals (including nested ${...}), regex literals and JSX, so
+braces inside any of those never confuse the bracket depth.  build_index()
+uses the depth-0 tokens to map every top-level declaration to its offsets:
+
+    index = build_index(content)
+    block = index['PendingView']          # Block(name, kind, start, end, exported)
+    content = replace_block(content, 'PendingView', new_source, index)
+
+Malformed input raises TsxSyntaxError with the offset of the problem.
+Scanner is the tokenizer itself, for checks that need to see every token
+as it is read.
+"""
+import re
+from collections import namedtuple
+
+# kind is one of name, number, string, template, regex, punct, open, close, jsx.
+# depth is the bracket/JSX nesting level the token sits at.
+Token = namedtuple('Token', 'kind start end depth')
+
+# A top-level declaration.  start includes leading export/default/async.
+Block = namedtuple('Block', 'name kind start end exported')
+
+
+class TsxSyntaxError(ValueError):
+    def __init__(self, text, offset, message):
+        self.offset = offset
+        self.line, self.column = position(text, offset)
+        self.message = message
+        super().__init__('%d:%d: %s' % (self.line, self.column, message))
+
+
+def position(text, offset):
+    """1-based (line, column) of an offset."""
+    line = text.count('\n', 0, offset) + 1
+    return line, offset - text.rfind('\n', 0, offset)
+
+
+_SKIP = re.compile(r'(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*')
+_NAME = re.compile(r'[^\W\d][\w$]*|\$[\w$]*')
+_NUMBER = re.compile(r'\d[\w.]*|\.\d\w*')
+_STRING = re.compile(r""""(?:[^"\\\n]|\\[\s\S])*"|'(?:[^'\\\n]|\\[\s\S])*'""")
+_PUNCT = re.compile(r'\.\.\.|\?\?=?|\?\.(?!\d)|=>|[=!]=?=?|<<=?|>>>?=?|[<>]=?|&&=?|\|\|=?|\*\*=?'
+                    r'|\+\+|--|[-+*/%&|^]=?|[~?:;,.@#]')
+_REGEX = re.compile(r'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+_TEMPLATE_PART = re.compile(r'[`\\]|\$\{')
+_JSX_NAME = re.compile(r'[^\W\d][\w$.:-]*|\$[\w$.:-]*')
+_JSX_ATTR = re.compile(r'[^\W\d][\w$:-]*|\$[\w$:-]*')
+_JSX_CHILD = re.compile(r'[{<]')
+
+# Names after which an expression has not ended yet, so / starts a regex
+# and < starts JSX.
+_OPERATOR_WORDS = frozenset((
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await', 'extends', 'default', 'export',
+))
+_CLOSERS = {'(': ')', '[': ']', '{': '}'}
+
+
+class Scanner:
+    """The tokenizer behind scan().  Scanner(text).js(0) fills .tokens.
+
+    Checks on top of it subclass it (see tsx_validate): every token goes
+    through emit(), JSX text through jsx_text(), and embedded(), template()
+    and jsx() return the offset where what they scanned ends.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = []
+        self.depth = 0
+        # Does the previous token end an expression?
+        self.after_value = False
+
+    def error(self, offset, message):
+        raise TsxSyntaxError(self.text, offset, message)
+
+    def emit(self, kind, start, end):
+        self.tokens.append(Token(kind, start, end, self.depth))
+
+    def skip(self, pos):
+        end = _SKIP.match(self.text, pos).end()
+        if self.text.startswith('/*', end):
+            self.error(end, 'unterminated comment')
+        return end
+
+    def js(self, pos, embedded=False):
+        """Scan JS/TS from pos.
+
+        Embedded scans (template ${...} and JSX {...}) stop at the } that
+        closes them and return its offset; top-level scans run to the end.
+        """
+        text = self.text
+        length = len(text)
+        stack = []
+        while True:
+            pos = self.skip(pos)
+            if pos >= length:
+                if stack:
+                    self.error(stack[-1][1], 'unclosed %r' % stack[-1][0])
+                if embedded:
+                    self.error(pos, "expected '}'")
+                return pos
+            c = text[pos]
+            if c in '([{':
+                self.emit('open', pos, pos + 1)
+                stack.append((c, pos))
+                self.depth += 1
+                self.after_value = False
+                pos += 1
+            elif c in ')]}':
+                if not stack:
+                    if embedded and c == '}':
+                        return pos
+                    self.error(pos, 'unexpected %r' % c)
+                opener, at = stack.pop()
+                if _CLOSERS[opener] != c:
+                    self.error(pos, '%r at %d:%d closed by %r' % ((opener,) + position(text, at) + (c,)))
+                self.depth -= 1
+                self.emit('close', pos, pos + 1)
+                self.after_value = True
+                pos += 1
+            elif c == '`':
+                pos = self.template(pos)
+            elif c == '"' or c == "'":
+                m = _STRING.match(text, pos)
+                if m is None:
+                    self.error(pos, 'unterminated string')
+                self.emit('string', pos, m.end())
+                self.after_value = True
+                pos = m.end()
+            elif c == '/' and not self.after_value:
+                m = _REGEX.match(text, pos)
+                if m is None:
+                    self.error(pos, 'unterminated regular expression')
+                self.emit('regex', pos, m.end())
+                self.after_value = True
+                pos = m.end()
+            elif c == '<' and not self.after_value and (_JSX_NAME.match(text, pos + 1) or text.startswith('>', pos + 1)):
+                pos = self.jsx(pos)
+            else:
+                kind = 'name'
+                m = _NAME.match(text, pos)
+                if m is None:
+                    kind = 'number'
+                    m = _NUMBER.match(text, pos)
+                if m is None:
+                    kind = 'punct'
+                    m = _PUNCT.match(text, pos)
+                if m is None:
+                    self.error(pos, 'unexpected character %r' % c)
+                self.emit(kind, pos, m.end())
+                if kind == 'punct':
+                    self.after_value = False
+                else:
+                    self.after_value = kind == 'number' or m.group() not in _OPERATOR_WORDS
+                pos = m.end()
+
+    def embedded(self, pos):
+        """Scan a ${...} or {...} body starting after the brace; return the offset after its }."""
+        self.depth += 1
+        self.after_value = False
+        end = self.js(pos, embedded=True)
+        self.depth -= 1
+        return end + 1
+
+    def template(self, start):
+        text = self.text
+        token = len(self.tokens)
+        self.emit('template', start, start)
+        pos = start + 1
+        while True:
+            m = _TEMPLATE_PART.search(text, pos)
+            if m is None:
+                self.error(start, 'unterminated template literal')
+            part = m.group()
+            if part == '`':
+                self.tokens[token] = Token('template', start, m.end(), self.depth)
+                self.after_value = True
+                return m.end()
+            if part == '\\':
+                pos = m.end() + 1
+            else:
+                pos = self.embedded(m.end())
+
+    def jsx(self, start):
+        """Scan a JSX element or fragment starting at its '<'."""
+        token = len(self.tokens)
+        self.emit('jsx', start, start)
+        self.depth += 1
+        name, pos, closed = self.jsx_open_tag(start)
+        if not closed:
+            pos = self.jsx_children(pos, name, start)
+        self.depth -= 1
+        self.tokens[token] = Token('jsx', start, pos, self.depth)
+        self.after_value = True
+        return pos
+
+    def jsx_open_tag(self, start):
+        text = self.text
+        pos = self.skip(start + 1)
+        m = _JSX_NAME.match(text, pos)
+        name = m.group() if m else ''
+        pos = m.end() if m else pos
+        while True:
+            pos = self.skip(pos)
+            if text.startswith('/>', pos):
+                return name, pos + 2, True
+            if text.startswith('>', pos):
+                return name, pos + 1, False
+            if pos >= len(text):
+                self.error(start, 'unterminated tag <%s' % name)
+            if text[pos] == '{':
+                pos = self.embedded(pos + 1)
+                continue
+            m = _JSX_ATTR.match(text, pos)
+            if m is None:
+                self.error(pos, 'unexpected %r in <%s> tag' % (text[pos], name))
+            pos = self.skip(m.end())
+            if not text.startswith('=', pos):
+                continue
+            pos = self.skip(pos + 1)
+            c = text[pos:pos + 1]
+            if c == '"' or c == "'":
+                end = text.find(c, pos + 1)
+                if end < 0:
+                    self.error(pos, 'unterminated attribute string')
+                pos = end + 1
+            elif c == '{':
+                pos = self.embedded(pos + 1)
+            elif c == '<':
+                pos = self.jsx(pos)
+            else:
+                self.error(pos, 'expected attribute value for %s' % m.group())
+
+    def jsx_text(self, start, end):
+        """Called with every span of JSX text; the plain scanner accepts any."""
+
+    def jsx_children(self, pos, name, start):
+        text = self.text
+        while True:
+            m = _JSX_CHILD.search(text, pos)
+            if m is None:
+                self.error(start, 'unclosed <%s>' % name)
+            self.jsx_text(pos, m.start())
+            pos = m.start()
+            if text[pos] == '{':
+                pos = self.embedded(pos + 1)
+                continue
+            after = self.skip(pos + 1)
+            if not text.startswith('/', after):
+                pos = self.jsx(pos)
+                continue
+            after = self.skip(after + 1)
+            m = _JSX_NAME.match(text, after)
+            closing = m.group() if m else ''
+            after = self.skip(m.end() if m else after)
+            if not text.startswith('>', after):
+                self.error(after, "expected '>' to close </%s" % closing)
+            if closing != name:
+                self.error(pos, 'expected </%s> for <%s> at %d:%d, found </%s>'
+                           % ((name, name) + position(text, start) + (closing,)))
+            return after + 1
+
+
+def scan(text):
+    """Tokenize a TS/TSX source; returns a list of Tokens."""
+    scanner = Scanner(text)
+    scanner.js(0)
+    return scanner.tokens
+
+
+def scan_expression(text, pos):
+    """Tokenize the {...} expression whose body starts at pos (just after the brace).
+
+    Returns (tokens, end) where end is the offset after the closing brace.
+    """
+    scanner = Scanner(text)
+    end = scanner.embedded(pos)
+    return scanner.tokens, end
+
+
+def template_chunks(text, start):
+    """Static (start, end) spans of the template literal whose backtick is at start."""
+    chunks = []
+    chunk_start = pos = start + 1
+    while True:
+        m = _TEMPLATE_PART.search(text, pos)
+        if m is None:
+            raise TsxSyntaxError(text, start, 'unterminated template literal')
+        part = m.group()
+        if part == '\\':
+            pos = m.end() + 1
+            continue
+        chunks.append((chunk_start, m.start()))
+        if part == '`':
+            return chunks
+        chunk_start = pos = Scanner(text).embedded(m.end())
+
+
+_DECLARATIONS = frozenset(('function', 'class', 'const', 'let', 'var', 'interface', 'type', 'enum'))
+_MODIFIERS = frozenset(('export', 'default', 'async', 'declare', 'abstract'))
+# Depth-0 tokens after which a following { belongs to a type, not a body.
+_TYPE_CONTEXT = frozenset((':', '|', '&', ',', '<', '=>', '='))
+# Declarations that end with their body's closing brace.
+_BODIES = frozenset(('function', 'class', 'interface', 'enum'))
+
+
+def _at_line_start(text, offset):
+    line = text.rfind('\n', 0, offset) + 1
+    return not text[line:offset].strip()
+
+
+def _statement_end(text, top, i):
+    """Index of the last depth-0 token of the statement starting at top[i]."""
+    k = i + 1
+    while k < len(top):
+        token = top[k]
+        prev = top[k - 1]
+        if text[prev.start:prev.end] == ';':
+            return k - 1
+        if (token.kind in ('name', 'string', 'number', 'jsx')
+                and _at_line_start(text, token.start)
+                and (prev.kind in ('name', 'string', 'number', 'template', 'regex', 'jsx', 'close'))
+                and text[prev.start:prev.end] not in _OPERATOR_WORDS):
+            return k - 1
+        k += 1
+    return len(top) - 1
+
+
+def _body_end(text, top, k):
+    """Index of the } closing the first body brace at or after top[k]."""
+    while k < len(top):
+        value = text[top[k].start:top[k].end]
+        if value == ';':
+            return k
+        if value == '{' and text[top[k - 1].start:top[k - 1].end] not in _TYPE_CONTEXT:
+            return k + 1 if k + 1 < len(top) else k
+        k += 1
+    return len(top) - 1
+
+
+def build_index(text):
+    """Map every top-level declaration name to its Block."""
+    return _declarations(text, [t for t in scan(text) if t.depth == 0])
+
+
+def _declarations(text, top):
+    index = {}
+    i = 0
+    while i < len(top):
+        j = i
+        modifiers = set()
+        while j < len(top) and top[j].kind == 'name' and text[top[j].start:top[j].end] in _MODIFIERS:
+            modifiers.add(text[top[j].start:top[j].end])
+            j += 1
+        keyword = text[top[j].start:top[j].end] if j < len(top) else ''
+        if keyword not in _DECLARATIONS:
+            i = _statement_end(text, top, i) + 1
+            continue
+        n = j + 1
+        if n < len(top) and text[top[n].start:top[n].end] == '*':
+            n += 1
+        if n < len(top) and top[n].kind == 'name':
+            name = text[top[n].start:top[n].end]
+        elif 'default' in modifiers:
+            name, n = 'default', n - 1
+        else:
+            i = _statement_end(text, top, i) + 1
+            continue
+        if keyword in ('function', 'class', 'interface', 'enum'):
+            end = _body_end(text, top, n + 1)
+        else:
+            end = _statement_end(text, top, i)
+        index[name] = Block(name, keyword, top[i].start, top[end].end, 'export' in modifiers)
+        i = end + 1
+    return index
+
+
+def update_index(index, text, start, end, delta):
+    """build_index(text), given the index of an earlier version of text.
+
+    The earlier version differed only in text[start:end], which was
+    end - delta characters long there.  Declarations away from the change
+    are kept, shifted by delta, and only the stretch between them is
+    scanned again; when that stretch could run on into the declaration
+    after it, the whole text is.
+    """
+    old_end = end - delta
+    blocks = sorted(index.values(), key=lambda b: b.start)
+    before = [b for b in blocks if b.end < start]
+    after = [b for b in blocks if b.start > old_end]
+    # A declaration with a body ends at its closing brace; any other can
+    # run on into the change, so it is scanned again.
+    if before and before[-1].kind not in _BODIES:
+        low = before.pop().start
+    else:
+        low = before[-1].end if before else 0
+    high = after[0].start + delta if after else len(text)
+    chunk = text[low:high]
+    try:
+        top = [t for t in scan(chunk) if t.depth == 0]
+    except TsxSyntaxError:
+        return build_index(text)
+    if after and top and not (_ends_statement(chunk, top[-1]) and _at_line_start(text, high)):
+        return build_index(text)
+    new = {b.name: b for b in before}
+    for b in _declarations(chunk, top).values():
+        new[b.name] = b._replace(start=b.start + low, end=b.end + low)
+    for b in after:
+        new[b.name] = b._replace(start=b.start + delta, end=b.end + delta)
+    return new
+
+
+def _ends_statement(text, token):
+    """Whether a declaration starting on the next line ends the statement at token."""
+    value = text[token.start:token.end]
+    return value == ';' or (token.kind in ('name', 'string', 'number', 'template', 'regex', 'jsx', 'close')
+                             and value not in _OPERATOR_WORDS)
+
+
+def replace_block(text, name, source, index=None):
+    """Replace the top-level declaration called name; unchanged if it is missing.
+
+    index is text's build_index(), when the caller already has it.
+    """
+    block = (build_index(text) if index is None else index).get(name)
+    if block is None:
+        return text
+    return text[:block.start] + source + text[block.end:]
+
+
+class Scope(namedtuple('Scope', 'names')):
+    """codemod_engine rule scope covering the named top-level declarations."""
+
+    def __call__(self, text):
+        index = build_index(text)
+        return [(index[n].start, index[n].end) for n in self.names if n in index]
+
+
+def scope(*names):
+    return Scope(names)
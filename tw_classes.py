@@ -0,0 +1,169 @@
+"""Token-level rewriting of Tailwind classes.
+
+Instead of matching whole className="..." strings literally, this finds every
+className value once (plain strings, template literals and the string
+branches of {...} expressions), splits it into class tokens and maps each
+token through a dict.  Reordering classes no longer breaks a rule.
+
+    rewriter = ClassRewriter(
+        [ClassRule({'px-5': 'px-3', 'py-4': 'py-2.5'}),
+         # only where the class list also has all of these
+         ClassRule({'text-sm': 'text-xs'}, requires={'bg-blue-600', 'rounded-lg'})],
+        props={'size': {'16': '14'}},
+    )
+    content = rewriter.apply(content)
+
+ClassRewriter has the same scan()/apply()/names interface as
+codemod_engine.RuleSet.
+"""
+import re
+from collections import namedtuple
+
+import tsx_index
+
+# mapping   class -> replacement ('' removes the class, spaces add several)
+# requires  classes that must all be present in the same className
+# name      label used in reports
+ClassRule = namedtuple('ClassRule', 'mapping requires name', defaults=(frozenset(), None))
+
+_CLASS_TOKEN = re.compile(r'\S+')
+_COMPARISONS = frozenset(('===', '!==', '==', '!='))
+
+
+def class_segments(text, pos):
+    """Class-bearing spans of the attribute value starting at pos.
+
+    Returns (segments, end).  Each segment is (start, end, whole_start,
+    whole_end); the flags are False where the span touches a ${...}, so a
+    class fragment like bg-${color} is never treated as a whole class.
+    """
+    quote = text[pos]
+    if quote != '{':
+        end = text.find(quote, pos + 1)
+        if end < 0:
+            raise tsx_index.TsxSyntaxError(text, pos, 'unterminated attribute string')
+        return [(pos + 1, end, True, True)], end + 1
+    tokens, end = tsx_index.scan_expression(text, pos + 1)
+    segments = []
+    for i, token in enumerate(tokens):
+        if token.kind == 'string':
+            before = tokens[i - 1] if i else None
+            after = tokens[i + 1] if i + 1 < len(tokens) else None
+            if any(t is not None and t.kind == 'punct' and text[t.start:t.end] in _COMPARISONS
+                   for t in (before, after)):
+                continue
+            segments.append((token.start + 1, token.end - 1, True, True))
+        elif token.kind == 'template':
+            chunks = tsx_index.template_chunks(text, token.start)
+            last = len(chunks) - 1
+            segments.extend((s, e, k == 0, k == last) for k, (s, e) in enumerate(chunks))
+    segments.sort()
+    return segments, end
+
+
+def class_tokens(text, segments):
+    """Yield (start, end) of every whole class token in the segments."""
+    for start, end, whole_start, whole_end in segments:
+        for m in _CLASS_TOKEN.finditer(text, start, end):
+            if (whole_start or m.start() > start) and (whole_end or m.end() < end):
+                yield m.span()
+
+
+class ClassRewriter:
+    """Apply class and prop mappings to every className in one pass."""
+
+    def __init__(self, rules=(), props=None, attributes=r'\w*[cC]lassName'):
+        self.rules = [r if isinstance(r, ClassRule) else ClassRule(r) for r in rules]
+        self.props = dict(props or {})
+        self.names = [r.name or 'classes %d' % (i + 1) for i, r in enumerate(self.rules)]
+        self.names += ['%s prop' % prop for prop in self.props]
+        self._prop_index = {prop: len(self.rules) + i for i, prop in enumerate(self.props)}
+
+        # Unconditional mappings merged into one dict (earlier rules win);
+        # conditional rules are found through one of their required classes.
+        self._always = {}
+        self._by_class = {}
+        for i, rule in enumerate(self.rules):
+            if rule.requires:
+                key = min(rule.requires)
+                self._by_class.setdefault(key, []).append(i)
+            else:
+                for old, new in rule.mapping.items():
+                    self._always.setdefault(old, (new, i))
+
+        names = [attributes] + [re.escape(p) for p in self.props]
+        self._attribute = re.compile(r'(?<=\s)(%s)\s*=\s*(?=["\'{])' % '|'.join('(?:%s)' % n for n in names))
+
+    def _mapping(self, present):
+        """Class -> (replacement, rule index) for one class list."""
+        matched = set()
+        for cls in present:
+            for i in self._by_class.get(cls, ()):
+                if self.rules[i].requires <= present:
+                    matched.add(i)
+        if not matched:
+            return self._always
+        mapping = {}
+        for i in sorted(matched):
+            for old, new in self.rules[i].mapping.items():
+                mapping.setdefault(old, (new, i))
+        for old, value in self._always.items():
+            if old not in mapping or value[1] < mapping[old][1]:
+                mapping[old] = value
+        return mapping
+
+    def scan(self, text):
+        """Yield (start, end, replacement, rule_index) for every edit, in order."""
+        pos = 0
+        while True:
+            m = self._attribute.search(text, pos)
+            if m is None:
+                return
+            name = m.group(1)
+            value_start = m.end()
+            if name in self._prop_index:
+                pos = value_start
+                edit = self._prop_edit(text, name, value_start)
+                if edit is not None:
+                    pos = edit[1]
+                    yield edit
+                continue
+            segments, pos = class_segments(text, value_start)
+            spans = list(class_tokens(text, segments))
+            if self._by_class:
+                mapping = self._mapping({text[s:e] for s, e in spans})
+            else:
+                mapping = self._always
+            for start, end in spans:
+                hit = mapping.get(text[start:end])
+                if hit is not None:
+                    if not hit[0] and text[end:end + 1] == ' ':
+                        # Removing a class takes its separating space with it.
+                        end += 1
+                    yield start, end, hit[0], hit[1]
+
+    def _prop_edit(self, text, name, pos):
+        if text[pos] == '{':
+            close = text.find('}', pos)
+        else:
+            close = text.find(text[pos], pos + 1)
+        if close < 0:
+            return None
+        value = text[pos + 1:close].strip()
+        new = self.props[name].get(value)
+        if new is None:
+            return None
+        return pos + 1, close, new, self._prop_index[name]
+
+    def apply(self, text):
+        """Return text with every mapping applied."""
+        out = []
+        last = 0
+        for start, end, replacement, _ in self.scan(text):
+            out.append(text[last:start])
+            out.append(replacement)
+            last = end
+        if not out:
+            return text
+        out.append(text[last:])
+        return ''.join(out)
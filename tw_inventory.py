@@ -0,0 +1,343 @@
+"""Inventory of the Tailwind classes the TSX files use.
+
+    python tw_inventory.py summary                 # totals, most used classes, variants
+    python tw_inventory.py where px-5 'text-[*'    # every file:line using a class (globs allowed)
+    python tw_inventory.py clusters                # near-identical class lists, with what differs
+    python tw_inventory.py rare --max 2            # classes used at most twice
+    python tw_inventory.py index > classes.json    # class -> ["path:line", ...]
+    python tw_inventory.py --path src/components/AdminPanel.tsx summary
+
+Class lists are found the way tw_classes finds them for the codemods:
+className (and *ClassName) attributes whose value is a string, a template
+literal or a {...} expression, whose string branches all count - so
+className={active ? 'bg-blue-600' : 'bg-gray-100'} lists both.  Variables
+holding class strings (const inputClass = `...`) are read too.  Fragments
+next to a ${...} (bg-${color}-500) are not whole classes and are skipped.
+
+Each file's class lists are cached in .codemod_cache/tw_inventory.sqlite
+by content, so a run only reads the files that changed since the last one,
+in parallel when there are many.
+
+clusters links the distinct class lists of at least --min-size classes
+whose Jaccard similarity is at least --similarity (0.75: three classes in
+four shared) and prints each group of linked lists with its common
+classes, how each member differs from them and the similarity of its
+least alike pair - the candidates for a shared component or a
+tw_classes.ClassRule whose requires is the common part.  Links chain: a
+and c can share a group through b while being less alike than
+--similarity themselves.
+"""
+import argparse
+import fnmatch
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+
+import codemod_cache
+import tsx_index
+import tw_classes
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATHS = (os.path.join(ROOT, 'src'),)
+DEFAULT_CACHE = os.path.join(codemod_cache.CACHE_DIR, 'tw_inventory.sqlite')
+SUFFIXES = ('.tsx', '.jsx')
+SKIP_DIRS = frozenset(('node_modules', 'dist', 'build'))
+
+# One class list: the classes of one className attribute or class variable.
+Usage = namedtuple('Usage', 'line classes')
+
+# A file's class lists; error is the TsxSyntaxError text of the first one
+# that did not parse (the rest of the file is still read).
+FileClasses = namedtuple('FileClasses', 'path usages error')
+
+_ATTRIBUTE = re.compile(r'(?<=\s)\w*[cC]lassName\s*=\s*(?=["\'{])')
+_VARIABLE = re.compile(r'\b(?:const|let|var)\s+\w*(?:[cC]lass(?:es|Name)?|[sS]tyles?)\s*(?::\s*string\s*)?=\s*(?=["\'`])')
+_VARIANT = re.compile(r'^(?:[^\[:]+(?:\[[^\]]*\])?:)+')
+
+
+def _segments(text, pos):
+    if text[pos] == '`':
+        chunks = tsx_index.template_chunks(text, pos)
+        last = len(chunks) - 1
+        return [(s, e, k == 0, k == last) for k, (s, e) in enumerate(chunks)]
+    return tw_classes.class_segments(text, pos)[0]
+
+
+def extract(text):
+    """(usages, error) for a TSX source: a Usage per class list, in order."""
+    found = []
+    error = None
+    for pattern in (_ATTRIBUTE, _VARIABLE):
+        for m in pattern.finditer(text):
+            try:
+                segments = _segments(text, m.end())
+            except tsx_index.TsxSyntaxError as e:
+                error = error or str(e)
+                continue
+            classes = [text[s:e] for s, e in tw_classes.class_tokens(text, segments)]
+            if classes:
+                found.append((m.start(), classes))
+    found.sort()
+    usages = []
+    line = 1
+    last = 0
+    for offset, classes in found:
+        line += text.count('\n', last, offset)
+        last = offset
+        usages.append(Usage(line, classes))
+    return usages, error
+
+
+def _read(root, path):
+    with open(os.path.join(root, path), encoding='utf-8', errors='replace', newline='') as f:
+        usages, error = extract(f.read())
+    return FileClasses(path, usages, error)
+
+
+def _hash():
+    """Cache key for the extractor: this file and the modules it relies on."""
+    return codemod_cache.codemod_hash(__file__, tw_classes.__file__, tsx_index.__file__)
+
+
+def files(paths, root=ROOT):
+    """Every TSX file under paths, relative to root with forward slashes."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in SKIP_DIRS)
+            found += [os.path.join(dirpath, f) for f in filenames if f.endswith(SUFFIXES)]
+    return sorted(os.path.relpath(os.path.abspath(p), root).replace(os.sep, '/') for p in found)
+
+
+def collect(paths, root=ROOT, cache_path=DEFAULT_CACHE, jobs=None):
+    """[FileClasses] for paths, cached by content."""
+    results = {}
+    missing = []
+    cache = codemod_cache.Cache(cache_path, max_entries=8192) if cache_path else None
+    try:
+        extractor_key = _hash() if cache else None
+        keys = {}
+        for path in paths:
+            if cache is not None:
+                with open(os.path.join(root, path), 'rb') as f:
+                    keys[path] = codemod_cache.content_hash(f.read())
+                hit = cache.get(keys[path], extractor_key)
+                if hit is not None and hit is not codemod_cache.UNCHANGED:
+                    data = json.loads(hit)
+                    results[path] = FileClasses(path, [Usage(*u) for u in data['usages']], data['error'])
+                    continue
+            missing.append(path)
+        if jobs == 1 or len(missing) < 8:
+            read = [_read(root, path) for path in missing]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                read = list(pool.map(_read, [root] * len(missing), missing, chunksize=8))
+        for entry in read:
+            results[entry.path] = entry
+            if cache is not None:
+                cache.put(keys[entry.path], extractor_key,
+                          json.dumps({'usages': entry.usages, 'error': entry.error}))
+    finally:
+        if cache is not None:
+            cache.close()
+    return [results[path] for path in paths]
+
+
+def inverted_index(inventory):
+    """{class: [(path, line)]} in file and line order."""
+    index = {}
+    for entry in inventory:
+        for usage in entry.usages:
+            for cls in usage.classes:
+                index.setdefault(cls, []).append((entry.path, usage.line))
+    return index
+
+
+def variant(cls):
+    """The variant prefix of a class ('dark:hover:' of dark:hover:bg-gray-700), or ''."""
+    m = _VARIANT.match(cls)
+    return m.group() if m else ''
+
+
+def rare(index, most=1):
+    """[(class, occurrences)] of the classes used at most `most` times, by first use."""
+    return sorted(((cls, places) for cls, places in index.items() if len(places) <= most),
+                  key=lambda item: (item[1][0], item[0]))
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets of classes."""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def least_alike(members):
+    """The lowest Jaccard similarity between two lists of a group."""
+    return min((jaccard(a, b) for k, a in enumerate(members) for b in members[k + 1:]), default=1.0)
+
+
+def clusters(inventory, similarity=0.75, min_size=3):
+    """Groups of distinct class lists linked by pairs at least `similarity` alike (Jaccard).
+
+    Linking is transitive (single linkage), so two lists of a group can be
+    less alike than `similarity`; least_alike() gives how much less.
+
+    Returns [(lists, places)], most used group first: lists are frozensets
+    of classes, places[i] the (path, line) of every use of lists[i].
+
+    Candidate pairs come from prefix filtering: with each list's classes
+    ordered rarest first, two lists this alike must share one of the first
+    len - ceil(similarity * len) + 1 classes of each, so only lists sharing
+    a rare class are compared.
+    """
+    places = {}
+    for entry in inventory:
+        for usage in entry.usages:
+            classes = frozenset(usage.classes)
+            if len(classes) >= min_size:
+                places.setdefault(classes, []).append((entry.path, usage.line))
+    lists = sorted(places, key=lambda s: (-len(places[s]), sorted(s)))
+    frequency = Counter(cls for s in lists for cls in s)
+    parent = list(range(len(lists)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    by_prefix = {}
+    for i, classes in enumerate(lists):
+        ordered = sorted(classes, key=lambda cls: (frequency[cls], cls))
+        prefix = len(ordered) - math.ceil(similarity * len(ordered)) + 1
+        candidates = set()
+        for cls in ordered[:prefix]:
+            candidates.update(by_prefix.get(cls, ()))
+            by_prefix.setdefault(cls, []).append(i)
+        for j in candidates:
+            other = lists[j]
+            # Jaccard >= similarity is impossible when the sizes are too far apart.
+            if min(len(classes), len(other)) < similarity * max(len(classes), len(other)):
+                continue
+            if len(classes & other) >= similarity * len(classes | other):
+                parent[find(i)] = find(j)
+    groups = {}
+    for i in range(len(lists)):
+        groups.setdefault(find(i), []).append(lists[i])
+    found = [(members, [places[m] for m in members]) for members in groups.values() if len(members) > 1]
+    found.sort(key=lambda group: -sum(len(p) for p in group[1]))
+    return found
+
+
+def _where(places, limit=None):
+    shown = places if limit is None else places[:limit]
+    text = ', '.join('%s:%d' % place for place in shown)
+    if len(places) > len(shown):
+        text += ', +%d more' % (len(places) - len(shown))
+    return text
+
+
+def summary(inventory, index, top=25, out=sys.stdout):
+    usages = sum(len(entry.usages) for entry in inventory)
+    occurrences = sum(len(places) for places in index.values())
+    counts = Counter({cls: len(places) for cls, places in index.items()})
+    print('%d files, %d class lists, %d class uses, %d distinct classes' % (
+        len(inventory), usages, occurrences, len(index)), file=out)
+    arbitrary = [cls for cls in index if '[' in cls]
+    print('%d used once, %d with arbitrary values ([...])' % (
+        sum(1 for n in counts.values() if n == 1), len(arbitrary)), file=out)
+
+    print('\nmost used classes:', file=out)
+    for cls, n in counts.most_common(top):
+        print('  %6d  %5.1f%%  %s' % (n, 100.0 * n / occurrences, cls), file=out)
+
+    variants = Counter()
+    for cls, n in counts.items():
+        variants[variant(cls)] += n
+    print('\nvariants:', file=out)
+    for prefix, n in variants.most_common(top):
+        print('  %6d  %s' % (n, prefix or '(none)'), file=out)
+
+    per_file = sorted(((len({c for u in e.usages for c in u.classes}), e.path) for e in inventory), reverse=True)
+    print('\ndistinct classes per file:', file=out)
+    for n, path in per_file[:top]:
+        print('  %6d  %s' % (n, path), file=out)
+    broken = [entry for entry in inventory if entry.error]
+    if broken:
+        print('\nnot fully read (%d):' % len(broken), file=out)
+        for entry in broken:
+            print('  %s:%s' % (entry.path, entry.error), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index the Tailwind classes used across the TSX files.')
+    parser.add_argument('--path', action='append', dest='paths', metavar='PATH',
+                        help='file or directory to read (repeatable; default: src/)')
+    parser.add_argument('--no-cache', action='store_true', help='read every file again')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary_parser = commands.add_parser('summary', help='totals, most used classes and variants')
+    summary_parser.add_argument('--top', type=int, default=25, help='rows per table (default: 25)')
+    where = commands.add_parser('where', help='every use of some classes')
+    where.add_argument('classes', nargs='+', help='class names or globs like \'text-[*\'')
+    cluster_parser = commands.add_parser('clusters', help='near-duplicate class lists')
+    cluster_parser.add_argument('--similarity', type=float, default=0.75,
+                                help='least Jaccard similarity of two linked lists (default: 0.75)')
+    cluster_parser.add_argument('--min-size', type=int, default=3, help='ignore shorter class lists (default: 3)')
+    cluster_parser.add_argument('--top', type=int, default=20, help='groups to show (default: 20)')
+    cluster_parser.add_argument('--variants', type=int, default=10,
+                                help='most used members to show per group (default: 10)')
+    rare_parser = commands.add_parser('rare', help='classes used only a few times')
+    rare_parser.add_argument('--max', type=int, default=1, help='most uses to count as rare (default: 1)')
+    commands.add_parser('index', help='print class -> ["path:line", ...] as JSON')
+    args = parser.parse_args(argv)
+
+    paths = files(args.paths or DEFAULT_PATHS)
+    inventory = collect(paths, cache_path=None if args.no_cache else DEFAULT_CACHE, jobs=args.jobs)
+    index = inverted_index(inventory)
+
+    if args.command == 'summary':
+        summary(inventory, index, args.top)
+    elif args.command == 'where':
+        for pattern in args.classes:
+            matched = sorted(cls for cls in index if fnmatch.fnmatchcase(cls, pattern))
+            if not matched:
+                print('%s: not used' % pattern)
+            for cls in matched:
+                print('%s (%d)' % (cls, len(index[cls])))
+                for place in index[cls]:
+                    print('  %s:%d' % place)
+    elif args.command == 'clusters':
+        groups = clusters(inventory, args.similarity, args.min_size)
+        print('%d groups of similar class lists' % len(groups))
+        for members, places in groups[:args.top]:
+            common = frozenset.intersection(*members)
+            print('\n%d uses, %d variants, least alike pair %.2f; common: %s' % (
+                sum(len(p) for p in places), len(members), least_alike(members), ' '.join(sorted(common))))
+            for classes, where_used in list(zip(members, places))[:args.variants]:
+                delta = ['+' + c for c in sorted(classes - common)]
+                print('  %4d  %-50s %s' % (len(where_used), ' '.join(delta) or '(common only)',
+                                           _where(where_used, 3)))
+            if len(members) > args.variants:
+                print('        ... %d more variants' % (len(members) - args.variants))
+    elif args.command == 'rare':
+        found = rare(index, args.max)
+        print('%d classes used at most %d time%s' % (len(found), args.max, '' if args.max == 1 else 's'))
+        for cls, places in found:
+            print('  %-40s %s' % (cls, _where(places)))
+    else:
+        json.dump({cls: ['%s:%d' % place for place in places] for cls, places in sorted(index.items())},
+                  sys.stdout, indent=1)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
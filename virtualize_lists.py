@@ -0,0 +1,573 @@
+"""Window the long card lists of the admin panel and the resource grid.
+
+    python virtualize_lists.py --measure       # DOM elements mounted now and after, per list
+    python virtualize_lists.py --dry-run       # diffs and skipped lists, nothing written
+    python virtualize_lists.py                 # rewrite AdminPanel.tsx and ResourceGrid.tsx
+    python virtualize_lists.py src/components/SavedResources.tsx --measure --items 5000
+
+A {items.map(item => <Card key={item._id} ...>)} mounts every card, with
+its collapsed body, for every item.  This rewrites such lists to
+
+    <VirtualList
+        items={items}
+        itemKey={item => item._id}
+        gap={8}
+        renderItem={item => <Card key={item._id} ...>}
+    />
+
+(src/components/VirtualList.tsx), which mounts only the rows in and near
+the viewport and measures them as they render, so expanding a card moves
+the rows below it.  The callback is kept as it is, so the expand/collapse
+state the parent keeps (expandedIds.includes(resource._id)) is untouched
+and still keyed by _id: a card scrolled out and back in opens as it was.
+
+A list is rewritten when its callback returns JSX keyed by something of
+the item (not the index) and a row renders at least MIN_ELEMENTS
+elements, counting those of the components it uses that are defined in
+src/.  A gap comes from the container's space-y-* or gap-*; a grid
+container whose only child is the list becomes the VirtualList itself,
+windowing whole grid rows (columns follow its grid-cols-* breakpoints).
+Lists are skipped, with the reason, when they are laid out horizontally,
+inside an <AnimatePresence> or a <Reorder.Group> (exit animations and
+dragging need the rows mounted), or when the row component keeps any
+state of its own (useState), which would reset on scrolling; lift it
+into the parent keyed by _id first, as the expand state already is.
+
+transform() (python codemod_runner.py virtualize_lists ...) sees one file
+at a time, so there a component from another file counts as one element.
+
+--measure counts the DOM elements each list mounts for --items items
+(JSX elements, a component from a package counting as one), against
+what the window keeps for a --viewport px tall screen.  Run it again
+after the rewrite to see the windowed lists as they are.
+"""
+import argparse
+import math
+import os
+import re
+import sys
+from collections import namedtuple
+
+import codemod_io
+import render_audit
+import span_diff
+import tsx_index
+import tsx_validate
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PATHS = ('src/components/AdminPanel.tsx', 'src/components/ResourceGrid.tsx')
+COMPONENT = 'src/components/VirtualList.tsx'
+MIN_ELEMENTS = 8
+# What --measure assumes; ESTIMATE and OVERSCAN are VirtualList's defaults.
+ITEMS = 1000
+VIEWPORT = 900
+ESTIMATE = 64
+OVERSCAN = 4
+BREAKPOINTS = {'sm': 640, 'md': 768, 'lg': 1024, 'xl': 1280, '2xl': 1536}
+
+# A mapped list: path:line, the items expression, elements per item, items
+# per grid row on the widest screen, the gap in px, whether it is a
+# VirtualList already, why it is left alone (None if it is rewritten) and
+# notes on what changes for its rows.
+List = namedtuple('List', 'path line items elements columns gap virtual skip notes')
+
+_TAG = re.compile(r'<([\w.]*)')
+_IMPORT = re.compile(r'^import\s+(?:type\s+)?([\w\s{},*]+?)\s+from\s+[\'"]([^\'"]+)[\'"]', re.M)
+_STATEMENT = re.compile(r'^import\b(?:[^\'"]*?from\s*)?([\'"])[^\'"]+\1(;?)[^\n]*\n', re.M)
+_STATE = re.compile(r'\bconst\s*\[\s*(\w+)\s*,\s*\w+\s*\]\s*=\s*useState\b')
+_EXPAND = re.compile(r'expand|collaps|open', re.I)
+_SPACING = re.compile(r'^(?:space-y|gap-y|gap)-(\d+(?:\.\d+)?|px)$')
+_GRID_CLASS = re.compile(r'^(?:[\w-]+:)?(?:grid|grid-cols-\w+|gap(?:-[xy])?-[\w.]+)$')
+_COLUMNS = re.compile(r'^(?:(\w+):)?grid-cols-(\d+)$')
+_KEYWORDS = frozenset(('return', 'await', 'typeof', 'in', 'of', 'new', 'yield', 'case'))
+# Tokens after which a JSX element is what the callback returns.
+_RETURNED = frozenset(('return', '=>', '?', ':', '&&', '||', '('))
+_SUFFIXES = ('.tsx', '.ts', '.jsx', '/index.tsx', '/index.ts')
+
+
+def _value(text, token):
+    return text[token.start:token.end]
+
+
+def _close(tokens, j):
+    """Index of the bracket closing the one at tokens[j]."""
+    depth = tokens[j].depth
+    k = j + 1
+    while k < len(tokens) and tokens[k].depth > depth:
+        k += 1
+    return k
+
+
+def _tag(text, token):
+    return _TAG.match(text, token.start).group(1)
+
+
+def _attribute(text, token, name):
+    """(start, end) of the value of a JSX element's attribute, without its braces or quotes, or None."""
+    for attribute, _, offset in render_audit.props(text, token):
+        if attribute != name:
+            continue
+        m = re.compile(r'\s*=\s*([{\'"])').match(text, offset + len(name))
+        if m is None:
+            return None
+        if m.group(1) == '{':
+            return m.end(), tsx_index.scan_expression(text, m.end())[1] - 1
+        return m.end(), text.index(m.group(1), m.end())
+    return None
+
+
+def _classes(text, token, name='className'):
+    """The classes of a JSX element as a list, [] if it has none or they are not a string."""
+    span = _attribute(text, token, name)
+    if span is None or text[span[0] - 1] not in '"\'':
+        return []
+    return text[span[0]:span[1]].split()
+
+
+def _opening_end(text, token):
+    """Offset of the > ending a JSX element's opening tag."""
+    pos = token.start + 1 + len(_tag(text, token))
+    for name, _, offset in render_audit.props(text, token):
+        span = _attribute(text, token, name)
+        pos = max(pos, span[1] + 1 if span else offset + len(name))
+    return text.index('>', pos)
+
+
+def _line_indent(text, offset):
+    start = text.rfind('\n', 0, offset) + 1
+    line = text[start:]
+    return line[:len(line) - len(line.lstrip(' \t'))]
+
+
+def gap(classes):
+    """Space between rows in px that space-y-N, gap-y-N or gap-N give a list."""
+    for name in classes:
+        m = _SPACING.match(name)
+        if m:
+            return 1 if m.group(1) == 'px' else int(float(m.group(1)) * 4)
+    return 0
+
+
+def columns(classes):
+    """[(min viewport width, columns)] of grid-cols-N classes, narrowest first."""
+    found = {}
+    for name in classes:
+        m = _COLUMNS.match(name)
+        if m and (m.group(1) is None or m.group(1) in BREAKPOINTS):
+            found[BREAKPOINTS.get(m.group(1), 0)] = int(m.group(2))
+    return sorted(found.items())
+
+
+def _columns_function(steps):
+    """columns={...} for VirtualList from [(min width, columns)]."""
+    expression = str(steps[0][1]) if steps and steps[0][0] == 0 else '1'
+    for width, count in steps:
+        if width:
+            expression = 'width >= %d ? %d : %s' % (width, count, expression)
+    return 'width => %s' % expression
+
+
+class Components:
+    """Elements and state of the components a file renders, read from their sources under root."""
+
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+
+    def _file(self, path):
+        if path not in self.files:
+            try:
+                text = codemod_io.read_text(os.path.join(self.root, path))
+                self.files[path] = (text, tsx_index.scan(text), tsx_index.build_index(text))
+            except (OSError, tsx_index.TsxSyntaxError):
+                self.files[path] = None
+        return self.files[path]
+
+    def _resolve(self, path, text, name):
+        """(path, block) defining the component name as used in path, or None."""
+        if self.root is None:
+            return None
+        for m in _IMPORT.finditer(text):
+            names = re.findall(r'\w+', re.sub(r'\b\w+\s+as\s+', '', m.group(1)))
+            if name not in names or not m.group(2).startswith('.'):
+                continue
+            base = os.path.normpath(os.path.join(os.path.dirname(path), m.group(2))).replace(os.sep, '/')
+            for suffix in _SUFFIXES:
+                found = self._file(base + suffix)
+                if found is not None:
+                    block = found[2].get(name) or next(
+                        (b for b in found[2].values() if found[0].startswith('export default', b.start)), None)
+                    return (base + suffix, block) if block else None
+            return None
+        found = self._file(path)
+        if found is not None and name in found[2]:
+            return path, found[2][name]
+        return None
+
+    def elements(self, path, text, name):
+        """Elements the component renders, 1 if its source is not under root."""
+        resolved = self._resolve(path, text, name)
+        if resolved is None:
+            return 1
+        _, tokens, _ = self._file(resolved[0])
+        block = resolved[1]
+        return max(1, sum(1 for t in tokens if t.kind == 'jsx' and block.start <= t.start < block.end))
+
+    def state(self, path, text, name):
+        """Names of the useState values the component keeps."""
+        resolved = self._resolve(path, text, name)
+        if resolved is None:
+            return []
+        source = self._file(resolved[0])[0]
+        return _STATE.findall(source, resolved[1].start, resolved[1].end)
+
+
+def _callback(text, tokens, first, last):
+    """(parameter text, item, index, body first, body last) of the arrow function in tokens[first:last], or None."""
+    value = lambda k: _value(text, tokens[k]) if first <= k < last else None
+    if value(first) == '(':
+        close = _close(tokens, first)
+        names = [k for k in range(first + 1, close)
+                 if tokens[k].kind == 'name' and tokens[k].depth == tokens[first].depth + 1
+                 and value(k - 1) in ('(', ',')]
+        if not names or value(close + 1) != '=>':
+            return None
+        end = next((k for k in range(names[0], close)
+                    if value(k) == ',' and tokens[k].depth == tokens[first].depth + 1), close)
+        parameter = '(%s)' % text[tokens[names[0]].start:tokens[end - 1].end]
+        index = value(names[1]) if len(names) > 1 else None
+        arrow = close + 1
+    elif tokens[first].kind == 'name' and value(first + 1) == '=>':
+        names, parameter, index, arrow = [first], value(first), None, first + 1
+    else:
+        return None
+    if arrow + 1 >= last or any(value(k) == ',' and tokens[k].depth == tokens[first].depth
+                                for k in range(arrow + 1, last)):
+        return None
+    return parameter, value(names[0]), index, arrow + 1, last - 1
+
+
+def _roots(text, tokens, first, last):
+    """The jsx tokens a callback body in tokens[first..last] returns."""
+    roots = []
+    for k in range(first, last + 1):
+        token = tokens[k]
+        if token.kind != 'jsx' or roots and token.start < roots[-1].end:
+            continue
+        before = _value(text, tokens[k - 1]) if k > first else '=>'
+        if before == '(':
+            before = _value(text, tokens[k - 2]) if k - 1 > first else '=>'
+        if before in _RETURNED:
+            roots.append(token)
+    return roots
+
+
+def _key(text, tokens, root, item, index):
+    """The key expression of a row root, or None if it is not keyed by its item."""
+    span = _attribute(text, root, 'key')
+    if span is None or text[span[0] - 1] != '{':
+        return None
+    expression = tsx_index.scan_expression(text, span[0])[0]
+    names = {_value(text, t) for i, t in enumerate(expression)
+             if t.kind == 'name' and (i == 0 or _value(text, expression[i - 1]) not in ('.', '?.'))}
+    if item not in names or index in names or 'Math' in names:
+        return None
+    return text[span[0]:span[1]].strip()
+
+
+def _reindent(text, tokens, first, last, delta):
+    """The text of tokens[first..last] with every line after the first moved right
+    by delta columns (left if negative), except lines inside a string or template."""
+    start = tokens[first].start
+    lines = text[start:tokens[last].end].split('\n')
+    literals = [(t.start, t.end) for t in tokens[first:last + 1] if t.kind in ('string', 'template')]
+    offset = start
+    for i in range(len(lines)):
+        line_start, offset = offset, offset + len(lines[i]) + 1
+        if not i or not lines[i].strip() or any(a < line_start < b for a, b in literals):
+            continue
+        if delta >= 0:
+            lines[i] = ' ' * delta + lines[i]
+        else:
+            strip = min(-delta, len(lines[i]) - len(lines[i].lstrip(' ')))
+            lines[i] = lines[i][strip:]
+    return '\n'.join(lines)
+
+
+def _row_elements(path, text, tokens, roots, components):
+    """Most elements one row renders: its JSX elements and those of the components they are."""
+    best = 0
+    for root in roots:
+        count = 0
+        for token in tokens:
+            if token.kind == 'jsx' and root.start <= token.start < root.end:
+                tag = _tag(text, token)
+                count += components.elements(path, text, tag) if tag[:1].isupper() and '.' not in tag else 1
+        best = max(best, count)
+    return best
+
+
+def _virtual_lists(path, text, tokens, components):
+    """List records of the VirtualLists in a file."""
+    found = []
+    for token in tokens:
+        if token.kind != 'jsx' or _tag(text, token) != 'VirtualList':
+            continue
+        items = _attribute(text, token, 'items')
+        render = _attribute(text, token, 'renderItem')
+        if items is None or render is None:
+            continue
+        body = [k for k, t in enumerate(tokens) if render[0] <= t.start < render[1]]
+        parsed = _callback(text, tokens, body[0], body[-1] + 1) if body else None
+        roots = _roots(text, tokens, parsed[3], parsed[4]) if parsed else []
+        spacing = _attribute(text, token, 'gap')
+        found.append(List(path, tsx_index.position(text, token.start)[0], text[items[0]:items[1]],
+                          _row_elements(path, text, tokens, roots, components),
+                          max([1] + [c for _, c in columns(_classes(text, token, 'rowClassName'))]),
+                          int(text[spacing[0]:spacing[1]]) if spacing else 0, True, None, []))
+    return found
+
+
+def plan(text, path='<text>', components=None, import_path='./VirtualList'):
+    """(edits, lists) turning the long card lists of text into VirtualLists."""
+    components = components or Components(None)
+    tokens = tsx_index.scan(text)
+    jsx = [t for t in tokens if t.kind == 'jsx']
+    value = lambda k: _value(text, tokens[k]) if 0 <= k < len(tokens) else None
+    lists = _virtual_lists(path, text, tokens, components)
+    edits = []
+    done = []
+    for i, token in enumerate(tokens):
+        if value(i) != 'map' or value(i - 1) not in ('.', '?.') or value(i + 1) != '(':
+            continue
+        if any(start <= token.start < end for start, end in done):
+            continue
+        close = _close(tokens, i + 1)
+        parsed = _callback(text, tokens, i + 2, close)
+        if parsed is None:
+            continue
+        parameter, item, index, body_first, body_last = parsed
+        roots = _roots(text, tokens, body_first, body_last)
+        if not roots:
+            continue
+        # The items expression: names, calls and member accesses back from the .map.
+        k = i - 1
+        while k > 0 and tokens[k - 1].depth == tokens[i].depth:
+            previous = tokens[k - 1]
+            chained = value(k) in ('.', '?.', '!') or tokens[k].kind == 'open'
+            if value(k - 1) in ('.', '?.', '!'):
+                k -= 1
+            elif previous.kind == 'name' and chained and value(k - 1) not in _KEYWORDS:
+                k -= 1
+            elif previous.kind == 'close' and chained:
+                k = max(j for j in range(k - 1) if tokens[j].depth == previous.depth and tokens[j].kind == 'open')
+            else:
+                break
+        start = tokens[k].start
+        items = text[start:tokens[i - 1].start]
+        done.append((start, tokens[close].end))
+        containers = [t for t in jsx if t.start < start and tokens[close].end <= t.end]
+        if not containers or items.startswith(('[', 'Array')):
+            continue
+        container = max(containers, key=lambda t: t.start)
+        line = tsx_index.position(text, start)[0]
+        elements = _row_elements(path, text, tokens, roots, components)
+        classes = _classes(text, container)
+        steps = columns(classes) if 'grid' in classes else []
+        spacing = gap(classes)
+        notes = []
+        skip = None
+
+        keys = {_key(text, tokens, root, item, index) for root in roots}
+        tags = {_tag(text, root) for root in roots}
+        state = [name for tag in sorted(tags) if tag[:1].isupper() and '.' not in tag
+                 for name in components.state(path, text, tag)]
+        before = text[:start].rstrip()
+        after = text[tokens[close].end:].lstrip()
+        whole = before.endswith('{') and not before[:-1].rstrip().endswith('=') and after.startswith('}')
+        if len(keys) != 1 or None in keys:
+            skip = 'rows are not keyed by their item'
+        elif elements < MIN_ELEMENTS:
+            skip = 'rows of %d element%s are cheap to keep mounted' % (elements, '' if elements == 1 else 's')
+        elif any(_tag(text, t) == 'AnimatePresence' for t in containers):
+            skip = 'inside <AnimatePresence>, whose exit animations need every row mounted'
+        elif any(_tag(text, t) == 'Reorder.Group' for t in containers):
+            skip = 'inside <Reorder.Group>, which needs every row mounted to drag them'
+        elif 'flex' in classes and 'flex-col' not in classes or 'overflow-x-auto' in classes:
+            skip = 'laid out horizontally'
+        elif state:
+            skip = '<%s> keeps %s in useState, which would reset on scrolling; ' \
+                   'lift it into the list keyed by _id first' % ('/'.join(sorted(tags)), ', '.join(state))
+        elif 'grid' in classes:
+            inner_start = _opening_end(text, container) + 1
+            inner_end = text.rfind('</', container.start, container.end)
+            if not whole or text[inner_start:before.rfind('{')].strip() or \
+                    text[len(text) - len(after) + 1:inner_end].strip():
+                skip = 'shares its grid with other children'
+        for root in roots:
+            initial = _attribute(text, root, 'initial')
+            if initial and text[initial[0]:initial[1]].strip() != 'false' and skip is None:
+                notes.append('<%s> at line %d replays its initial animation each time it scrolls in'
+                             % (_tag(text, root), tsx_index.position(text, root.start)[0]))
+        expand = sorted({_value(text, t) for t in tokens[body_first:body_last + 1]
+                         if t.kind == 'name' and _EXPAND.search(_value(text, t))
+                         and not re.search(r'\b(?:const|let|var)\s+%s\b' % re.escape(_value(text, t)),
+                                           text[tokens[body_first].start:tokens[body_last].end])})
+        if expand and skip is None:
+            notes.append('expand state stays in %s, outside the rows' % ', '.join(expand))
+        record = List(path, line, items, elements, max([1] + [c for _, c in steps]), spacing, False, skip, notes)
+        lists.append(record)
+        if skip is not None:
+            continue
+
+        if steps:
+            replaced = (container.start, container.end)
+        elif whole:
+            replaced = (len(before) - 1, len(text) - len(after) + 1)
+        else:
+            replaced = (start, tokens[close].end)
+        indent = _line_indent(text, replaced[0])
+        callback = _reindent(text, tokens, i + 2, close - 1, len(indent) + 4 - len(_line_indent(text, start)))
+        attributes = ['items={%s}' % items,
+                      'itemKey={%s => %s}' % (parameter, keys.pop())]
+        if steps:
+            attributes.append('columns={%s}' % _columns_function(steps))
+        if spacing:
+            attributes.append('gap={%d}' % spacing)
+        if steps:
+            rest = [c for c in classes if not _GRID_CLASS.match(c)]
+            if rest:
+                attributes.append('className="%s"' % ' '.join(rest))
+            attributes.append('rowClassName="%s"' % ' '.join(c for c in classes if _GRID_CLASS.match(c)))
+        attributes.append('renderItem={%s}' % callback)
+        edits.append((replaced[0], replaced[1], '<VirtualList\n%s%s/>' % (
+            ''.join('%s    %s\n' % (indent, a) for a in attributes), indent)))
+    if edits and not re.search(r'^import\s+VirtualList\b', text, re.M):
+        statements = list(_STATEMENT.finditer(text))
+        quote, semicolon = (statements[-1].group(1), statements[-1].group(2)) if statements else ("'", '')
+        at = statements[-1].end() if statements else 0
+        edits.append((at, at, 'import VirtualList from %s%s%s%s\n' % (quote, import_path, quote, semicolon)))
+    return sorted(edits), sorted(lists, key=lambda l: l.line)
+
+
+def transform(content):
+    return span_diff.apply_edits(content, plan(content)[0])
+
+
+def mounted(record, items=ITEMS, viewport=VIEWPORT):
+    """(elements mounted as a plain map, elements mounted windowed) for a list of items items."""
+    plain = items * record.elements
+    if record.skip is not None:
+        return plain, plain
+    rows = math.ceil(items / record.columns)
+    visible = min(rows, math.ceil(viewport / (ESTIMATE + record.gap)) + 1 + 2 * OVERSCAN)
+    # Each windowed row is wrapped in a div, and the list in another.
+    return plain, visible * (record.columns * record.elements + 1) + 1
+
+
+def _import_path(path):
+    relative = os.path.relpath(os.path.splitext(COMPONENT)[0], os.path.dirname(path)).replace(os.sep, '/')
+    return relative if relative.startswith('.') else './' + relative
+
+
+def _relative(root, path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def measure(lists, items=ITEMS, viewport=VIEWPORT, out=sys.stdout):
+    """Print the elements each list mounts as a plain map and windowed, and the totals."""
+    now = windowed = 0
+    print('%d items per list, %dpx viewport:' % (items, viewport), file=out)
+    for record in lists:
+        plain, window = mounted(record, items, viewport)
+        if record.virtual:
+            status = 'windowed'
+        elif record.skip is None:
+            status = 'to window'
+        else:
+            status = 'kept: %s' % record.skip
+        print('  %-40s %-16s %4d/item  %7d -> %-6d %s' % (
+            '%s:%d' % (record.path, record.line), record.items[:16], record.elements, plain, window, status),
+            file=out)
+        now += window if record.virtual else plain
+        windowed += window
+    if lists:
+        print('elements mounted: %d now, %d once every list to window is' % (now, windowed), file=out)
+
+
+def run(paths, root=ROOT, dry_run=False, measuring=False, items=ITEMS, viewport=VIEWPORT,
+        out=sys.stdout, diff_out=None):
+    """Window the lists of paths (relative to root); returns the exit status."""
+    diff_out = diff_out or out
+    components = Components(root)
+    lists = []
+    written = []
+    failed = 0
+    for path in paths:
+        content = codemod_io.read_text(os.path.join(root, path))
+        try:
+            edits, found = plan(content, path, components, _import_path(path))
+        except tsx_index.TsxSyntaxError as e:
+            print('%-9s  %s  (%s)' % ('failed', path, e), file=sys.stderr)
+            failed += 1
+            continue
+        lists += found
+        if measuring or not edits:
+            continue
+        new_content = span_diff.apply_edits(content, edits)
+        error = tsx_validate.validate(new_content)
+        if error is not None:
+            print('%-9s  %s  (output does not parse: %s)' % ('failed', path, error), file=sys.stderr)
+            failed += 1
+            continue
+        if dry_run:
+            diff_out.write(span_diff.unified_diff(content, edits, path))
+        written.append((os.path.join(root, path), new_content))
+
+    if measuring:
+        measure(lists, items, viewport, out)
+        return 1 if failed else 0
+    for record in lists:
+        if record.virtual:
+            continue
+        where = '%s:%d' % (record.path, record.line)
+        if record.skip is not None:
+            print('%-9s  %s  %s (%s)' % ('skipped', where, record.items, record.skip), file=out)
+            continue
+        print('%-9s  %s  %s, %d elements per item' % ('windowed', where, record.items, record.elements), file=out)
+        for note in record.notes:
+            print('           %s' % note, file=out)
+    if failed:
+        print('%d failed, nothing written' % failed, file=out)
+        return 1
+    if written and not os.path.exists(os.path.join(root, COMPONENT)):
+        print('%s is missing: the rewritten lists need it' % COMPONENT, file=out)
+        return 1
+    if dry_run:
+        print('%d files to change (dry run, nothing written)' % len(written), file=out)
+        return 0
+    codemod_io.write_all(written)
+    print('%d files changed' % len(written), file=out)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rewrite long .map() card lists to a windowed VirtualList.')
+    parser.add_argument('paths', nargs='*', help='files to rewrite (default: %s)' % ', '.join(PATHS))
+    parser.add_argument('--root', default=ROOT, help='project directory (default: this script\'s)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='write nothing; print a unified diff per file to stdout, the rest to stderr')
+    parser.add_argument('--measure', action='store_true',
+                        help='count the DOM elements each list mounts now and windowed; write nothing')
+    parser.add_argument('--items', type=int, default=ITEMS, help='items per list for --measure (default: %(default)s)')
+    parser.add_argument('--viewport', type=int, default=VIEWPORT,
+                        help='viewport height in px for --measure (default: %(default)s)')
+    args = parser.parse_args(argv)
+    root = os.path.abspath(args.root)
+    paths = [_relative(root, os.path.abspath(p)) for p in args.paths] or list(PATHS)
+    out = sys.stderr if args.dry_run else sys.stdout
+    return run(paths, root, args.dry_run, args.measure, args.items, args.viewport, out=out, diff_out=sys.stdout)
+
+
+if __name__ == '__main__':
+    sys.exit(main())